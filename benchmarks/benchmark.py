@@ -0,0 +1,205 @@
+"""
+benchmarks.benchmark
+~~~~~~~~~~~~~~~~~~~~
+Benchmark runner - times the parser pipeline over synthetic exports of increasing size.
+
+For each scale factor an export is generated (benchmarks.generator) and each step is run:
+XML parser construction (ICSXMLDocument + ICSIdleConfig), `idle_configs`, `rs_policies`,
+every `write_*_policies` call and `rs_profiles`. Wall-clock time and peak traced memory
+(tracemalloc - measured in a separate pass, so the timings don't include tracing overhead)
+are reported per step, with the scaling exponent over the size sweep (log-log slope, 1.0 -
+linear).
+
+With several XML backends (`--backends etree,lxml`), every step runs once per backend on the
+same export and the speedup of each backend over the first one is reported.
+
+Usage:
+    python -m benchmarks.benchmark [--scales 1,2,4,8] [--streaming] [--backends etree,lxml]
+                                   [--output results.csv]
+
+"""
+
+import argparse
+import logging
+import os
+import tracemalloc
+from math import log
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from src.api import ICSXMLDocument, logger as api_logger
+from src.iconfig.config import ICSIdleConfig
+from src.iconfig.rspolicy import ICSRSPolicy
+from src.iconfig.rsprofile import ICSRSProfile
+from src.iconfig.report import write_rows
+from .generator import ICSExportGenerator
+
+RESULT_HEADERS = ["SCALE", "FILE_SIZE", "BACKEND", "STEP", "SECONDS", "PEAK_MEMORY"]
+
+# Policy writer methods (report filename).
+POLICY_WRITERS = [
+    ('write_web_policies', 'web_policy.csv'),
+    ('write_file_policies', 'file_policy.csv'),
+    ('write_sam_policies', 'sam_policy.csv'),
+    ('write_termsrv_policies', 'termsrv_policy.csv'),
+    ('write_html5_policies', 'html5_policy.csv'),
+    ('write_vpntunnel_policies', 'vpn_policy.csv'),
+]
+
+
+def steps(xml_file: str, output_dir: str, streaming: bool = False, backend: str = 'etree'):
+    """
+    Benchmark steps of the parser pipeline - generator of (step name, callable).
+    Steps share their state, so they must be run in order.
+    """
+
+    state = {}
+
+    def parser_init():
+        state['document'] = ICSXMLDocument(xml_file, streaming=streaming, backend=backend)
+        state['config'] = ICSIdleConfig(state['document'])
+
+    def rs_policy_init():
+        state['rs_policy'] = ICSRSPolicy(state['document'], state['config'].idle_user_roles)
+        state['rs_policy'].rs_policies()
+
+    def rs_profile_init():
+        state['rs_profile'] = ICSRSProfile(state['document'])
+        state['rs_profile'].rs_profiles()
+
+    yield 'parser_init', parser_init
+    yield 'idle_configs', lambda: state['config'].idle_configs()
+    yield 'rs_policies', rs_policy_init
+    for method, filename in POLICY_WRITERS:
+        yield method, lambda method=method, filename=filename: getattr(
+            state['rs_policy'], method)(os.path.join(output_dir, filename))
+    yield 'rs_profiles', rs_profile_init
+    state['document'].close()
+
+
+def measure(
+        xml_file: str,
+        output_dir: str,
+        streaming: bool = False,
+        memory: bool = True,
+        backend: str = 'etree') -> dict:
+    """
+    Runs the steps over the XML export.
+
+    Returns:
+        Step name -> (seconds, peak traced memory in bytes or None).
+    """
+
+    results = {}
+    for name, step in steps(xml_file, output_dir, streaming, backend):
+        start = perf_counter()
+        step()
+        results[name] = [perf_counter() - start, None]
+
+    if memory:
+        tracemalloc.start()
+        try:
+            for name, step in steps(xml_file, output_dir, streaming, backend):
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                step()
+                results[name][1] = tracemalloc.get_traced_memory()[1] - base
+        finally:
+            tracemalloc.stop()
+    return results
+
+
+def slope(points: list) -> float:
+    """Scaling exponent - log-log slope between the smallest & largest (size, value) points."""
+
+    (size_a, value_a), (size_b, value_b) = points[0], points[-1]
+    if size_a == size_b or min(value_a, value_b) <= 0:
+        return float('nan')
+    return log(value_b / value_a) / log(size_b / size_a)
+
+
+def run(
+        scales: list,
+        streaming: bool = False,
+        memory: bool = True,
+        seed: int = 1,
+        backends: tuple = ('etree',)) -> list:
+    """
+    Runs the benchmark over the scale factors (and XML backends).
+
+    Returns:
+        Result rows - (scale, file size, backend, step, seconds, peak memory).
+    """
+
+    rows = []
+    with TemporaryDirectory(prefix='ics-bench-') as work_dir:
+        for scale in scales:
+            xml_file = os.path.join(work_dir, f"export-{scale}.xml")
+            ICSExportGenerator.scaled(scale, seed=seed).write(xml_file)
+            size = os.path.getsize(xml_file)
+            for backend in backends:
+                results = measure(xml_file, work_dir, streaming, memory, backend)
+                for name, (seconds, peak) in results.items():
+                    rows.append((scale, size, backend, name, seconds, peak))
+            os.remove(xml_file)
+    return rows
+
+
+def print_report(rows: list) -> None:
+    """Prints the time & peak memory per step, the scaling exponents and the backend speedups."""
+
+    print(f"{'SCALE':>6} {'SIZE(MB)':>9} {'BACKEND':<8} {'STEP':<26} {'SECONDS':>9} {'PEAK(MB)':>9}")
+    for scale, size, backend, name, seconds, peak in rows:
+        peak = f"{peak / 1024 ** 2:9.1f}" if peak is not None else f"{'-':>9}"
+        print(f"{scale:>6} {size / 1024 ** 2:9.1f} {backend:<8} {name:<26} {seconds:9.3f} {peak}")
+
+    backends = list(dict.fromkeys(row[2] for row in rows))
+    print()
+    print("Scaling exponent (1.0 - linear in the file size):")
+    for backend in backends:
+        for name in dict.fromkeys(row[3] for row in rows):
+            points = [(row[1], row[4]) for row in rows if row[2] == backend and row[3] == name]
+            print(f"  {backend:<8} {name:<26} {slope(points):5.2f}")
+
+    if len(backends) > 1:
+        # Largest scale - speedup of each backend over the first one (>1.0 - faster).
+        largest = {(row[2], row[3]): row[4] for row in rows if row[0] == rows[-1][0]}
+        names = list(dict.fromkeys(row[3] for row in rows))
+        totals = {backend: sum(largest[(backend, name)] for name in names) for backend in backends}
+        print()
+        print(f"Speedup over {backends[0]} (scale {rows[-1][0]}):")
+        for backend in backends[1:]:
+            for name in names + ['total']:
+                base, other = ((totals[backends[0]], totals[backend]) if name == 'total' else
+                               (largest[(backends[0], name)], largest[(backend, name)]))
+                print(f"  {backend:<8} {name:<26} {base / other if other else float('nan'):5.2f}x")
+
+
+def main() -> None:
+    """Benchmark command line"""
+
+    argparser = argparse.ArgumentParser(
+        prog="python -m benchmarks.benchmark",
+        description="Times the idle config parser steps over synthetic exports.")
+    argparser.add_argument('--scales', default="1,2,4,8",
+                           help="Comma separated scale factors of the export (default 1,2,4,8).")
+    argparser.add_argument('--streaming', action="store_true", default=False,
+                           help="Streaming XML parser.")
+    argparser.add_argument('--backends', default="etree",
+                           help="Comma separated XML backends - etree, lxml (default etree).")
+    argparser.add_argument('--no-memory', action="store_false", default=True, dest="memory",
+                           help="Skips the peak memory pass.")
+    argparser.add_argument('--seed', type=int, default=1, help="Random seed (default 1).")
+    argparser.add_argument('--output', default=None, help="Writes the results to a CSV file.")
+    args = argparser.parse_args()
+
+    api_logger.setLevel(logging.WARNING)  # Parser success logs for every step & scale.
+    rows = run([float(scale) for scale in args.scales.split(',')],
+               streaming=args.streaming, memory=args.memory, seed=args.seed,
+               backends=tuple(args.backends.split(',')))
+    print_report(rows)
+    if args.output:
+        write_rows(args.output, RESULT_HEADERS, rows)
+
+
+if __name__ == '__main__':
+    main()
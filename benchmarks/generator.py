@@ -0,0 +1,290 @@
+"""
+benchmarks.generator
+~~~~~~~~~~~~~~~~~~~~
+Synthetic ICS XML export generator.
+
+Writes a valid `xml.pulsesecure.net` export with configurable object counts - auth servers,
+realms & role mapping rules, roles, sign-in URLs, every resource policy family
+(src.xpath.rspolicy), every resource profile family (src.xpath.rsprofile) and ESAP/client
+package blobs (large sections that are not read by the checker). Output is deterministic for
+the same counts & seed, and written incrementally - large exports don't need to fit in memory.
+
+Usage:
+    python -m benchmarks.generator OUTPUT_FILE [--scale N] [--seed N] [--<count> N ...]
+
+"""
+
+import argparse
+import random
+from base64 import b64encode
+from xml.sax.saxutils import escape
+from src.xpath import xpath_constants
+from src.xpath import rspolicy, rsprofile
+
+NAMESPACE = "http://xml.pulsesecure.net/system/9.1R14"
+
+# Base object counts (scale 1) - multiplied by the scale factor.
+DEFAULT_COUNTS = {
+    'auth_servers': 20,
+    'user_realms': 40,
+    'admin_realms': 4,
+    'rules': 3,             # Role mapping rules per realm.
+    'user_roles': 100,
+    'admin_roles': 6,
+    'signin_urls': 30,
+    'policies': 50,         # Policies per resource policy type.
+    'policy_roles': 3,      # Max. roles per resource policy.
+    'profiles': 40,         # Profiles per resource profile type.
+    'esap_size': 256 * 1024,     # ESAP package blob size in bytes.
+    'package_size': 256 * 1024,  # Client package blob size in bytes.
+}
+
+# Counts that are not multiplied by the scale factor (per-object fan-out).
+FIXED_COUNTS = ('rules', 'policy_roles')
+
+# Policy types without `parent-type` (src.xpath.rspolicy docstring).
+NON_PARENT_POLICIES = {
+    'WEB_SAML_ACCESS', 'WEB_SAML_SSO', 'WEB_CUSTOM_HEADER', 'WEB_CROSS_DOMAIN_ACL',
+    'WEB_PROXY_POLICY', 'WEB_PROTOCOL', 'WEB_ENCODING', 'WEB_SAML_EXTERNAL',
+    'NC_ACL', 'NC_CONNPROF', 'NC_STUNNEL', 'NC_BWIDTH', 'NC_NODE_CONNPROF'
+}
+
+# Policy types using the `role` tag instead of `roles` (src.iconfig.rspolicy CHG-02).
+ROLE_TAG_POLICIES = {'FILE_WIN_ACL', 'FILE_WIN_SSO_ACL', 'FILE_WIN_COMPRESS_ACL', 'NC_BWIDTH'}
+
+
+def _policy_names(prefix: str) -> list:
+    """Policy XPATH names of the family (ROOT excluded)."""
+    return [name for name in xpath_constants(rspolicy)
+            if name.startswith(prefix) and not name.endswith('_ROOT')]
+
+
+# Resource policy family section -> policy XPATH names (document order).
+POLICY_SECTIONS = [
+    ('web-policies', _policy_names('WEB_')),
+    ('file-policies', _policy_names('FILE_')),
+    ('sam-policies', _policy_names('SAM_')),
+    ('terminal-services-policies', _policy_names('TERM_SERV_')),
+    ('html5-access-policies', _policy_names('HTML5_')),
+    ('network-connect-policies', _policy_names('NC_')),
+]
+
+
+def _steps(path: str) -> list:
+    """Tag names of the XPATH, i.e., './/a/b' -> ['a', 'b']"""
+    return path.lstrip('./').split('/')
+
+
+def _blob(size: int, rng: random.Random) -> str:
+    """Base64 blob (ESAP/client packages) of about `size` bytes."""
+    return b64encode(rng.randbytes(size * 3 // 4)).decode('ascii')
+
+
+class ICSExportGenerator:
+    """
+    Synthetic ICS XML Export Generator
+
+    Attributes:
+        counts: object counts (see DEFAULT_COUNTS).
+        seed: random seed - same counts & seed give the same export.
+
+    """
+
+    def __init__(self, counts: dict = None, seed: int = 1) -> None:
+        self.counts = DEFAULT_COUNTS | (counts or {})
+        self.seed = seed
+        self._rng = random.Random(seed)
+        count = self.counts
+        self.auth_servers = [f"AuthServer-{i}" for i in range(count['auth_servers'])]
+        self.user_realms = [f"Realm-{i}" for i in range(count['user_realms'])]
+        self.admin_realms = ["Admin Users"] + [
+            f"AdminRealm-{i}" for i in range(count['admin_realms'] - 1)]
+        self.user_roles = [f"Role-{i}" for i in range(count['user_roles'])] + [
+            'Outlook Anywhere User Role']
+        self.admin_roles = ['.Administrators', '.Read-Only Administrators'] + [
+            f"AdminRole-{i}" for i in range(count['admin_roles'] - 2)]
+
+    @classmethod
+    def scaled(cls, scale: float, counts: dict = None, seed: int = 1) -> 'ICSExportGenerator':
+        """Generator with the base counts multiplied by the scale factor."""
+
+        base = DEFAULT_COUNTS | (counts or {})
+        return cls({name: value if name in FIXED_COUNTS else max(1, int(value * scale))
+                    for name, value in base.items()}, seed=seed)
+
+    def write(self, filename: str) -> None:
+        """Writes the XML export file."""
+
+        with open(filename, mode='w', encoding='utf-8') as file_handle:
+            for chunk in self.chunks():
+                file_handle.write(chunk)
+
+    def chunks(self):
+        """XML export content - one chunk per config object."""
+
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield (f'<configuration xmlns="{NAMESPACE}" '
+               'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">\n')
+        yield from self._authentication()
+        yield from self._users()
+        yield from self._administrators()
+        yield from self._signin()
+        yield from self._resource_policies()
+        yield from self._resource_profiles()
+        yield from self._misc()
+        yield from self._packages()
+        yield '</configuration>\n'
+
+    def _choice(self, values: list) -> str:
+        return escape(self._rng.choice(values))
+
+    def _realm(self, name: str, roles: list) -> str:
+        """Realm with the auth servers & role mapping rules"""
+
+        # Only half of the auth servers & 3/4 of the roles are used - the rest stay idle.
+        servers = self.auth_servers[:max(1, len(self.auth_servers) // 2)]
+        mapped = roles[:max(1, len(roles) * 3 // 4)]
+        rules = ''.join(
+            f'<rule><name>rule-{i}</name><expression>username = "*"</expression>'
+            f'<roles>{self._choice(mapped)}</roles></rule>'
+            for i in range(self.counts['rules']))
+        return (
+            f'<realm><name>{escape(name)}</name>'
+            f'<authentication-server>{self._choice(servers)}</authentication-server>'
+            f'<directory-server>{self._choice(servers + ["None"])}</directory-server>'
+            f'<accounting-server>None</accounting-server>'
+            f'<secondary-authentication-settings><name>{self._choice(servers + ["-"])}</name>'
+            f'</secondary-authentication-settings>'
+            f'<role-mapping-rules>{rules}</role-mapping-rules></realm>')
+
+    def _authentication(self):
+        yield '<authentication><auth-servers>'
+        for name in self.auth_servers:
+            yield (f'<auth-server><name>{escape(name)}</name><ldap><server>ldap.example.com'
+                   '</server><port>389</port></ldap></auth-server>')
+        yield '</auth-servers></authentication>\n'
+
+    def _users(self):
+        yield '<users><user-realms>'
+        for name in self.user_realms:
+            yield self._realm(name, self.user_roles)
+        yield '</user-realms><user-roles>'
+        for name in self.user_roles:
+            yield (f'<user-role><name>{escape(name)}</name><general><overview>'
+                   '<description/></overview></general></user-role>')
+        yield '</user-roles></users>\n'
+
+    def _administrators(self):
+        yield '<administrators><admin-realms>'
+        for name in self.admin_realms:
+            yield self._realm(name, self.admin_roles)
+        yield '</admin-realms><admin-roles>'
+        for name in self.admin_roles:
+            yield f'<admin-role><name>{escape(name)}</name></admin-role>'
+        yield '</admin-roles></administrators>\n'
+
+    def _signin(self):
+        yield '<signin><access-urls>'
+        for i in range(self.counts['signin_urls']):
+            enabled = self._choice(['true', 'true', 'false'])
+            realms = ''.join(f'<realms>{self._choice(self.user_realms)}</realms>'
+                             for _ in range(2))
+            yield (f'<access-url><url-pattern>*/user{i}/</url-pattern><enabled>{enabled}'
+                   f'</enabled><user>{realms}</user></access-url>')
+        for i, realm in enumerate(self.admin_realms):
+            enabled = self._choice(['true', 'false'])
+            yield (f'<access-url><url-pattern>*/admin{i}/</url-pattern><enabled>{enabled}'
+                   f'</enabled><admin><realms>{escape(realm)}</realms></admin></access-url>')
+        yield '</access-urls></signin>\n'
+
+    def _policy(self, name: str, tag: str, parent: bool, role_tag: str) -> str:
+        """Resource policy with its role selection"""
+
+        roles = ''.join(f'<{role_tag}>{self._choice(self.user_roles)}</{role_tag}>'
+                        for _ in range(self._rng.randint(0, self.counts['policy_roles'])))
+        parent_type = (f'<parent-type>{self._choice(["none", "none", "web-acl"])}</parent-type>'
+                       if parent else '')
+        return (f'<{tag}><name>{escape(name)}</name>{parent_type}'
+                f'<apply>{self._choice(["all", "selected", "except"])}</apply>{roles}</{tag}>')
+
+    def _resource_policies(self):
+        yield '<resource-policies>'
+        for section, names in POLICY_SECTIONS:
+            yield f'<{section}>'
+            for name in names:
+                steps = _steps(getattr(rspolicy, name))
+                tag = steps[-1]
+                role_tag = 'role' if name in ROLE_TAG_POLICIES else 'roles'
+                if len(steps) > 1:
+                    yield f'<{steps[0]}>'
+                for i in range(self.counts['policies']):
+                    yield self._policy(
+                        f"{tag}-{i}", tag, name not in NON_PARENT_POLICIES, role_tag)
+                if len(steps) > 1:
+                    yield f'</{steps[0]}>'
+            yield f'</{section}>'
+        yield '</resource-policies>\n'
+
+    def _profiles(self, path: str):
+        group, tag = _steps(path)
+        yield f'<{group}>'
+        for i in range(self.counts['profiles']):
+            role = self._rng.random() < 0.7  # 30% of the profiles are not mapped to any role.
+            roles = f'<roles>{self._choice(self.user_roles)}</roles>' if role else '<roles/>'
+            yield f'<{tag}><name>{tag}-{i}</name>{roles}</{tag}>'
+        yield f'</{group}>'
+
+    def _resource_profiles(self):
+        yield '<resource-profiles>'
+        yield from self._profiles(rsprofile.WEB_PROF)
+        yield from self._profiles(rsprofile.FILE_PROF)
+        yield '<sam-profiles>'
+        yield from self._profiles(rsprofile.SAM_PROF_CAPP)
+        yield from self._profiles(rsprofile.SAM_PROF_DEST)
+        yield '</sam-profiles>'
+        yield from self._profiles(rsprofile.TERMSERV_PROF)
+        yield from self._profiles(rsprofile.VDI_PROF)
+        yield from self._profiles(rsprofile.HTML5_PROF)
+        yield '</resource-profiles>\n'
+
+    def _misc(self):
+        yield ('<users-aoa><authorization-only-policies><authorization-only-policy>'
+               f'<name>aoa-0</name><role-option>{self._choice(self.user_roles)}</role-option>'
+               '</authorization-only-policy></authorization-only-policies></users-aoa>\n')
+        yield ('<vpn-tunneling><ike-options><port-realm-mappings><port-realm><port>500</port>'
+               f'<realm>{self._choice(self.user_realms)}</realm></port-realm>'
+               '</port-realm-mappings><realm-protocol-mappings><realm-protocol>'
+               f'<realm>{self._choice(self.user_realms)}</realm></realm-protocol>'
+               '</realm-protocol-mappings></ike-options></vpn-tunneling>\n')
+
+    def _packages(self):
+        yield (f'<host-checker><esap><package><name>esap-4.0</name>'
+               f'<data>{_blob(self.counts["esap_size"], self._rng)}</data></package>'
+               '</esap></host-checker>\n')
+        yield (f'<client-packages><package><name>pulse-client</name>'
+               f'<data>{_blob(self.counts["package_size"], self._rng)}</data></package>'
+               '</client-packages>\n')
+
+
+def main() -> None:
+    """Generator command line"""
+
+    argparser = argparse.ArgumentParser(
+        prog="python -m benchmarks.generator",
+        description="Writes a synthetic ICS XML export for benchmarking.")
+    argparser.add_argument('output', metavar="OUTPUT_FILE", help="XML export filepath")
+    argparser.add_argument('--scale', type=float, default=1.0,
+                           help="Multiplies all the base object counts (default 1).")
+    argparser.add_argument('--seed', type=int, default=1, help="Random seed (default 1).")
+    for name, value in DEFAULT_COUNTS.items():
+        argparser.add_argument(f"--{name.replace('_', '-')}", type=int, default=None,
+                               dest=name, help=f"Base count (default {value}).")
+    args = argparser.parse_args()
+
+    counts = {name: getattr(args, name) for name in DEFAULT_COUNTS
+              if getattr(args, name) is not None}
+    ICSExportGenerator.scaled(args.scale, counts, seed=args.seed).write(args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -18,9 +18,13 @@ import logging
 import os
 import sys
 import argparse
+from contextlib import nullcontext, redirect_stdout
 from time import strftime
-from csv import DictWriter
-from src import ICSIdleConfig, ICSRSPolicy, ICSRSProfile
+from src import __version__, ICSModelCache, ICSMemoryBudget, ICSConfigDiff
+from src.api.backend import BACKENDS
+from src.api.source import export_name
+from src.iconfig.findings import ICSFindingsWriter
+from src.pipeline import ICSPipeline, ICSProfiler, ICSSpoolWatcher, collect_exports, run_batch
 
 
 # Console Logging handler.
@@ -67,251 +71,302 @@ optargs.add_argument(
     dest="csv_report")
 
 argparser.add_argument(
-    'file',
-    metavar="XML_EXPORT_FILE",
+    '--format',
     action="store",
-    help="Path to XML export file")
-
-args = argparser.parse_args() # Init the argsparser.
-
-timestr = strftime("%d-%m-%Y-%H%M%S")
-
-def pprint(data):
-    """Unpacks the items and print it"""
-    for item_ in data:
-        print(item_)
+    choices=('csv', 'ndjson'),
+    help="Report format - csv (default) or ndjson (one JSON object per finding, streamed as the checks complete - replaces the CSV reports).",
+    default='csv',
+    dest="format")
 
-config = ICSIdleConfig(args.file)
-
-# Calling the pipeline method.
-
-print()
-config.idle_configs() # Executes all Idle config methods & resource policy parser.
-print()
-
-def results_dir() -> None:
-    """Results directory creator"""
+argparser.add_argument(
+    '--output',
+    action="store",
+    help="NDJSON findings file (default: idle_findings.ndjson under the results folder) - '-' writes the findings to stdout (logs & console output go to stderr).",
+    default=None,
+    dest="output")
 
-    if 'results' not in os.listdir():
-        os.mkdir('results')
-    os.mkdir(fr"results\{timestr}")
-    os.mkdir(fr"results\{timestr}\resource_policies")
+argparser.add_argument(
+    '--sqlite',
+    metavar="SQLITE_DB",
+    action="store",
+    help="Exports the extracted config model (auth servers, realms, sign-in URLs, roles, resource policies & profiles with their references) to the SQLite database.",
+    default=None,
+    dest="sqlite")
 
-def console_output() -> None:
-    """Enables the Console output"""
+argparser.add_argument(
+    '--delete-config',
+    action="store_true",
+    help="Generates the XML delete config (delete_config/ under the results folder) of the idle config objects & resource profiles - import-ready xc:operation delete bundles & manifest.json listing the import order.",
+    default=False,
+    dest="delete_config")
 
-    print("****** TOTAL CONFIGS ******")
-    print()
+argparser.add_argument(
+    '--delete-bundle-objects',
+    action="store",
+    type=int,
+    help="Maximum number of objects per XML delete config bundle (default: no limit).",
+    default=None,
+    dest="delete_bundle_objects")
 
-    logger.info("Total Admin Realms - %d\n", len(config.total_admin_realms))
-    logger.info("Total User Realms - %d\n", len(config.total_user_realms))
-    logger.info(
-    "Total Authentication servers - %d\n", len(config.total_auth_servers))
-    logger.info("Total Admin Roles - %d\n", len(config.total_admin_roles))
-    logger.info("Total User Roles - %d\n", len(config.total_user_roles))
+argparser.add_argument(
+    '--delete-bundle-size',
+    action="store",
+    type=int,
+    help="Maximum size of an XML delete config bundle in KB (default: no limit).",
+    default=None,
+    dest="delete_bundle_size")
 
-    print()
-    print("****** MISC CONFIGS ******")
-    print()
+argparser.add_argument(
+    '--streaming',
+    action="store_true",
+    help="Streaming XML parser - keeps only the required config objects in memory (large XML exports).",
+    default=False,
+    dest="streaming")
 
-    logger.info("AOA Role mappings - %d\n", len(config.aoa_roles))
-    logger.info("IKEv2 Realm mappings - %d\n", len(config.ikev2_realms))
+argparser.add_argument(
+    '--xml-backend',
+    action="store",
+    choices=BACKENDS,
+    help="XML parser backend - etree (default, Python stdlib), lxml (requires lxml) or auto (lxml if installed).",
+    default='etree',
+    dest="xml_backend")
 
-    print()
-    print("****** IDLE CONFIGS ******")
-    print()
+argparser.add_argument(
+    '--cache-dir',
+    action="store",
+    help="Caches the parsed config model under this directory - re-runs on the same XML export skip parsing.",
+    default=None,
+    dest="cache_dir")
 
-    logger.info("Idle Admin realms - %d\n", len(config.idle_admin_realms))
-    pprint(config.idle_admin_realms)
-    print()
+argparser.add_argument(
+    '--cache-size',
+    action="store",
+    type=int,
+    help="Maximum size of the cache directory in MB - least recently used models are removed (default 512).",
+    default=512,
+    dest="cache_size")
 
-    logger.info("Idle User realms - %d\n", len(config.idle_user_realms))
-    pprint(config.idle_user_realms)
-    print()
+argparser.add_argument(
+    '--max-memory',
+    action="store",
+    type=int,
+    help="Memory budget in MB - streaming parser is selected if the estimated XML DOM size exceeds it and intermediate data is spilled to disk if its estimated size exceeds the remaining budget.",
+    default=None,
+    dest="max_memory")
 
-    logger.info("Idle Admin sign-in urls - %d\n", len(config.idle_admin_urls))
-    pprint(config.idle_admin_urls)
-    print()
+argparser.add_argument(
+    '--baseline',
+    metavar="BASELINE_XML_EXPORT_FILE",
+    action="store",
+    help="Previous XML export of the same appliance - reports the idle objects added/removed since then.",
+    default=None,
+    dest="baseline")
 
-    logger.info("Idle User sign-in urls - %d\n", len(config.idle_user_urls))
-    pprint(config.idle_user_urls)
-    print()
+argparser.add_argument(
+    '--jobs',
+    action="store",
+    type=int,
+    help="Runs the independent pipeline stages concurrently on JOBS worker threads (default 1 - sequential).",
+    default=1,
+    dest="jobs")
 
-    logger.info("Idle Admin sign-in realms - %d\n", len(config.idle_signin_admin_realm))
-    pprint(config.idle_signin_admin_realm)
-    print()
+argparser.add_argument(
+    '--batch',
+    action="store_true",
+    help="Fleet batch mode - XML_EXPORT_FILE is a directory or glob pattern of XML exports.",
+    default=False,
+    dest="batch")
 
-    logger.info("Idle User sign-in realms - %d\n", len(config.idle_signin_user_realm))
-    pprint(config.idle_signin_user_realm)
-    print()
+argparser.add_argument(
+    '--watch',
+    action="store_true",
+    help="Watch mode - XML_EXPORT_FILE is a spool directory, new or changed XML exports are analyzed once fully written (runs until interrupted).",
+    default=False,
+    dest="watch")
 
-    logger.info("Idle Authentication servers - %d\n",
-            len(config.idle_auth_servers))
-    pprint(config.idle_auth_servers)
-    print()
+argparser.add_argument(
+    '--poll-interval',
+    action="store",
+    type=float,
+    help="Seconds between the spool directory scans in watch mode - an export is analyzed once unchanged for this long (default 5).",
+    default=5.0,
+    dest="poll_interval")
 
-    logger.info("Idle Admin roles - %d\n", len(config.idle_admin_roles))
-    pprint(config.idle_admin_roles)
-    print()
+argparser.add_argument(
+    '--workers',
+    action="store",
+    type=int,
+    help="Maximum number of worker processes in batch & watch mode (default: CPU count).",
+    default=None,
+    dest="workers")
 
-    logger.info("Idle User roles - %d\n", len(config.idle_user_roles))
-    pprint(config.idle_user_roles)
-    print()
+argparser.add_argument(
+    '--profile',
+    action="store_true",
+    help="Saves the wall-clock time of each pipeline stage to a JSON report (profile/stage_timings.json under the results folder).",
+    default=False,
+    dest="profile")
 
-def csv_report() -> None:
-    """Enables CSV report"""
-
-    max_len = max(
-        len(config.idle_auth_servers),
-        len(config.idle_user_realms),
-        len(config.idle_user_roles),
-        len(config.idle_admin_realms),
-        len(config.idle_admin_roles),
-        len(config.idle_user_urls),
-        len(config.idle_admin_urls),
-        len(config.idle_signin_user_realm),
-        len(config.idle_signin_admin_realm)
-    )
-
-    def fill_entries(data_list: list):
-        """Fill entries of the list with NULL as padding"""
-        if len(data_list) < max_len:
-            diff = max_len - len(data_list)
-            length = len(data_list)
-            for item_ in range(diff):
-                data_list.insert((length+item_), " ")
-            return data_list
-        return data_list
-
-    iauth_servers = fill_entries(list(config.idle_auth_servers))
-    iuser_realms = fill_entries(list(config.idle_user_realms))
-    iuser_roles = fill_entries(list(config.idle_user_roles))
-    iuser_urls = fill_entries(list(config.idle_user_urls))
-    iadmin_urls = fill_entries(list(config.idle_admin_urls))
-    iadmin_realms = fill_entries(list(config.idle_admin_realms))
-    iadmin_roles = fill_entries(list(config.idle_admin_roles))
-    iuser_signin = fill_entries(list(config.idle_signin_user_realm))
-    iadmin_signin = fill_entries(list(config.idle_signin_admin_realm))
-
-    with open(
-        fr"results\{timestr}\idle_config_report.csv", mode='w', encoding='utf-8', newline=''
-    ) as file_handle:
-        headers = ["IDLE_AUTH_SERVERS", "IDLE_USER_REALMS",
-                "IDLE_USER_ROLES", "IDLE_ADMIN_REALMS", "IDLE_ADMIN_ROLES",
-                "IDLE_USER_URLS", "IDLE_ADMIN_URLS", "IDLE_SIGNIN_USER_REALMS",
-                "IDLE_SIGNIN_ADMIN_REALMS"]
-        write_output = DictWriter(file_handle, dialect='excel', fieldnames=headers)
-        write_output.writeheader()
-
-        for item in range(max_len):
-
-            write_output.writerow(
-                {
-                    headers[0]: iauth_servers[item],
-                    headers[1]: iuser_realms[item],
-                    headers[2]: iuser_roles[item],
-                    headers[3]: iadmin_realms[item],
-                    headers[4]: iadmin_roles[item],
-                    headers[5]: iuser_urls[item],
-                    headers[6]: iadmin_urls[item],
-                    headers[7]: iuser_signin[item],
-                    headers[8]: iadmin_signin[item]
-                }
-            )
-    print()
+argparser.add_argument(
+    '--profile-pstats',
+    action="store_true",
+    help="Also dumps the cProfile stats of each pipeline stage (profile/<stage>.pstats) - stages run sequentially.",
+    default=False,
+    dest="profile_pstats")
 
-def rs_policy_parser() -> None:
-    """Pipeline for all CSV write operations"""
+argparser.add_argument(
+    '--profile-memory',
+    action="store_true",
+    help="Saves the allocation peak, retained memory, RSS & top allocation sites of each pipeline stage (profile/stage_memory.json) - slower, stages run sequentially.",
+    default=False,
+    dest="profile_memory")
 
-    logger.info("Parsing Resource policy dependencies.")
+argparser.add_argument(
+    'file',
+    metavar="XML_EXPORT_FILE",
+    action="store",
+    help="Path to XML export file - plain or gzip/bz2/xz/zip compressed (directory or glob pattern in batch mode, spool directory in watch mode)")
 
-    rs_policy = ICSRSPolicy(args.file, config.idle_user_roles)
-    rs_policy.rs_policies()
+def diff_report(args: argparse.Namespace, results_path: str) -> None:
+    """Baseline diff mode - idle objects added/removed since the baseline XML export"""
 
-    rs_policy.write_web_policies(fr"results\{timestr}\resource_policies\web_policy.csv")
-    rs_policy.write_file_policies(fr"results\{timestr}\resource_policies\file_policy.csv")
-    rs_policy.write_sam_policies(fr"results\{timestr}\resource_policies\sam_policy.csv")
-    rs_policy.write_termsrv_policies(fr"results\{timestr}\resource_policies\termsrv_policy.csv")
-    rs_policy.write_html5_policies(fr"results\{timestr}\resource_policies\html5_policy.csv")
-    rs_policy.write_vpntunnel_policies(fr"results\{timestr}\resource_policies\vpn_policy.csv")
+    streaming = args.streaming
+    if not streaming and args.max_memory:
+        budget = ICSMemoryBudget(args.max_memory * 1024 * 1024)
+        streaming = any(budget.streaming(xml_file) for xml_file in (args.baseline, args.file))
 
+    diff = ICSConfigDiff(
+        args.baseline, args.file, streaming=streaming, backend=args.xml_backend)
     print()
-
-def rs_profile_parser() -> None:
-    """Pipeline for RS profiles"""
-
-    logger.info("Parsing Idle Resource Profiles.")
-
-    rs_profile = ICSRSProfile(args.file)
-    rs_profile.rs_profiles()
-
-    max_len = max(
-        len(rs_profile.web_profiles_),
-        len(rs_profile.file_profiles_),
-        len(rs_profile.sam_profiles_capp_),
-        len(rs_profile.sam_profiles_dest_),
-        len(rs_profile.termsrv_profiles_),
-        len(rs_profile.html5_profiles_),
-        len(rs_profile.vdi_profiles_)
-    )
-
-    def fill_entries(data_list: list):
-        """Fill entries of the list with NULL as padding"""
-        if len(data_list) < max_len:
-            diff = max_len - len(data_list)
-            length = len(data_list)
-            for item_ in range(diff):
-                data_list.insert((length+item_), " ")
-            return data_list
-        return data_list
-
-    eweb_profiles = fill_entries(rs_profile.web_profiles_)
-    efile_profiles = fill_entries(rs_profile.file_profiles_)
-    esam_profiles_capp = fill_entries(rs_profile.sam_profiles_capp_)
-    esam_profiles_dest = fill_entries(rs_profile.sam_profiles_dest_)
-    eterm_profiles = fill_entries(rs_profile.termsrv_profiles_)
-    evdi_profiles = fill_entries(rs_profile.vdi_profiles_)
-    ehtml5_profiles = fill_entries(rs_profile.html5_profiles_)
-
-    with open(
-            fr"results\{timestr}\idle_resource_profiles.csv", mode='w', encoding='utf-8', newline=''
-        ) as file_handle:
-        headers = ["WEB_PROFILES", "FILE_PROFILES", "SAM_CLIENT_APPS", "SAM_DESTS",
-        "TERMSERV_PROFILES", "VDI_PROFILES", "HTML5_PROFILES"]
-        write_output = DictWriter(file_handle, dialect='excel', fieldnames=headers)
-        write_output.writeheader()
-
-        for item in range(max_len):
-
-            write_output.writerow(
-                {
-                    headers[0]: eweb_profiles[item],
-                    headers[1]: efile_profiles[item],
-                    headers[2]: esam_profiles_capp[item],
-                    headers[3]: esam_profiles_dest[item],
-                    headers[4]: eterm_profiles[item],
-                    headers[5]: evdi_profiles[item],
-                    headers[6]: ehtml5_profiles[item]
-                })
+    diff.compare()
     print()
 
-
-# Output control flow.
-
-if args.csv_report:
-    console_output() # User opted to disable csv_report
-
-elif args.console_output:
-    results_dir()
-    csv_report() # User opted to disable console output.
-    rs_policy_parser()
-    rs_profile_parser()
+    if not args.console_output:
+        print("****** IDLE CONFIG CHANGES ******")
+        print()
+        diff.console_output()
+
+    if not args.csv_report:
+        os.makedirs(results_path)
+        diff.write_csv(os.path.join(results_path, "idle_config_diff.csv"))
+        logger.info("Diff report saved under 'results' folder (created under current working directory).\n")
+
+def batch_report(args: argparse.Namespace, results_path: str) -> None:
+    """Fleet batch mode - CSV reports for each XML export & consolidated fleet summary"""
+
+    exports = collect_exports(args.file)
+    if not exports:
+        logger.error("No XML export files found - %s\n", args.file)
+        sys.exit(1)
+
+    logger.info("Analyzing %d XML export files.\n", len(exports))
+    run_batch(
+        exports,
+        results_path,
+        workers=args.workers,
+        streaming=args.streaming,
+        cache_dir=args.cache_dir,
+        cache_size=args.cache_size * 1024 * 1024,
+        version=__version__,
+        max_memory=args.max_memory * 1024 * 1024 if args.max_memory else None,
+        backend=args.xml_backend,
+        output_format=args.format)
     logger.info("Reports saved under 'results' folder (created under current working directory).\n")
 
-else: # Default will execute all methods.
-    console_output()
-    results_dir()
-    csv_report()
-    rs_policy_parser()
-    rs_profile_parser()
-    logger.info("Reports saved under 'results' folder (created under current working directory).\n")
+def watch_report(args: argparse.Namespace, results_path: str) -> None:
+    """Watch mode - reports for each XML export dropped into the spool directory"""
+
+    watcher = ICSSpoolWatcher(
+        args.file,
+        results_path,
+        workers=args.workers,
+        poll_interval=args.poll_interval,
+        streaming=args.streaming,
+        cache_dir=args.cache_dir,
+        cache_size=args.cache_size * 1024 * 1024,
+        version=__version__,
+        max_memory=args.max_memory * 1024 * 1024 if args.max_memory else None,
+        backend=args.xml_backend,
+        output_format=args.format)
+    watcher.run()
+    logger.info("Reports saved under '%s'.\n", results_path)
+
+def findings_output(args: argparse.Namespace, results_path: str):
+    """NDJSON findings stream - stdout ('-') or the output file (results folder by default)"""
+
+    if args.output == '-':
+        consoleHandler.setStream(sys.stderr)  # stdout is reserved for the findings.
+        return sys.stdout
+
+    output = args.output or os.path.join(results_path, "idle_findings.ndjson")
+    os.makedirs(os.path.dirname(output) or os.curdir, exist_ok=True)
+    return open(output, mode='w', encoding='utf-8')
+
+def main() -> None:
+    """Script entry point"""
+
+    args = argparser.parse_args() # Init the argsparser.
+
+    timestr = strftime("%d-%m-%Y-%H%M%S")
+    results_path = os.path.join("results", timestr)
+
+    if args.baseline:
+        diff_report(args, results_path)
+        return
+
+    if args.batch:
+        batch_report(args, results_path)
+        return
+
+    if args.watch:
+        watch_report(args, results_path)
+        return
+
+    cache = ICSModelCache(
+        args.cache_dir, __version__, max_size=args.cache_size * 1024 * 1024) if args.cache_dir else None
+    budget = ICSMemoryBudget(args.max_memory * 1024 * 1024) if args.max_memory else None
+    profile_path = os.path.join(results_path, "profile")
+    profiler = ICSProfiler(
+        pstats_dir=profile_path if args.profile_pstats else None,
+        memory=args.profile_memory
+    ) if args.profile or args.profile_pstats or args.profile_memory else None
+    output = findings_output(args, results_path) if args.format == 'ndjson' else None
+    findings = ICSFindingsWriter(output, export_name(args.file)) if output is not None else None
+    pipeline = ICSPipeline(
+        args.file, results_path, streaming=args.streaming, cache=cache, budget=budget,
+        profiler=profiler, backend=args.xml_backend,
+        bundle_objects=args.delete_bundle_objects,
+        bundle_bytes=args.delete_bundle_size * 1024 if args.delete_bundle_size else None,
+        findings=findings,
+        sqlite=args.sqlite)
+
+    # Output control flow - disable flags are mutually exclusive, default runs both.
+    # NDJSON findings replace the CSV reports - console output goes to stderr if they are on stdout.
+    reports = not args.csv_report and findings is None
+    with redirect_stdout(sys.stderr) if output is sys.stdout else nullcontext():
+        pipeline.run(
+            console_output=not args.console_output,
+            reports=reports,
+            workers=args.jobs,
+            delete_config=args.delete_config)
+
+    if findings is not None and output is not sys.stdout:
+        output.close()
+        logger.info("%d findings saved to '%s'.\n", findings.count, output.name)
+    if reports or args.delete_config:
+        logger.info("Reports saved under 'results' folder (created under current working directory).\n")
+
+    pipeline.close() # Releases the XML tree after the last parser.
+
+    if profiler is not None:
+        os.makedirs(profile_path, exist_ok=True)
+        details = {"xml_file": args.file, "version": __version__,
+                   "streaming": pipeline.streaming, "jobs": args.jobs,
+                   "xml_backend": args.xml_backend}
+        profiler.write(os.path.join(profile_path, "stage_timings.json"), **details)
+        if profiler.memory:
+            profiler.write_memory(os.path.join(profile_path, "stage_memory.json"), **details)
+        logger.info("Profile reports saved under '%s'.\n", profile_path)
+
+if __name__ == '__main__':
+    main()
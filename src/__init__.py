@@ -1,10 +1,16 @@
 """
 ICS Idle Config using XML Backup
 """
+__version__ = '1.1.0'
+
 import logging
+from .api.parser import ICSXMLDocument
+from .api.cache import ICSModelCache
+from .api.memory import ICSMemoryBudget
 from .iconfig.config import ICSIdleConfig
 from .iconfig.rspolicy import ICSRSPolicy
 from .iconfig.rsprofile import ICSRSProfile
+from .iconfig.diff import ICSConfigDiff
 from .idelete.xcoperation import ICSXCOperation
 
 logging.getLogger(__name__).addHandler(logging.NullHandler())
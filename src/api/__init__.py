@@ -3,5 +3,5 @@ Ivanti Connect Secure (ICS) Idle Config - XML Parser API.
 
 """
 
-from .parser import ICSXMLParser, Optional
+from .parser import ICSXMLParser, ICSXMLDocument, Optional
 from .logger import logger, LOGGER
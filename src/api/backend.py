@@ -0,0 +1,169 @@
+"""
+src.api.backend
+~~~~~~~~~~~~~~~
+ICS XML Config Parser - XML backends (ElementTree or lxml).
+
+The parser wrapper (ICSXMLParser) reaches the XML library through a backend only - parsing,
+streaming (iterparse) and the element queries of the record fields (`_element_*` methods).
+
+    etree - Python stdlib ElementTree (default, no dependencies).
+    lxml - lxml C parser, element queries run as compiled XPath (`pip install lxml`).
+    auto - lxml if installed, ElementTree otherwise.
+
+lxml parses ~2x faster (much faster with large text nodes - ESAP & client packages of
+compressed exports), but element access from Python is slower than ElementTree (element
+proxies), so the tag index & record parsing take longer. Compare both with the benchmark
+runner (`python -m benchmarks.benchmark --backends etree,lxml`) before switching.
+
+Element queries are compiled once per path - tags are qualified with the XML namespace up
+front, so no namespace mapping is resolved per query (ElementTree queries with a namespaces
+dict are ~10x slower than the same query in `{namespace}tag` form).
+
+"""
+
+import threading
+from typing import Optional
+import xml.etree.ElementTree as ET
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # Optional dependency.
+    lxml_etree = None
+
+BACKENDS = ('auto', 'etree', 'lxml')
+
+# XML parsing errors of the backends (both have the `msg` attribute).
+PARSE_ERRORS = (ET.ParseError,) + ((lxml_etree.XMLSyntaxError,) if lxml_etree is not None else ())
+
+# Path steps kept as they are while qualifying the tags.
+PLAIN_STEPS = ('', '.', '..', '*')
+
+
+def qualify(path: str, prefix: str) -> Optional[str]:
+    """Prefixes the tags of the path, i.e., `user/realms` -> `{ns}user/{ns}realms`.
+    None if the path has predicates or prefixed tags (left to the namespaces mapping)."""
+
+    if '[' in path or ':' in path or '{' in path:
+        return None
+    return '/'.join(step if step in PLAIN_STEPS else f'{prefix}{step}' for step in path.split('/'))
+
+
+class ICSEtreeBackend:
+    """Python stdlib ElementTree backend"""
+
+    name = 'etree'
+
+    def __init__(self) -> None:
+        self._paths = {}  # (path, namespace) -> qualified path.
+
+    def _qualified(self, path: str, nsmap: dict) -> tuple:
+        """Qualified path & namespaces mapping for the ElementTree queries."""
+
+        key = (path, nsmap.get('', ''))
+        qualified = self._paths.get(key)
+        if qualified is None:
+            namespace = key[1]
+            compiled = qualify(path, f'{{{namespace}}}') if namespace else path
+            qualified = self._paths[key] = (compiled, None) if compiled else (path, nsmap)
+        return qualified
+
+    def parse(self, source) -> ET.ElementTree:
+        """Parses the XML source (filename or binary file object) into a tree."""
+        return ET.parse(source)
+
+    def iterparse(self, source, events: tuple):
+        """Incremental parser - (event, element) pairs (see src.api.stream)."""
+        return ET.iterparse(source, events=events)
+
+    def tree(self, root) -> ET.ElementTree:
+        """Tree of the root element."""
+        return ET.ElementTree(root)
+
+    def find(self, element, path: str, nsmap: dict):
+        """First element matching the path under the element, None if not found."""
+        path, namespaces = self._qualified(path, nsmap)
+        return element.find(path, namespaces)
+
+    def findall(self, element, path: str, nsmap: dict) -> list:
+        """Elements matching the path under the element (document order)."""
+        path, namespaces = self._qualified(path, nsmap)
+        return element.findall(path, namespaces)
+
+
+class ICSLxmlBackend(ICSEtreeBackend):
+    """
+    lxml backend - C parser & compiled XPath element queries.
+
+    ElementPath paths (default namespace) are compiled once per thread into XPath objects
+    with a namespace prefix (compiled XPath objects are not shared between threads).
+    """
+
+    name = 'lxml'
+    PREFIX = 'ics'
+
+    def __init__(self) -> None:
+        if lxml_etree is None:
+            raise ImportError("lxml is not installed - pip install lxml")
+        super().__init__()
+        # Comments & PIs are dropped like ElementTree does, huge_tree allows the large
+        # base64 text nodes of the ESAP & client packages.
+        self._options = {'remove_comments': True, 'remove_pis': True, 'huge_tree': True}
+        self._local = threading.local()
+
+    def parse(self, source):
+        return lxml_etree.parse(source, lxml_etree.XMLParser(**self._options))
+
+    def iterparse(self, source, events: tuple):
+        return lxml_etree.iterparse(source, events=events, **self._options)
+
+    def tree(self, root):
+        return root.getroottree()
+
+    def _xpath(self, path: str, nsmap: dict):
+        """Compiled XPath of the ElementPath path (cached per thread)."""
+
+        cache = getattr(self._local, 'xpaths', None)
+        if cache is None:
+            cache = self._local.xpaths = {}
+        namespace = nsmap.get('', '')
+        xpath = cache.get((path, namespace))
+        if xpath is None:
+            expression = qualify(path, f'{self.PREFIX}:') if namespace else None
+            if expression is not None:
+                xpath = lxml_etree.XPath(expression, namespaces={self.PREFIX: namespace})
+            else:
+                xpath = lxml_etree.XPath(path)
+            cache[(path, namespace)] = xpath
+        return xpath
+
+    def find(self, element, path: str, nsmap: dict):
+        elems = self._xpath(path, nsmap)(element)
+        return elems[0] if elems else None
+
+    def findall(self, element, path: str, nsmap: dict) -> list:
+        return self._xpath(path, nsmap)(element)
+
+
+_BACKENDS = {}  # Backend name -> shared backend instance.
+
+
+def get_backend(name: Optional[str] = None) -> ICSEtreeBackend:
+    """
+    Returns the XML backend.
+
+    Args:
+        name: etree (default - None), lxml or auto (lxml if installed, ElementTree otherwise).
+
+    Raises:
+        ValueError: unknown backend name.
+        ImportError: lxml backend requested, but lxml is not installed.
+    """
+
+    name = name or 'etree'
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown XML backend - {name} (supported: {', '.join(BACKENDS)})")
+    if name == 'auto':
+        name = 'lxml' if lxml_etree is not None else 'etree'
+    if name not in _BACKENDS:
+        _BACKENDS[name] = ICSLxmlBackend() if name == 'lxml' else ICSEtreeBackend()
+    return _BACKENDS[name]
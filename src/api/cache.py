@@ -0,0 +1,110 @@
+"""
+src.api.cache
+~~~~~~~~~~~~~
+Persistent on-disk cache of the extracted config model.
+
+The model (parsed results of ICSIdleConfig, ICSRSPolicy & ICSRSProfile) is stored with pickle
+under the cache directory, keyed by the SHA-256 hash of the XML export content, the tool
+version and the model layout version. Re-running the checker against the same XML export loads the model and skips the
+XML parsing completely.
+
+Cache size is bounded - least recently used models are evicted first.
+*Cache files are loaded with pickle - use a cache directory that only you can write to.
+
+"""
+
+import os
+import pickle
+from hashlib import sha256
+from typing import Optional
+from tempfile import NamedTemporaryFile
+from .logger import logger
+
+CACHE_SUFFIX = '.model'
+MODEL_VERSION = 2  # Config model layout (src.iconfig.model records) - part of the cache key.
+CHUNK_SIZE = 1024 * 1024
+
+
+class ICSModelCache:
+    """
+    ICS Config Model Cache
+
+    Attributes:
+        cache_dir: directory where the models are stored (created if not present).
+        version: tool version - models stored by other versions are not used.
+        max_size: maximum size of the cache directory in bytes.
+
+    """
+
+    def __init__(self, cache_dir: str, version: str, max_size: int = 512 * 1024 * 1024) -> None:
+        self.cache_dir = cache_dir
+        self.version = version
+        self.max_size = max_size
+        self._hashes = {}  # XML filepath -> content hash (hashed once per run).
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def file_hash(self, xml_file: str) -> str:
+        """SHA-256 hash of the file content."""
+
+        if xml_file not in self._hashes:
+            digest = sha256()
+            with open(xml_file, mode='rb') as file_handle:
+                for chunk in iter(lambda: file_handle.read(CHUNK_SIZE), b''):
+                    digest.update(chunk)
+            self._hashes[xml_file] = digest.hexdigest()
+        return self._hashes[xml_file]
+
+    def _path(self, xml_file: str) -> str:
+        """Cache filepath of the XML export model."""
+
+        return os.path.join(
+            self.cache_dir, f"{self.file_hash(xml_file)}-{self.version}-m{MODEL_VERSION}{CACHE_SUFFIX}")
+
+    def load(self, xml_file: str) -> Optional[dict]:
+        """Returns the cached model of the XML export. None if not cached (or unreadable)."""
+
+        path = self._path(xml_file)
+        try:
+            with open(path, mode='rb') as file_handle:
+                model = pickle.load(file_handle)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as exc:
+            logger.warning("Ignoring invalid cache file %s - %s", path, exc.__class__.__name__)
+            return None
+
+        os.utime(path)  # Marks the model as recently used.
+        return model
+
+    def store(self, xml_file: str, model: dict) -> None:
+        """Stores the model of the XML export and evicts the least recently used models
+        if the cache directory exceeds the maximum size."""
+
+        path = self._path(xml_file)
+        # Written to a temp file first, so other runs never read a partial model.
+        with NamedTemporaryFile(
+                mode='wb', dir=self.cache_dir, suffix='.tmp', delete=False) as file_handle:
+            pickle.dump(model, file_handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(file_handle.name, path)
+        self.evict(keep=path)
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Removes the least recently used models until the cache fits the maximum size.
+
+        Args:
+            keep: cache filepath that must not be removed (model that was just stored)."""
+
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(CACHE_SUFFIX):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            if keep is not None and os.path.samefile(path, keep):
+                continue
+            os.remove(path)
+            total -= size
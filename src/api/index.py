@@ -0,0 +1,117 @@
+"""
+src.api.index
+~~~~~~~~~~~~~
+ICS XML Config Parser - tag index.
+
+Index of the XML tree built with a single traversal - elements are grouped by their tag chain
+(tags from the root element to the element itself). XPATH objects of the `.//a/b/c` form are
+resolved by matching the end of the tag chains, so the queries don't walk the whole tree again.
+
+"""
+
+from array import array
+from heapq import merge
+from re import compile as re_compile
+from typing import Optional
+from xml.etree.ElementTree import Element
+
+# `.//a/b/c` - descendant path with plain tag names only (no predicates, wildcards).
+SIMPLE_PATH = re_compile(r'\.//([\w-]+(?:/[\w-]+)*)')
+
+
+class ICSTagIndex:
+    """
+    ICS XML Tag Index
+
+    Maps each tag chain of the XML tree to its elements (document order).
+
+    Attributes:
+        chains: tag chain tuples - chain id is the position in the list.
+        elements: elements list per chain id.
+        ordinals: document position of the elements per chain id (used for merging).
+
+    """
+
+    def __init__(self, root: Element) -> None:
+        """
+        Builds the index for the provided root element.
+
+        Args:
+            root: root element of the XML tree.
+        """
+
+        self.chains = [(root.tag,)]
+        self.elements = [[root]]
+        self.ordinals = [array('L', [0])]
+        self._queries = {}
+        self._build(root)
+
+    def _build(self, root: Element) -> None:
+        """Indexes all the elements under the root element (depth-first - document order)."""
+
+        children_ids = {}  # (parent chain id, tag) -> chain id.
+        ordinal = 0
+        stack = [(iter(root), 0)]
+
+        while stack:
+            children, parent_id = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                continue
+
+            ordinal += 1
+            chain_id = children_ids.get((parent_id, child.tag))
+            if chain_id is None:
+                chain_id = children_ids[(parent_id, child.tag)] = len(self.chains)
+                self.chains.append(self.chains[parent_id] + (child.tag,))
+                self.elements.append([])
+                self.ordinals.append(array('L'))
+            self.elements[chain_id].append(child)
+            self.ordinals[chain_id].append(ordinal)
+            if len(child):
+                stack.append((iter(child), chain_id))
+
+    def chain_ids(self, path: str, nsmap: dict) -> Optional[list]:
+        """Returns the ids of the tag chains matching the XPATH.
+        None if the path is not supported by the index."""
+
+        simple = SIMPLE_PATH.fullmatch(path)
+        if simple is None:
+            return None
+
+        namespace = nsmap.get('', '')
+        steps = tuple(f'{{{namespace}}}{tag}' if namespace else tag
+                      for tag in simple.group(1).split('/'))
+        size = len(steps)
+        # len(chain) > size -> root element is not part of the `.//` descendants.
+        return [chain_id for chain_id, chain in enumerate(self.chains)
+                if len(chain) > size and chain[-size:] == steps]
+
+    def findall(self, path: str, nsmap: dict) -> Optional[list]:
+        """Returns the elements matching the XPATH in document order.
+
+        Args:
+            path: XPATH string.
+            nsmap: XML namespace used for the tag names.
+
+        Returns:
+            List of elements, None if the path is not supported by the index."""
+
+        result = self._queries.get(path)
+        if result is not None:
+            return result
+
+        chain_ids = self.chain_ids(path, nsmap)
+        if chain_ids is None:
+            return None
+
+        if len(chain_ids) == 1:
+            result = self.elements[chain_ids[0]]
+        else:
+            result = [elem for _, elem in merge(
+                *(zip(self.ordinals[chain_id], self.elements[chain_id]) for chain_id in chain_ids),
+                key=lambda item: item[0])]
+
+        self._queries[path] = result
+        return result
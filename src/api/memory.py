@@ -0,0 +1,219 @@
+"""
+src.api.memory
+~~~~~~~~~~~~~~
+Memory budget for large XML exports.
+
+Before parsing, the DOM footprint is estimated from the XML export inventory (file size and
+element count - a cheap byte scan, nothing is parsed). If the estimate exceeds the budget,
+the streaming engine (src.api.stream) is used instead of the full DOM - same results, flat
+memory usage.
+
+The budget is checked again before the intermediate maps (idle role -> resource policy index)
+are built. Their footprint is estimated from the number of entries - if it exceeds the budget on
+top of the process memory (RSS), the map is built in a temporary SQLite database instead of in
+memory. The decision is made up front - the OOM killer usually ends the process before Python
+raises MemoryError.
+
+"""
+
+import os
+import sqlite3
+import sys
+from collections.abc import Mapping
+from tempfile import mkstemp
+from typing import Iterable, Iterator, Optional
+from weakref import finalize
+from .logger import logger
+from .source import open_export
+
+CHUNK_SIZE = 1024 * 1024
+
+# Approx. memory per parsed element (Element object, tag/text/attrib & tag index entries).
+ELEMENT_SIZE = 180
+
+# Approx. memory per in-memory map entry (list slot & share of the nested dicts).
+INDEX_ENTRY_SIZE = 140
+
+
+def inventory(xml_file: str) -> dict:
+    """
+    XML export inventory - file size & approx. element count.
+
+    Elements are counted from the start tags (`<` not followed by `/`, `?` or `!`), so the
+    file is scanned once in chunks without being parsed (compressed exports are decompressed
+    on the fly - size is the file size on disk). Sections skipped by the parser are not counted.
+    """
+
+    elements = 0
+    tail = b''
+    with open_export(xml_file, skip_sections=True) as file_handle:
+        for chunk in iter(lambda: file_handle.read(CHUNK_SIZE), b''):
+            chunk = tail + chunk
+            tail = chunk[-1:] if chunk.endswith(b'<') else b''  # Tag split between chunks.
+            chunk = chunk[:len(chunk) - len(tail)]
+            elements += (chunk.count(b'<') - chunk.count(b'</')
+                         - chunk.count(b'<?') - chunk.count(b'<!'))
+    return {'size': os.path.getsize(xml_file), 'elements': elements}
+
+
+def estimate_dom_size(xml_file: str) -> int:
+    """Estimated memory (bytes) of the full DOM of the XML export."""
+
+    return inventory(xml_file)['elements'] * ELEMENT_SIZE
+
+
+def process_memory() -> Optional[int]:
+    """Current memory (RSS) of the process in bytes. None if not supported by the platform."""
+
+    try:
+        with open('/proc/self/statm', encoding='utf-8') as file_handle:
+            return int(file_handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource  # Unix only - peak RSS (KB on Linux, bytes on macOS).
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def peak_process_memory() -> Optional[int]:
+    """Peak memory (RSS high-water mark) of the process in bytes. None if not supported."""
+
+    try:
+        with open('/proc/self/status', encoding='utf-8') as file_handle:
+            for line in file_handle:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource  # Unix only - peak RSS (KB on Linux, bytes on macOS).
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class ICSMemoryBudget:
+    """
+    ICS Memory Budget
+
+    Attributes:
+        limit: memory budget in bytes.
+        spill_dir: directory for the spilled maps (default - system temp directory).
+
+    """
+
+    def __init__(self, limit: int, spill_dir: Optional[str] = None) -> None:
+        self.limit = limit
+        self.spill_dir = spill_dir
+
+    def streaming(self, xml_file: str) -> bool:
+        """Returns True if the estimated DOM footprint of the XML export (on top of the current
+        process memory) exceeds the budget."""
+
+        estimate = estimate_dom_size(xml_file)
+        exceeded = (process_memory() or 0) + estimate > self.limit
+        logger.info(
+            "Estimated XML DOM size %.1f MB (budget %.1f MB) - %s parser selected.",
+            estimate / 1024 ** 2, self.limit / 1024 ** 2,
+            "streaming" if exceeded else "DOM")
+        return exceeded
+
+    def spill(self, entries: int) -> bool:
+        """Returns True if the estimated footprint of an in-memory map of `entries` entries
+        (on top of the current process memory) exceeds the budget."""
+
+        estimate = entries * INDEX_ENTRY_SIZE
+        exceeded = (process_memory() or 0) + estimate > self.limit
+        logger.info(
+            "Estimated resource policy index size %.1f MB (budget %.1f MB) - %s.",
+            estimate / 1024 ** 2, self.limit / 1024 ** 2,
+            "spilled to disk" if exceeded else "kept in memory")
+        return exceeded
+
+
+class ICSSpillStore:
+    """
+    Disk-backed store (temporary SQLite database) for nested key -> group -> values maps.
+
+    Rows are kept in insertion order and the database file is removed when the store is
+    closed or garbage collected.
+
+    Attributes:
+        path: filepath of the SQLite database.
+
+    """
+
+    def __init__(self, spill_dir: Optional[str] = None) -> None:
+        handle, self.path = mkstemp(suffix='.spill.db', dir=spill_dir)
+        os.close(handle)
+        # Stages may read the store from the pipeline worker threads (one at a time).
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE entries (name TEXT, key TEXT, grp TEXT, value TEXT)")
+        self._finalizer = finalize(self, ICSSpillStore._remove, self._conn, self.path)
+
+    @staticmethod
+    def _remove(conn: sqlite3.Connection, path: str) -> None:
+        conn.close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        """Closes & removes the database file."""
+        self._finalizer()
+
+    def add(self, name: str, rows: Iterable[tuple]) -> None:
+        """Adds the (key, group, value) rows of the named map."""
+
+        self._conn.executemany(
+            "INSERT INTO entries VALUES (?, ?, ?, ?)",
+            ((name, key, group, value) for key, group, value in rows))
+        self._conn.commit()
+
+    def index(self) -> None:
+        """Indexes the stored rows for the key lookups (once all the rows are added)."""
+
+        self._conn.execute("CREATE INDEX entries_key ON entries (name, key)")
+        self._conn.commit()
+
+    def map(self, name: str) -> 'ICSSpilledMap':
+        """Read-only mapping view of the named map - key -> group -> list of values."""
+        return ICSSpilledMap(self._conn, name)
+
+
+class ICSSpilledMap(Mapping):
+    """Read-only view of a spilled map - key -> {group: [values]} (loaded per key)."""
+
+    def __init__(self, conn: sqlite3.Connection, name: str) -> None:
+        self._conn = conn
+        self._name = name
+
+    def __getitem__(self, key: str) -> dict:
+        groups = {}
+        for group, value in self._conn.execute(
+                "SELECT grp, value FROM entries WHERE name = ? AND key = ? ORDER BY rowid",
+                (self._name, key)):
+            groups.setdefault(group, []).append(value)
+        if not groups:
+            raise KeyError(key)
+        return groups
+
+    def __contains__(self, key: object) -> bool:
+        return self._conn.execute(
+            "SELECT 1 FROM entries WHERE name = ? AND key = ? LIMIT 1",
+            (self._name, key)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        for (key,) in self._conn.execute(
+                "SELECT DISTINCT key FROM entries WHERE name = ?", (self._name,)):
+            yield key
+
+    def __len__(self) -> int:
+        return self._conn.execute(
+            "SELECT COUNT(DISTINCT key) FROM entries WHERE name = ?", (self._name,)).fetchone()[0]
@@ -0,0 +1,49 @@
+"""
+src.api.names
+~~~~~~~~~~~~~
+ICS XML Config Parser - name interning table.
+
+Object names (roles, realms, auth servers, policies, etc.) are repeated all over the export -
+role-mapping rules, policy role lists, sign-in URL realm lists. Each text value read from the
+XML tree is a separate string object, so every reference costs a new string.
+
+The document name table maps each text value to a single canonical string object - references
+to the same object share one string (and its cached hash), set operations of the idle checks
+compare identical objects, and the pickled model (cache, batch workers) stores each name once.
+
+"""
+
+from typing import Optional
+
+
+class ICSNameTable:
+    """
+    Per-document string interning table
+
+    Unlike `sys.intern`, names are owned by the document - the table is cleared once the
+    document is released (records keep the strings they reference).
+
+    """
+
+    __slots__ = ('_names',)
+
+    def __init__(self) -> None:
+        self._names = {}
+
+    def intern(self, value: Optional[str]) -> Optional[str]:
+        """Canonical string object of the value (None is returned as is)."""
+
+        if value is None:
+            return None
+        # setdefault is atomic - stages may intern from pipeline worker threads.
+        return self._names.setdefault(value, value)
+
+    def clear(self) -> None:
+        """Drops the table."""
+        self._names = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, value: str) -> bool:
+        return value in self._names
@@ -5,53 +5,201 @@ ICS XML Config Parser - wrapper for Python Stdlib ElementTree API.
 
 """
 
-from typing import Optional, Generator, Union
+from typing import Optional, Generator, Iterable, Union
 from re import match
-from xml.etree.ElementTree import ParseError, Element
+from hashlib import sha256
+from threading import RLock
+from xml.etree.ElementTree import Element
 import xml.etree.ElementTree as ET
+from .backend import ICSEtreeBackend, PARSE_ERRORS, get_backend
+from .stream import stream_parse
+from .source import open_export
+from .index import ICSTagIndex, SIMPLE_PATH
+from .names import ICSNameTable
+from .logger import logger
+from ..xpath import iconfig, rspolicy, rsprofile, xpath_constants
 
 
-class ICSXMLParser:
+class ICSQueryPlanner:
     """
-    ICS XML Config Parser
+    ICS XML Section-scoped Query Planner
 
-    Wrapper class for loading and parsing the Ivanti Connect Secure (ICS) XML backup config file
-    Handles automatic XML namespace handling, root setting, tag value extraction.
+    The XML export is made of top-level sections (authentication, users, resource-policies,
+    signin, etc.). The planner finds the sections once, works out which section(s) each XPATH
+    belongs to and runs the query from those sections only - query cost depends on the size of
+    the section instead of the whole export.
+
+    XPATH matching in more than one section is reported (logged) as ambiguous.
 
     Attributes:
-        default_invalid_values: Ignorable value while parsing tag's text values.
-        root_attrib: root element `configuration` attrib for generating XML delete configs (src.idelete.xcoperation)
+        sections: top-level section elements (root element children).
+        plans: XPATH -> list of (section element, section relative path).
 
-        root: root element for the XML tree.
-        namespace: XML namespace attrib used by the root element.
-        nsmap: XML namespace used by etree API find, findall methods.
+    """
+
+    def __init__(self, root: Element, nsmap: dict, index: Optional[ICSTagIndex] = None) -> None:
+        """
+        Args:
+            root: root element of the XML tree.
+            nsmap: XML namespace used by the XPATH tags.
+            index: tag index of the XML tree (optional) - used for locating the sections.
+        """
+
+        self.sections = list(root)
+        self.nsmap = nsmap
+        self.plans = {}
+        self._index = index
+        self._inventory = None  # Section -> tags set (when no index is available).
+
+    def _section_tags(self) -> list:
+        """Tags present in each section - one traversal, used for skipping sections."""
+
+        if self._inventory is None:
+            self._inventory = [{elem.tag for elem in section.iter()} for section in self.sections]
+        return self._inventory
+
+    def plan(self, path: str) -> Optional[list]:
+        """Returns the query plan for the XPATH - (section, relative path) for each section
+        where the path matches. None if the path can't be planned (not a plain `.//` path)."""
+
+        if path in self.plans:
+            return self.plans[path]
+
+        simple = SIMPLE_PATH.fullmatch(path)
+        if simple is None:
+            return None
+
+        steps = simple.group(1).split('/')
+        namespace = self.nsmap.get('', '')
+        tags = [f'{{{namespace}}}{tag}' if namespace else tag for tag in steps]
+
+        if self._index is not None:
+            # Tag chains are exact matches - chain[1] is the top-level section tag.
+            chain_tags = {self._index.chains[chain_id][1]
+                          for chain_id in self._index.chain_ids(path, self.nsmap)}
+            candidates = [section for section in self.sections if section.tag in chain_tags]
+        else:
+            candidates = [section for section, section_tags in zip(self.sections, self._section_tags())
+                          if section_tags.issuperset(tags)]
+
+        plan = []
+        for section in candidates:
+            # Path starting at the section element itself, i.e., `.//users/user-roles` -> `user-roles`
+            if section.tag == tags[0]:
+                plan.append((section, '/'.join(steps[1:]) or '.'))
+            plan.append((section, path))
+        if self._index is None:
+            # Dropping the sections without any match (tags present elsewhere in the section).
+            plan = [(section, rel_path) for section, rel_path in plan
+                    if section.find(rel_path, namespaces=self.nsmap) is not None]
+
+        matched = {section.tag for section, _ in plan}
+        if len(matched) > 1:
+            logger.warning("XPATH %s matches in more than one section - %s",
+                           path, ", ".join(sorted(tag.rpartition('}')[2] for tag in matched)))
+
+        self.plans[path] = plan
+        return plan
+
+    def iterfind(self, path: str) -> Optional[Generator]:
+        """Section-scoped iterfind. None if the path can't be planned."""
+
+        plan = self.plan(path)
+        if plan is None:
+            return None
+        return (elem for section, rel_path in plan
+                for elem in section.iterfind(rel_path, namespaces=self.nsmap))
+
+    def ambiguous(self, paths) -> dict:
+        """Returns the XPATH objects matching in more than one section.
+
+        Args:
+            paths: XPATH strings.
+
+        Returns:
+            Dictionary of XPATH -> matched section tags (namespace stripped)."""
+
+        result = {}
+        for path in paths:
+            plan = self.plan(path) or []
+            tags = sorted({section.tag.rpartition('}')[2] for section, _ in plan})
+            if len(tags) > 1:
+                result[path] = tags
+        return result
 
+
+class ICSXMLDocument:
     """
+    ICS XML Config Document
 
-    default_invalid_values = ['None', '-']
-    root_attrib = {}
+    Parsed XML backup file that can be shared by multiple parser instances
+    (ICSIdleConfig, ICSRSPolicy, ICSRSProfile), so the XML export is parsed only once per run.
 
-    def __init__(self, xml_file) -> None:
+    Parser instances attach to the document on init and detach on `release`. The parsed tree is
+    dropped once the document is closed and the last attached parser is released.
+
+    Attributes:
+        xml_file: filepath of the XML backup file.
+        streaming: If set, parsed with the streaming engine (src.api.stream) - pruned tree.
+        indexed: If set, XPATH queries are resolved with the tag index (src.api.index).
+        backend: XML backend - ElementTree or lxml (src.api.backend).
+        names: name interning table - text values read by the parsers (src.api.names).
+        tree: ElementTree handle of the parsed XML file (None once released).
+        consumers: number of parser instances currently attached to the document.
+
+    """
+
+    def __init__(
+            self,
+            xml_file,
+            streaming: bool = False,
+            indexed: bool = True,
+            skip_sections: bool = True,
+            backend: Optional[str] = None,
+            sections: Optional[Iterable[str]] = None) -> None:
         """
-        Initializes the instance with XML filepath.
+        Parses the XML backup file.
 
         Args:
-            xml_file: filepath of the XML backup file.
-        
+            xml_file: filepath of the XML backup file - plain, gzip, bz2, xz or zip (detected
+                by the magic bytes, decompressed while parsing).
+            streaming: If set, only the config objects queried by the parsers are kept
+                in memory (iterparse). Default - False (full DOM).
+            indexed: If set, tag index is built on the first query and shared by all the
+                parser instances. Default - True.
+            skip_sections: If set, top-level sections without any queried config object
+                (ESAP & client packages, etc.) are not parsed (src.api.source). Default - True.
+            backend: XML backend - etree, lxml or auto (lxml if installed). Default - etree.
+            sections: element tags - if set (with skip_sections), only the top-level sections
+                holding any of them are parsed, i.e., config sections changed since a baseline
+                export (src.iconfig.diff). Default - all the queried config objects.
+
         Raises:
             FileNotFoundError: XML filepath is invalid or file not found.
             ParseError: XML structure is invalid/malformed.
             Exception: All other exceptions.
-            
+
         """
 
-        self.root = {}
-        self.namespace = {}
-        self.nsmap = {}
+        self.xml_file = xml_file
+        self.streaming = streaming
+        self.indexed = indexed
+        self.backend = get_backend('etree')
+        self.names = ICSNameTable()
+        self.tree = None
+        self._index = None
+        self._planner = None
+        self.consumers = 0
+        self.closed = False
+        self._lock = RLock()  # Parser instances may attach/query from pipeline worker threads.
 
         try:
-            with open(xml_file, encoding='utf-8') as file_handle:
-                self._xml_handle = ET.parse(file_handle)
+            self.backend = get_backend(backend)
+            with open_export(xml_file, skip_sections=skip_sections, tags=sections) as file_handle:
+                if streaming:
+                    self.tree = stream_parse(file_handle, backend=self.backend)
+                else:
+                    self.tree = self.backend.parse(file_handle)
 
         except FileNotFoundError as fnotfound:
             raise SystemExit(f"""
@@ -60,7 +208,7 @@ class ICSXMLParser:
             Exception type - {fnotfound.__class__.__name__}
             """) from None
 
-        except ParseError as ferror:
+        except PARSE_ERRORS as ferror:
             raise SystemExit(f"""
             XML Parsing failed. Please validate the XML structure and try again.
             Error details - {ferror.msg}
@@ -70,11 +218,153 @@ class ICSXMLParser:
         except Exception as exc:  # Catching other generic Exceptions.
             raise SystemExit(f"{exc.__class__.__name__}: {exc}") from None
 
+    def __enter__(self) -> 'ICSXMLDocument':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def index(self) -> Optional[ICSTagIndex]:
+        """Tag index of the XML tree (built on first use). None if indexing is disabled."""
+
+        with self._lock:
+            if self._index is None and self.indexed and self.tree is not None:
+                self._index = ICSTagIndex(self.tree.getroot())
+            return self._index
+
+    def planner(self, nsmap: dict) -> ICSQueryPlanner:
+        """Section-scoped query planner of the XML tree (built on first use)."""
+
+        with self._lock:
+            if self._planner is None:
+                self._planner = ICSQueryPlanner(self.tree.getroot(), nsmap, index=self.index)
+            return self._planner
+
+    def attach(self) -> ET.ElementTree:
+        """Registers a parser instance and returns the shared ElementTree handle.
+
+        Raises:
+            ValueError: Document was already released.
+        """
+
+        with self._lock:
+            if self.tree is None:
+                raise ValueError(f"XML document already released - {self.xml_file}")
+            self.consumers += 1
+            return self.tree
+
+    def detach(self) -> None:
+        """Unregisters a parser instance. Releases the tree if it was the last one."""
+
+        with self._lock:
+            self.consumers -= 1
+            self._release()
+
+    def close(self) -> None:
+        """Marks the document as closed - no more parser instances will attach to it.
+        The tree is released right away if no parser instance is attached anymore."""
+
+        with self._lock:
+            self.closed = True
+            self._release()
+
+    def _release(self) -> None:
+        """Drops the tree reference once the document is closed & not used anymore."""
+
+        if self.closed and self.consumers <= 0:
+            self.tree = None
+            self._index = None
+            self._planner = None
+            self.names.clear()
+
+
+class ICSXMLParser:
+    """
+    ICS XML Config Parser
+
+    Wrapper class for loading and parsing the Ivanti Connect Secure (ICS) XML backup config file
+    Handles automatic XML namespace handling, root setting, tag value extraction.
+
+    Attributes:
+        default_invalid_values: Ignorable value while parsing tag's text values.
+        root_attrib: root element `configuration` attrib for generating XML delete configs (src.idelete.xcoperation)
+
+        root: root element for the XML tree.
+        namespace: XML namespace attrib used by the root element.
+        nsmap: XML namespace used by etree API find, findall methods.
+
+    """
+
+    default_invalid_values = ['None', '-']
+    root_attrib = {}
+    model_attrs = ()  # Instance attributes holding the parsed results (see `model` method).
+
+    def __init__(self, xml_file) -> None:
+        """
+        Initializes the instance with XML filepath or an already parsed XML document.
+
+        Args:
+            xml_file: filepath of the XML backup file or a shared ICSXMLDocument.
+                None - detached instance, results are loaded with `load_model` (cached model).
+        
+        Raises:
+            FileNotFoundError: XML filepath is invalid or file not found.
+            ParseError: XML structure is invalid/malformed.
+            Exception: All other exceptions.
+            
+        """
+
+        self.root = {}
+        self.namespace = {}
+        self.nsmap = {}
+
+        if xml_file is None:
+            self.document = None
+            self._xml_handle = None
+            return
+
+        if isinstance(xml_file, ICSXMLDocument):
+            self.document = xml_file
+            self._xml_handle = self.document.attach()
+        else:
+            # Standalone usage - document is owned by this instance only.
+            self.document = ICSXMLDocument(xml_file)
+            self._xml_handle = self.document.attach()
+            self.document.close()
+        self._backend: ICSEtreeBackend = self.document.backend
+        self._intern = self.document.names.intern
+
         # Pipelines the required methods = for autopopulating ns data.
         self._set_root()
         self._get_namespace()
         self._set_namespace()
 
+    def release(self) -> None:
+        """Detaches the instance from the XML document.
+
+        Parsed results are kept, but no XML queries can be made after this point.
+        The XML tree is freed once the last instance using the document is released."""
+
+        if self._xml_handle is None:
+            return
+        self._xml_handle = None
+        self.root = None
+        self.document.detach()
+
+    def model(self) -> dict:
+        """Returns the parsed results (config model) - used for caching."""
+
+        return {'root_attrib': ICSXMLParser.root_attrib} | {
+            attr: getattr(self, attr) for attr in self.model_attrs}
+
+    def load_model(self, model: dict) -> None:
+        """Loads the parsed results from a config model returned by the `model` method."""
+
+        ICSXMLParser.root_attrib = model['root_attrib']
+        for attr in self.model_attrs:
+            setattr(self, attr, model[attr])
+
     def _set_root(self) -> None:
         """Sets the root element in XML for parsing."""
         self.root = self._xml_handle.getroot()
@@ -111,70 +401,113 @@ class ICSXMLParser:
         Updates the root_attrib class instance attribute which is used by XML delete operation."""
 
         self.nsmap = {'': self.namespace}
-        ICSXMLParser.root_attrib = {"xmlns": self.namespace} | {"xmlns:xsi": "http://www.w3.org/2001/XMLSchema-instance"} | self.root.attrib
+        ICSXMLParser.root_attrib = {"xmlns": self.namespace} | {"xmlns:xsi": "http://www.w3.org/2001/XMLSchema-instance"} | dict(self.root.attrib)
+
+    def _query(self, path: str) -> Optional[Iterable]:
+        """Resolves the XPATH with the document tag index (if enabled) or the section-scoped
+        query planner. Returns None if the path is supported by neither of them."""
+
+        planner = self.document.planner(self.nsmap)
+        index = self.document.index
+        if index is not None:
+            planner.plan(path)  # Reports the ambiguous XPATH objects.
+            elems = index.findall(path, self.nsmap)
+            if elems is not None:
+                return elems
+        return planner.iterfind(path)
 
     def _findall(self, path: str) -> Generator:
         """XML Findall wrapper. See base method for more details."""
 
-        for elem in self.root.findall(path=path, namespaces=self.nsmap):
+        elems = self._query(path)
+        if elems is None:
+            elems = self.root.findall(path=path, namespaces=self.nsmap)
+        for elem in elems:
             yield elem
 
     def _find(self, path: str) -> Element:
         """XML Find wrapper that uses the default root. See base method for more details."""
 
-        return self.root.find(path=path, namespaces=self.nsmap)
+        elems = self._query(path)
+        if elems is None:
+            return self.root.find(path=path, namespaces=self.nsmap)
+        return next(iter(elems), None)
 
     def _iterfind(self, path: str) -> Generator:
         """XML IterFind wrapper - passes namespace automatically for tags. See base method for more details."""
 
-        for elem in self.root.iterfind(path=path, namespaces=self.nsmap):
+        elems = self._query(path)
+        if elems is None:
+            elems = self.root.iterfind(path=path, namespaces=self.nsmap)
+        for elem in elems:
             yield elem
 
     def _handle_findall(self, path: str) -> Generator:
         """XML Findall wrapper (XML Handle).
         Calls the method over the XML handle object instead of root"""
 
-        for elem in self._xml_handle.findall(path=path, namespaces=self.nsmap):
+        elems = self._query(path)
+        if elems is None:
+            elems = self._xml_handle.findall(path=path, namespaces=self.nsmap)
+        for elem in elems:
             yield elem
 
     def _handle_find(self, path: str) -> Element:
         """XML Find wrapper (XML handle).
         Calls the method over the XML handle object instead of root"""
 
-        return self._xml_handle.find(path=path, namespaces=self.nsmap)
+        elems = self._query(path)
+        if elems is None:
+            return self._xml_handle.find(path=path, namespaces=self.nsmap)
+        return next(iter(elems), None)
 
     def _handle_iterfind(self, path: str) -> Generator:
         """XML IterFind wrapper (XML Handle).
         Calls the method over the XML handle object instead of root"""
 
-        for elem in self._xml_handle.iterfind(path=path, namespaces=self.nsmap):
+        elems = self._query(path)
+        if elems is None:
+            elems = self._xml_handle.iterfind(path=path, namespaces=self.nsmap)
+        for elem in elems:
             yield elem
 
+    def ambiguous_paths(self) -> dict:
+        """XPATH objects (src.xpath) matching in more than one top-level section of the export.
+
+        Returns:
+            Dictionary of XPATH -> matched section tags."""
+
+        paths = set()
+        for module in (iconfig, rspolicy, rsprofile):
+            paths.update(xpath_constants(module).values())
+        return self.document.planner(self.nsmap).ambiguous(sorted(paths))
+
     def _element_findall(self, element: Element, path: str) -> Generator:
         """XML Findall wrapper (Custom Element).
         Calls the method over the custom Etree element object instead of root"""
 
-        for elem in element.findall(path=path, namespaces=self.nsmap):
+        for elem in self._backend.findall(element, path, self.nsmap):
             yield elem
 
     def _element_findall_values(self, element: Element, path: str) -> set:
         """XML Findall wrapper (Custom Element).
         Calls the method over the custom Etree element object instead of root"""
 
-        return {elem.text for elem in element.findall(path=path, namespaces=self.nsmap)}
+        intern = self._intern
+        return {intern(elem.text) for elem in self._backend.findall(element, path, self.nsmap)}
 
 
     def _element_find(self, element: Element, path: str) -> Element:
         """XML Find wrapper (Custom handle).
         Calls the method over the custom Etree element object instead of root"""
 
-        return element.find(path=path, namespaces=self.nsmap)
+        return self._backend.find(element, path, self.nsmap)
 
     def _element_find_value(self, element: Element, path: str) -> str:
         """XML Find wrapper to return TEXT value (Custom handle).
         Calls the method over the custom Etree element object instead of root"""
 
-        return element.find(path=path, namespaces=self.nsmap).text
+        return self._intern(self._backend.find(element, path, self.nsmap).text)
 
     def parse_element(
             self,
@@ -193,14 +526,34 @@ class ICSXMLParser:
             Set - Contains XML tag text values if allow_dups is set to False (default)"""
 
         invalid_values = ICSXMLParser.default_invalid_values if invalid_values is None else ICSXMLParser.default_invalid_values + invalid_values
+        intern = self._intern  # Text values are interned in the document name table.
         if allow_dups:  # List will be created to allow duplicates.
-            return [elem.text for elem in self._findall(path=path)
+            return [intern(elem.text) for elem in self._findall(path=path)
                     if elem.text not in invalid_values]
         # Else SET will be created to disallow duplicates.
-        return {elem.text for elem in self._findall(path=path)
+        return {intern(elem.text) for elem in self._findall(path=path)
                 if elem.text not in invalid_values}
 
 
+    def content_digest(self, paths: list) -> str:
+        """Returns the SHA-256 digest of the XML content under the elements matching the XPATH
+        objects (tags, text & attributes). Used for detecting changed config sections.
+
+        Args:
+            paths: XPATH strings, i.e., ROOT objects of the config section."""
+
+        digest = sha256()
+        for path in paths:
+            digest.update(path.encode('utf-8'))
+            for element in self._findall(path):
+                for elem in element.iter():
+                    # Children count keeps the tree structure part of the digest.
+                    digest.update(
+                        f"\x01{elem.tag}\x00{elem.text}\x00{sorted(elem.attrib.items())}\x00{len(elem)}"
+                        .encode('utf-8'))
+        return digest.hexdigest()
+
+
     def check_tree(self, tag: str) -> bool:
         """Checks for XML object presence and returns bool value.
         
@@ -214,8 +567,8 @@ class ICSXMLParser:
         """
 
         check = self._find(path=tag)
-        # Returns ET.Element (True) if present.
-        if isinstance(check, ET.Element):
+        # Returns the element (True) if present - element type depends on the XML backend.
+        if check is not None:
             return True
         return False
 
@@ -232,8 +585,8 @@ class ICSXMLParser:
         """
 
         check = self._element_find(element,path=tag)
-        # Returns ET.Element (True) if present.
-        if isinstance(check, ET.Element):
+        # Returns the element (True) if present - element type depends on the XML backend.
+        if check is not None:
             return True
         return False
 
@@ -264,8 +617,9 @@ class ICSXMLParser:
             Dictionary that contains the value of the provided key and value data.
         """
 
-        return {self._element_find(element, key).text:
-        {elem.text for elem in self._element_findall(element, value) if elem.text is not None}
+        intern = self._intern
+        return {intern(self._element_find(element, key).text):
+        {intern(elem.text) for elem in self._element_findall(element, value) if elem.text is not None}
         for element in self._handle_iterfind(root_element)
         if self._element_check_tree(element, check_tree)
         if self._element_find(element, path=check_key).text == check_value}
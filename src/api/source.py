@@ -0,0 +1,320 @@
+"""
+src.api.source
+~~~~~~~~~~~~~~
+XML export sources - plain, compressed (gzip, bz2, xz) or archived (zip) XML exports.
+
+Compression is detected by the magic bytes of the file (not the extension) and the export is
+decompressed while it's being read - the XML parser consumes the decompressed stream directly,
+no temporary copy is written to disk.
+
+Plain XML exports can be read through a section-skipping reader (`ICSSectionReader`): the file
+is memory-mapped and its top-level sections are located with a raw byte scan. Sections without
+any tag queried by the parsers (ESAP & client packages - large base64 text nodes, etc.) are left
+out of the stream fed to the XML parser - never decoded, same parsing results.
+
+The same byte scan gives the digests of config sections without parsing them
+(`element_digests` - baseline diff of two exports, src.iconfig.diff).
+
+"""
+
+import io
+import mmap
+import os
+import re
+from contextlib import contextmanager
+from hashlib import sha256
+from typing import BinaryIO, Generator, Iterable, Optional
+from .stream import STREAM_PATTERNS
+from .logger import logger
+
+# Magic bytes -> compression/archive format.
+MAGIC_BYTES = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'PK\x03\x04', 'zip'),
+)
+
+# Filename suffixes of the compressed/archived XML exports (batch mode file discovery).
+EXPORT_SUFFIXES = ('.xml', '.xml.gz', '.xml.bz2', '.xml.xz', '.zip')
+
+
+def tag_pattern(tags: Iterable[str]) -> re.Pattern:
+    """Start tag of any of the elements - group 1: tag (namespace prefix is optional)."""
+
+    return re.compile(
+        rb'<((?:[\w.-]+:)?(?:' + b'|'.join(re.escape(tag.encode()) for tag in sorted(tags)) +
+        rb'))[\s/>]')
+
+
+# Start tag of any element queried by the XPATH objects (first tag of each streaming pattern -
+# every queried path starts with one of them).
+QUERY_TAG_PATTERN = tag_pattern({path[0] for path in STREAM_PATTERNS})
+
+# Next markup after the root start tag - comment, processing instruction, end tag or element.
+MARKUP_PATTERN = re.compile(rb'<(!--|\?|/|[^\s/>!?]+)')
+
+
+def detect_format(xml_file: str) -> str:
+    """Returns the format of the XML export file - gzip, bz2, xz, zip or xml (plain)."""
+
+    with open(xml_file, mode='rb') as file_handle:
+        head = file_handle.read(max(len(magic) for magic, _ in MAGIC_BYTES))
+    for magic, file_format in MAGIC_BYTES:
+        if head.startswith(magic):
+            return file_format
+    return 'xml'
+
+
+def export_name(xml_file: str) -> str:
+    """XML export filename without the extension(s) - `ive-export.xml.gz` -> `ive-export`."""
+
+    name = os.path.basename(xml_file)
+    for suffix in sorted(EXPORT_SUFFIXES, key=len, reverse=True):
+        if name.lower().endswith(suffix):
+            return name[:-len(suffix)]
+    return os.path.splitext(name)[0]
+
+
+def _zip_member(archive, xml_file: str):
+    """The XML export of the ZIP archive - the only `.xml` file (or the only file) in it.
+
+    Raises:
+        ValueError: no XML export or more than one XML export in the archive."""
+
+    members = [info for info in archive.infolist() if not info.is_dir()]
+    xml_members = [info for info in members if info.filename.lower().endswith('.xml')]
+    if len(xml_members) == 1:
+        return xml_members[0]
+    if not xml_members and len(members) == 1:
+        return members[0]
+    raise ValueError(
+        f"ZIP archive must contain a single XML export - {xml_file} "
+        f"({len(xml_members) or len(members)} files found)")
+
+
+def _element_end(buffer, tag: bytes, start: int) -> Optional[int]:
+    """End offset of the element starting at the offset (nested elements of the same tag
+    are counted). None if the element isn't closed."""
+
+    tag_pattern = re.compile(b'<(/?)' + re.escape(tag) + rb'(\s[^>]*?)?(/?)>')
+    depth = 0
+    for match in tag_pattern.finditer(buffer, start):
+        if match.group(1):
+            depth -= 1
+        elif not match.group(3):  # Self-closing elements don't change the depth.
+            depth += 1
+        if not depth:
+            return match.end()
+    return None
+
+
+def scan_sections(buffer) -> Optional[list]:
+    """
+    Locates the top-level sections (root element children) with a raw byte scan.
+
+    Returns:
+        List of (tag, start offset, end offset). None if the layout couldn't be scanned
+        (the whole export is parsed then).
+    """
+
+    root = MARKUP_PATTERN.search(buffer)
+    while root is not None and root.group(1) in (b'!--', b'?'):  # Prolog.
+        end = buffer.find(b'-->' if root.group(1) == b'!--' else b'?>', root.end())
+        root = MARKUP_PATTERN.search(buffer, end) if end != -1 else None
+    if root is None or root.group(1) == b'/':
+        return None
+    position = buffer.find(b'>', root.end())
+    if position == -1 or buffer[position - 1:position] == b'/':
+        return None
+
+    sections = []
+    while True:
+        markup = MARKUP_PATTERN.search(buffer, position + 1)
+        if markup is None:
+            return None
+        kind = markup.group(1)
+        if kind == b'/':  # Root end tag.
+            return sections
+        if kind in (b'!--', b'?'):
+            position = buffer.find(b'-->' if kind == b'!--' else b'?>', markup.end())
+        else:
+            end = _element_end(buffer, kind, markup.start())
+            if end is None:
+                return None
+            sections.append((kind, markup.start(), end))
+            position = end - 1
+        if position == -1:
+            return None
+
+
+def element_digests(xml_file: str, tags: Iterable[str]) -> Optional[dict]:
+    """
+    SHA-256 digests of the raw bytes of the elements of each tag (all the elements in document
+    order, nested elements of the same tag are part of the outer one) - nothing is parsed.
+
+    Returns:
+        Tag -> digest (elements not found - digest of the tag only). None if the export isn't
+        a plain XML export or its layout couldn't be scanned (digests are computed from the
+        parsed tree then).
+    """
+
+    if detect_format(xml_file) != 'xml':
+        return None
+    try:
+        with open(xml_file, mode='rb') as file_handle:
+            buffer = mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):  # Empty file.
+        return None
+
+    try:
+        sections = scan_sections(buffer)
+        if sections is None:
+            return None
+        digests = {tag: sha256(tag.encode('utf-8')) for tag in tags}
+        pattern = tag_pattern(digests)
+        covered = {}  # Tag -> end offset of its last element.
+        # Searched within the sections only - comments between them are not markup.
+        for _, start, end in sections:
+            for match in pattern.finditer(buffer, start, end):
+                tag = match.group(1)
+                local = tag.rpartition(b':')[2].decode()
+                if match.start() < covered.get(local, 0):
+                    continue  # Nested in the previous element of the same tag.
+                element_end = _element_end(buffer, tag, match.start())
+                if element_end is None:
+                    return None
+                digests[local].update(buffer[match.start():element_end])
+                covered[local] = element_end
+        return {tag: digest.hexdigest() for tag, digest in digests.items()}
+    finally:
+        buffer.close()
+
+
+class ICSSectionReader(io.RawIOBase):
+    """
+    Memory-mapped XML export reader that leaves out the top-level sections not queried by
+    the parsers - the remaining byte ranges are stitched into a well-formed XML stream.
+
+    Attributes:
+        skipped: skipped sections - list of (tag, size in bytes).
+
+    """
+
+    def __init__(self, xml_file: str, tags: Optional[Iterable[str]] = None) -> None:
+        """
+        Args:
+            tags: element tags - top-level sections without any of them are left out.
+                Default - tags queried by the parsers.
+
+        Raises:
+            ValueError: empty file or section layout couldn't be scanned (file can't be
+                mapped or skipped).
+        """
+
+        super().__init__()
+        with open(xml_file, mode='rb') as file_handle:
+            self._buffer = mmap.mmap(file_handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        sections = scan_sections(self._buffer)
+        if sections is None:
+            self._buffer.close()
+            raise ValueError(f"XML sections couldn't be scanned - {xml_file}")
+
+        pattern = QUERY_TAG_PATTERN if tags is None else tag_pattern(tags)
+        self.skipped = []
+        self._ranges = []  # Byte ranges fed to the XML parser.
+        position = 0
+        for tag, start, end in sections:
+            if pattern.search(self._buffer, start, end) is None:
+                self._ranges.append((position, start))
+                self.skipped.append((tag.decode(errors='replace'), end - start))
+                position = end
+        self._ranges.append((position, len(self._buffer)))
+        self._range = 0
+        self._position = self._ranges[0][0]
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while self._range < len(self._ranges):
+            end = self._ranges[self._range][1]
+            size = min(len(buffer), end - self._position)
+            if size > 0:
+                buffer[:size] = self._buffer[self._position:self._position + size]
+                self._position += size
+                return size
+            self._range += 1
+            if self._range < len(self._ranges):
+                self._position = self._ranges[self._range][0]
+        return 0
+
+    def close(self) -> None:
+        if not self.closed:
+            self._buffer.close()
+        super().close()
+
+
+def _section_reader(
+        xml_file: str, tags: Optional[Iterable[str]] = None) -> Optional[ICSSectionReader]:
+    """Section-skipping reader of the plain XML export. None if the file can't be mapped
+    or its sections couldn't be scanned (the whole file is read then)."""
+
+    try:
+        reader = ICSSectionReader(xml_file, tags)
+    except (ValueError, OSError):
+        return None
+    if reader.skipped:
+        logger.debug("XML sections not queried by the parsers skipped - %s", ", ".join(
+            f"{tag} ({size / 1024 ** 2:.1f} MB)" for tag, size in reader.skipped))
+    return reader
+
+
+@contextmanager
+def open_export(
+        xml_file: str,
+        skip_sections: bool = False,
+        tags: Optional[Iterable[str]] = None) -> Generator[BinaryIO, None, None]:
+    """
+    Opens the XML export for reading (binary) - compressed & archived exports are
+    decompressed on the fly.
+
+    Args:
+        xml_file: filepath of the XML export.
+        skip_sections: If set, top-level sections not queried by the parsers are left out
+            (plain XML exports - see ICSSectionReader).
+        tags: element tags of the sections kept if skip_sections is set. Default - tags
+            queried by the parsers.
+
+    Raises:
+        FileNotFoundError: XML filepath is invalid or file not found.
+        ValueError: ZIP archive without a single XML export.
+    """
+
+    file_format = detect_format(xml_file)
+    if file_format == 'gzip':
+        import gzip
+        with gzip.open(xml_file, mode='rb') as file_handle:
+            yield file_handle
+    elif file_format == 'bz2':
+        import bz2
+        with bz2.open(xml_file, mode='rb') as file_handle:
+            yield file_handle
+    elif file_format == 'xz':
+        import lzma
+        with lzma.open(xml_file, mode='rb') as file_handle:
+            yield file_handle
+    elif file_format == 'zip':
+        from zipfile import ZipFile
+        with ZipFile(xml_file) as archive:
+            with archive.open(_zip_member(archive, xml_file)) as file_handle:
+                yield file_handle
+    else:
+        reader = _section_reader(xml_file, tags) if skip_sections else None
+        if reader is not None:
+            with io.BufferedReader(reader, buffer_size=mmap.PAGESIZE * 16) as file_handle:
+                yield file_handle
+            return
+        with open(xml_file, mode='rb') as file_handle:
+            yield file_handle
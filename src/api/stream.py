@@ -0,0 +1,125 @@
+"""
+src.api.stream
+~~~~~~~~~~~~~~
+ICS XML Config Parser - streaming (iterparse) engine.
+
+Walks the XML backup file once and keeps only the elements that are queried by the XPATH
+objects (src.xpath) - everything else is dropped as soon as it's parsed. The result is a
+pruned ElementTree with the same structure for the queried paths, so all ICSXMLParser
+methods return the same results as with the full DOM while memory stays flat.
+
+"""
+
+from xml.etree.ElementTree import ElementTree
+from ..xpath import iconfig, rspolicy, rsprofile, xpath_constants
+from .backend import ICSEtreeBackend, get_backend
+
+
+def _steps(path: str) -> tuple:
+    """Splits the XPATH string into tag names, i.e., './/a/b' -> ('a', 'b')"""
+    return tuple(path.lstrip('./').split('/'))
+
+
+def _stream_patterns() -> set:
+    """
+    Collects the tag paths required by the parsers.
+
+    Value paths - all the XPATH objects (text values & ROOT presence checks).
+    Record paths - XPATH objects of the record elements + their child fields (FIELDS).
+
+    Returns:
+        Set of tag path tuples.
+    """
+
+    paths = set(map(_steps, xpath_constants(iconfig).values()))
+    paths.update(
+        _steps(iconfig.SIGNIN_URL) + _steps(field) for field in iconfig.SIGNIN_URL_FIELDS)
+    paths.update(
+        _steps(realm) + _steps(field)
+        for realm in (iconfig.USER_REALM, iconfig.ADMIN_REALM) for field in iconfig.REALM_FIELDS)
+
+    for module, fields in ((rspolicy, rspolicy.RS_POLICY_FIELDS),
+                           (rsprofile, rsprofile.RS_PROFILE_FIELDS)):
+        for name, path in xpath_constants(module).items():
+            paths.add(_steps(path))
+            if not name.endswith('_ROOT'):
+                paths.update(_steps(path) + _steps(field) for field in fields)
+
+    return paths
+
+
+STREAM_PATTERNS = _stream_patterns()
+
+
+def _remove_child(parent, child) -> None:
+    """Removes the child element from its parent.
+
+    iterparse reads ahead, so the child is usually one of the last children of its parent
+    (not always the last one) - searching from the end avoids scanning the kept siblings."""
+
+    for index in range(len(parent) - 1, -1, -1):
+        if parent[index] is child:
+            del parent[index]
+            return
+
+
+def stream_parse(
+        source,
+        patterns: set = None,
+        backend: ICSEtreeBackend = None) -> ElementTree:
+    """
+    Parses the XML source with iterparse and returns the pruned ElementTree.
+
+    An element is kept if its tag path matches a pattern (`.//` semantics - root excluded)
+    or if any of its children were kept. Other elements are removed from their parent as
+    soon as they are parsed, so only the queried config objects stay in memory.
+
+    Args:
+        source: filename or file object of the XML backup file.
+        patterns: tag path tuples to be kept. Default - STREAM_PATTERNS.
+        backend: XML backend (src.api.backend). Default - ElementTree.
+
+    Raises:
+        ParseError: XML structure is invalid/malformed.
+    """
+
+    patterns = STREAM_PATTERNS if patterns is None else patterns
+    backend = get_backend('etree') if backend is None else backend
+    lengths = {}  # Last tag name -> tag path lengths to be compared.
+    for pattern in patterns:
+        lengths.setdefault(pattern[-1], set()).add(len(pattern))
+    local_names = {}  # Tag -> local name (namespace stripped) cache.
+    elements = []  # Open elements stack.
+    path = []  # Open elements local names stack.
+
+    for event, elem in backend.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            tag = elem.tag
+            local = local_names.get(tag)
+            if local is None:
+                local = local_names[tag] = tag.rpartition('}')[2]
+            elements.append(elem)
+            path.append(local)
+            continue
+
+        elements.pop()
+        local = path[-1]
+        depth = len(path)
+        # size < depth -> root element is not part of the `.//` descendants.
+        matched = any(size < depth and tuple(path[-size:]) in patterns
+                      for size in lengths.get(local, ()))
+        path.pop()
+
+        if not elements:
+            root = elem
+            break
+
+        elem.tail = None
+        if matched:
+            continue
+        if len(elem):  # Kept as the parent of matched elements - text not needed.
+            elem.text = None
+            continue
+        _remove_child(elements[-1], elem)
+
+    return backend.tree(root)
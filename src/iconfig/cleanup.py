@@ -0,0 +1,223 @@
+"""
+Transitive idle config cleanup.
+
+Deleting idle objects can leave other objects idle - a realm mapped only to idle sign-in URLs,
+a role mapped only by idle realms, a resource profile/policy mapped only to idle roles, etc.
+Instead of re-running the checker after each cleanup, the dependency graph of the config model
+(src.iconfig.model records) is reduced to a fixpoint in one run:
+
+    sign-in URL -> realm -> role (role-mapping rules) -> resource profile / resource policy
+                   realm -> auth server (authentication, secondary, directory, accounting)
+
+Each object is held by the objects referencing it (realm <- sign-in URLs, auth server <- realms,
+role <- realms, profile/policy <- its roles). Round 1 is the regular idle config report - objects
+without any holder. Removing the objects of a round releases their references, objects whose
+holders are all removed become idle in the next round, until nothing changes.
+
+Objects held by references outside the graph are never idle - IKEv2 realm mappings, AOA role
+mappings, enabled (or in use) sign-in URLs, roles not defined in the export, policies applied
+to all roles or excluding roles.
+
+"""
+
+from collections import defaultdict
+from typing import Optional
+from .config import ICSIdleConfig
+from .rspolicy import ICSRSPolicy, policy_label
+from .rsprofile import ICSRSProfile
+from .report import write_rows
+from .stages import IDLE_CATEGORIES
+from ..xpath.idelete import XC_PATHS
+
+CLEANUP_HEADERS = ["ROUND", "CATEGORY", "NAME"]
+
+# Report category -> ICSRSProfile attribute (profile records).
+PROFILE_FAMILIES = {
+    'WEB_PROFILES': 'web_profiles_',
+    'FILE_PROFILES': 'file_profiles_',
+    'SAM_CLIENT_APPS': 'sam_profiles_capp_',
+    'SAM_DESTS': 'sam_profiles_dest_',
+    'TERMSERV_PROFILES': 'termsrv_profiles_',
+    'VDI_PROFILES': 'vdi_profiles_',
+    'HTML5_PROFILES': 'html5_profiles_',
+}
+
+# Report category -> ICSRSPolicy attribute (policy records).
+POLICY_FAMILIES = {
+    'WEB_POLICIES': 'web_policies_',
+    'FILE_POLICIES': 'file_policies_',
+    'SAM_POLICIES': 'sam_policies_',
+    'TERMSERV_POLICIES': 'termserv_policies_',
+    'HTML5_POLICIES': 'html5_policies_',
+    'VPN_POLICIES': 'vpntunnel_policies_',
+}
+
+# Report order of the categories (sign-in realm views of IDLE_CATEGORIES aren't graph objects).
+CATEGORIES = list(IDLE_CATEGORIES) + list(PROFILE_FAMILIES) + list(POLICY_FAMILIES)
+
+
+def policy_name(policy) -> str:
+    """Report name of the resource policy - policy type & name, i.e., `web-acl:Intranet`."""
+    return policy_label(policy.policy_type, policy.name)
+
+
+def role_references(
+        config: ICSIdleConfig,
+        rs_profile: Optional[ICSRSProfile] = None,
+        rs_policy: Optional[ICSRSPolicy] = None) -> dict:
+    """
+    Idle user roles still listed by resource policies (selected or excluded roles) or resource
+    profiles - deleting them would leave dangling role references behind.
+
+    Returns:
+        Idle user role -> sorted labels of the referencing objects - element tag & name,
+        i.e., `web-acl:Intranet`, `web-profile:Intranet`.
+    """
+
+    idle_roles = set(config.idle_user_roles)
+    references = defaultdict(set)
+    if rs_policy is not None:
+        for attr in POLICY_FAMILIES.values():
+            for policy in getattr(rs_policy, attr):
+                for role in idle_roles.intersection(policy.roles):
+                    references[role].add(policy_name(policy))
+    if rs_profile is not None:
+        for category, attr in PROFILE_FAMILIES.items():
+            for profile in getattr(rs_profile, attr):
+                for role in idle_roles.intersection(profile.roles):
+                    references[role].add(f"{XC_PATHS[category][1]}:{profile.name}")
+    return {role: sorted(references[role]) for role in sorted(references)}
+
+
+class ICSCleanup:
+    """
+    Idle config cleanup rounds (dependency graph fixpoint)
+
+    Attributes:
+        holders: object (category, name) -> objects referencing it.
+        pinned: objects held by references outside the graph (never idle).
+        rounds: cleanup rounds - list of {category: sorted names} (round 1 first).
+
+    """
+
+    def __init__(
+            self,
+            config: ICSIdleConfig,
+            rs_profile: Optional[ICSRSProfile] = None,
+            rs_policy: Optional[ICSRSPolicy] = None) -> None:
+        self.holders = defaultdict(set)
+        self.pinned = set()
+        self.rounds = []
+        self._build(config, rs_profile, rs_policy)
+
+    def _nodes(self, category: str, names, pinned=()) -> dict:
+        """Registers the objects of the category - name -> graph node."""
+
+        nodes = {}
+        for name in names:
+            node = nodes[name] = (category, name)
+            self.holders.setdefault(node, set())  # No holder - idle in round 1.
+            if name in pinned:
+                self.pinned.add(node)
+        return nodes
+
+    def _hold(self, nodes: dict, names, holder: tuple) -> None:
+        """Holder references the named objects (names not in the graph are ignored)."""
+
+        for name in names:
+            if name in nodes:
+                self.holders[nodes[name]].add(holder)
+
+    def _build(self, config, rs_profile, rs_policy) -> None:
+        """Builds the dependency graph from the config model records."""
+
+        auth_servers = self._nodes('IDLE_AUTH_SERVERS', config.total_auth_servers)
+        user_roles = self._nodes('IDLE_USER_ROLES', config.total_user_roles, config.aoa_roles)
+
+        for scope, urls, realms, roles, realm_names, pins in (
+                ('USER', config.user_urls_, config.user_realms_, user_roles,
+                 config.total_user_realms, config.ikev2_realms),
+                ('ADMIN', config.admin_urls_, config.admin_realms_,
+                 self._nodes('IDLE_ADMIN_ROLES', config.total_admin_roles),
+                 config.total_admin_realms, set())):
+            idle_urls = set(getattr(config, f'idle_{scope.lower()}_urls'))
+            # Enabled sign-in URLs (or sharing a realm with one) are never idle.
+            url_nodes = self._nodes(
+                f'IDLE_{scope}_URLS', [url.name for url in urls],
+                {url.name for url in urls} - idle_urls)
+            realm_nodes = self._nodes(f'IDLE_{scope}_REALMS', realm_names, pins)
+            for url in urls:
+                self._hold(realm_nodes, url.realms, url_nodes[url.name])
+            for realm in realms:
+                holder = realm_nodes.get(realm.name)
+                if holder is None:  # Invalid realm name - not reported, references are kept.
+                    holder = (None, realm.name)
+                    self.pinned.add(holder)
+                self._hold(auth_servers, realm.servers, holder)
+                self._hold(roles, realm.roles, holder)
+
+        dependents = []  # (category, name, roles) of the resource profiles & policies.
+        if rs_profile is not None:
+            for category, attr in PROFILE_FAMILIES.items():
+                dependents.extend(
+                    (category, profile.name, profile.roles) for profile in getattr(rs_profile, attr))
+        if rs_policy is not None:
+            for category, attr in POLICY_FAMILIES.items():
+                dependents.extend(
+                    (category, policy_name(policy), policy.roles)
+                    for policy in getattr(rs_policy, attr)
+                    if policy.apply == 'selected')  # Excluded roles don't hold the policy.
+
+        for category, name, roles in dependents:
+            # Roles not defined in the export (or not checked) hold the object for good.
+            node = self._nodes(
+                category, [name], [name] if set(roles).difference(user_roles) else ())[name]
+            self.holders[node].update(
+                user_roles[role] for role in roles if role in user_roles)
+
+    def run(self) -> list:
+        """Removes the idle objects round by round until nothing changes.
+
+        Returns:
+            Cleanup rounds - list of {category: sorted names}."""
+
+        dependents = defaultdict(list)  # Holder -> objects it holds.
+        remaining = {}  # Object -> number of holders not removed yet.
+        for node, holders in self.holders.items():
+            remaining[node] = len(holders)
+            for holder in holders:
+                dependents[holder].append(node)
+
+        idle = [node for node, count in remaining.items() if not count and node not in self.pinned]
+        self.rounds = []
+        while idle:
+            self.rounds.append(self._round(idle))
+            released = []
+            for node in idle:
+                for dependent in dependents[node]:
+                    remaining[dependent] -= 1
+                    if not remaining[dependent] and dependent not in self.pinned:
+                        released.append(dependent)
+            idle = released
+        return self.rounds
+
+    def _round(self, nodes: list) -> dict:
+        """Round objects - category -> sorted names (report category order)."""
+
+        names = defaultdict(set)
+        for category, name in nodes:
+            names[category].add(name)
+        return {category: sorted(names[category]) for category in CATEGORIES if category in names}
+
+    def rows(self):
+        """(round, category, name) rows of the cleanup rounds."""
+
+        return ((number, category, name)
+                for number, idle in enumerate(self.rounds, start=1)
+                for category, names in idle.items()
+                for name in names)
+
+    def write_csv(self, filename: str) -> None:
+        """Writes the cleanup rounds to a CSV file"""
+
+        write_rows(filename, CLEANUP_HEADERS, self.rows())
@@ -2,13 +2,28 @@
 
 from ..api import ICSXMLParser, Optional, logger, LOGGER
 from ..xpath.iconfig import *
+from .model import AuthServer, Realm, Role, SignInURL, names, references
 
 class ICSIdleConfig(ICSXMLParser):
-    """ICS Idle Config Parser Class"""
+    """ICS Idle Config Parser Class
+
+    Config objects are kept as records (src.iconfig.model) - one tuple per object type,
+    filled by the parser method of the config section. Idle checks read the records."""
+
+    model_attrs = ('auth_servers_', 'admin_realms_', 'user_realms_', 'user_urls_', 'admin_urls_',
+                   'user_roles_', 'admin_roles_', 'aoa_roles_', 'ikev2_realms_')
 
     def __init__(self, xml_file) -> None:
         self.log_object = None
-        self.results = {}
+        self.auth_servers_ = ()
+        self.admin_realms_ = ()
+        self.user_realms_ = ()
+        self.user_urls_ = ()
+        self.admin_urls_ = ()
+        self.user_roles_ = ()
+        self.admin_roles_ = ()
+        self.aoa_roles_ = ()  # Role names referenced by the Authorization-Only policies.
+        self.ikev2_realms_ = ()  # Realm names referenced by the IKEv2 port/protocol mappings.
         super().__init__(xml_file)
 
 
@@ -24,128 +39,79 @@ class ICSIdleConfig(ICSXMLParser):
         self.misc_ikev2_realms()
 
 
-    def get_value(
-        self,
-        root_element: str,
-        element_path: str,
-        allow_dups: bool = False,
-        invalid_values: Optional[list] = None) -> None:
-        """Gets the element value"""
+    def check_section(self, root_element: str) -> bool:
+        """Checks the config section presence and logs the result (log_object messages)"""
 
         if self.check_tree(root_element):
             logger.info(LOGGER[self.log_object]['success'])
-            self.results[element_path] = self.parse_element(
-                element_path,
-                allow_dups=allow_dups,
-                invalid_values=invalid_values)
-        else:
-            self.results[element_path] = set()
-            logger.warning(LOGGER[self.log_object]['fail'])
-
-
-    def get_values(
-        self,
-        root_element: str,
-        element_path: list,
-        allow_dups: bool = False,
-        invalid_values: Optional[list] = None) -> None:
-        """Get element values from multiple paths"""
-
-        if isinstance(element_path, list):
-            if self.check_tree(root_element):
-                logger.info(LOGGER[self.log_object]['success'])
-                for elem in element_path:
-                    self.results[elem] = self.parse_element(
-                        elem,
-                        allow_dups=allow_dups,
-                        invalid_values=invalid_values)
-            else:
-                for elem in element_path:
-                    self.results[elem] = set()
-                logger.warning(LOGGER[self.log_object]['fail'])
+            return True
+        logger.warning(LOGGER[self.log_object]['fail'])
+        return False
+
+
+    def _valid(self, values, invalid_values: Optional[list] = None) -> tuple:
+        """Unique valid text values (document order) - empty & invalid values are skipped"""
+
+        invalid_values = ICSXMLParser.default_invalid_values + (invalid_values or [])
+        return tuple(dict.fromkeys(
+            value for value in values if value is not None and value not in invalid_values))
+
+
+    def _names(self, element_path: str, invalid_values: Optional[list] = None) -> tuple:
+        """Unique valid text values of the XPATH (document order)"""
+
+        return self._valid(
+            (self._intern(elem.text) for elem in self._findall(element_path)), invalid_values)
+
+
+    def _element_names(self, element, paths: list) -> tuple:
+        """Unique valid text values of the element's child paths (document order)"""
+
+        return self._valid(
+            self._intern(elem.text) for path in paths for elem in self._element_findall(element, path))
 
 
     def auth_servers(self) -> None:
         """Parse Total Auth Servers"""
 
         self.log_object = self.auth_servers.__name__
-        self.get_value(
-            root_element=AUTH_SERVERS_ROOT,
-            element_path=AUTH_SERVERS
-        )
+        if self.check_section(AUTH_SERVERS_ROOT):
+            self.auth_servers_ = tuple(
+                AuthServer(id_, name) for id_, name in enumerate(self._names(AUTH_SERVERS)))
 
     @property
     def total_auth_servers(self) -> set:
         """Get Total Auth Servers"""
-        return self.results[AUTH_SERVERS]
+        return names(self.auth_servers_)
 
 
     def signin_urls(self) -> None:
-        """Parse user & admin realms from signin_policies"""
+        """Parse user & admin sign-in URLs from signin_policies"""
 
         self.log_object = self.signin_urls.__name__
-        elements = [SIGNIN_USER_REALMS, SIGNIN_ADMIN_REALMS]
-        self.get_values(
-            root_element=SIGNIN_ROOT,
-            element_path=elements
-        )
-        self.signin_status()
-
-
-    def signin_status(self):
-        """Getting the Sign-in URLs mapping - enabled and disabled status"""
-
-        user_signin_disabled_dict = self._parse_element_dict(
-            './/access-urls/access-url',
-            'url-pattern',
-            'user/realms',
-            check_tree='user',
-            check_key='enabled',
-            check_value='false')
-
-        self.results["user_signin_disabled"] = user_signin_disabled_dict
-
-        user_signin_enabled_dict = self._parse_element_dict(
-            './/access-urls/access-url',
-            'url-pattern',
-            'user/realms',
-            check_tree='user',
-            check_key='enabled',
-            check_value='true')
-
-        self.results["user_signin_enabled"] = user_signin_enabled_dict
-
-        admin_signin_disabled_dict = self._parse_element_dict(
-            './/access-urls/access-url',
-            'url-pattern',
-            'admin/realms',
-            check_tree='admin',
-            check_key='enabled',
-            check_value='false')
-
-        self.results["admin_signin_disabled"] = admin_signin_disabled_dict
-
-        admin_signin_enabled_dict = self._parse_element_dict(
-            './/access-urls/access-url',
-            'url-pattern',
-            'admin/realms',
-            check_tree='admin',
-            check_key='enabled',
-            check_value='true')
-
-        self.results["admin_signin_enabled"] = admin_signin_enabled_dict
-
-    # Finding the idle-signing URLs
-
-        self.results["used_urls_user"] = self.used_signin_urls(
-            enabled_url=user_signin_enabled_dict,
-            disabled_url=user_signin_disabled_dict
-        )
-
-        self.results["used_urls_admin"] = self.used_signin_urls(
-            enabled_url=admin_signin_enabled_dict,
-            disabled_url=admin_signin_disabled_dict
-        )
+        if self.check_section(SIGNIN_ROOT):
+            self.user_urls_ = self._signin_urls('user')
+            self.admin_urls_ = self._signin_urls('admin')
+
+
+    def _signin_urls(self, scope: str) -> tuple:
+        """Sign-in URL records of the scope (user or admin)"""
+
+        urls = []
+        for element in self._handle_iterfind(SIGNIN_URL):
+            if self._element_check_tree(element, scope):
+                urls.append(SignInURL(
+                    len(urls),
+                    self._element_find_value(element, 'url-pattern'),
+                    enabled=self._element_find_value(element, 'enabled') == 'true',
+                    realms=self._element_names(element, [f'{scope}/realms'])))
+        return tuple(urls)
+
+
+    @staticmethod
+    def signin_status(urls: tuple, enabled: bool) -> dict:
+        """Sign-in URL -> mapped realms (set) of the enabled/disabled sign-in URLs"""
+        return {url.name: set(url.realms) for url in urls if url.enabled is enabled}
 
 
     def used_signin_urls(self, enabled_url: dict, disabled_url: dict) -> set:
@@ -171,110 +137,107 @@ class ICSIdleConfig(ICSXMLParser):
                         continue
         return used_urls
 
+
+    def _idle_urls(self, urls: tuple) -> list:
+        """Disabled sign-in URLs without any realm mapped to an enabled sign-in URL"""
+
+        disabled = self.signin_status(urls, enabled=False)
+        return sorted(set(disabled).difference(
+            self.used_signin_urls(self.signin_status(urls, enabled=True), disabled)))
+
+    def _idle_signin_realms(self, urls: tuple) -> list:
+        """Realms mapped to disabled sign-in URLs only"""
+
+        return sorted(references((url for url in urls if not url.enabled), 'realms').difference(
+            references((url for url in urls if url.enabled), 'realms')))
+
     @property
     def idle_user_urls(self) -> set:
         """Unused disabled signin URL - User"""
-        return sorted(set(list(self.results["user_signin_disabled"])).difference(
-            self.results["used_urls_user"]))
+        return self._idle_urls(self.user_urls_)
 
     @property
     def idle_admin_urls(self) -> set:
         """Unused disabled signin URL - Admin"""
-        return sorted(set(list(self.results["admin_signin_disabled"])).difference(
-            self.results["used_urls_admin"]))
+        return self._idle_urls(self.admin_urls_)
 
     @property
     def idle_signin_user_realm(self) -> set:
         """Unused user realm mapped to disabled signin URL"""
-        user_realm_signin_disabled = set().union(*self.results["user_signin_disabled"].values())
-        user_realm_signin_enabled = set().union(*self.results["user_signin_enabled"].values())
-        return sorted(user_realm_signin_disabled.difference(user_realm_signin_enabled))
+        return self._idle_signin_realms(self.user_urls_)
 
     @property
     def idle_signin_admin_realm(self) -> set:
         """Unused admin realm mapped to disabled signin URL"""
-        admin_realm_signin_disabled = set().union(*self.results["admin_signin_disabled"].values())
-        admin_realm_signin_enabled = set().union(*self.results["admin_signin_enabled"].values())
-        return sorted(admin_realm_signin_disabled.difference(admin_realm_signin_enabled))
+        return self._idle_signin_realms(self.admin_urls_)
+
+
+    def _realms(self, realm_path: str) -> tuple:
+        """Realm records - referenced servers & role-mapping roles"""
+
+        realms = []
+        for element in self._handle_iterfind(realm_path):
+            name = self._element_find(element, 'name')
+            realms.append(Realm(
+                len(realms),
+                self._intern(name.text) if name is not None else None,
+                servers=self._element_names(element, REALM_SERVER_FIELDS),
+                roles=self._element_names(element, [REALM_ROLES_FIELD])))
+        return tuple(realms)
+
 
     def user_realms(self) -> None:
-        """Parse elements present under user realms section"""
+        """Parse user realms"""
 
         self.log_object = self.user_realms.__name__
-        elements = [
-            USER_REALMS,
-            USER_REALMS_AUTHSERVER,
-            USER_REALMS_SECAUTHSERVER,
-            USER_REALMS_DIRSERVER,
-            USER_REALMS_ACCSERVER,
-            USER_REALMS_RMAP
-        ]
-        self.get_values(
-            root_element=USER_REALMS_ROOT,
-            element_path=elements
-        )
+        if self.check_section(USER_REALMS_ROOT):
+            self.user_realms_ = self._realms(USER_REALM)
 
     @property
     def total_user_realms(self) -> set:
         """Total user realms from realms data"""
-        return self.results[USER_REALMS]
+        return set(self._valid(realm.name for realm in self.user_realms_))
 
 
     def admin_realms(self) -> None:
-        """Parse elements present under Admin realms section"""
+        """Parse Admin realms"""
 
         self.log_object = self.admin_realms.__name__
-        elements = [
-            ADMIN_REALMS,
-            ADMIN_REALMS_AUTHSERVER,
-            ADMIN_REALMS_SECAUTHSERVER,
-            ADMIN_REALMS_DIRSERVER,
-            ADMIN_REALMS_ACCSERVER,
-            ADMIN_REALMS_RMAP
-        ]
-        self.get_values(
-            root_element=ADMIN_REALMS_ROOT,
-            element_path=elements
-        )
+        if self.check_section(ADMIN_REALMS_ROOT):
+            self.admin_realms_ = self._realms(ADMIN_REALM)
 
     @property
     def total_admin_realms(self) -> set:
         """Total Admin realms from realms data"""
-        return self.results[ADMIN_REALMS]
+        return set(self._valid(realm.name for realm in self.admin_realms_))
 
 
     def user_roles(self) -> None:
         """Parse total user roles from roles data"""
 
         self.log_object = self.user_roles.__name__
-
-        self.get_value(
-            root_element=USER_ROLES_ROOT,
-            element_path=USER_ROLES,
-            invalid_values=['Outlook Anywhere User Role',]
-        )
+        if self.check_section(USER_ROLES_ROOT):
+            self.user_roles_ = tuple(Role(id_, name) for id_, name in enumerate(
+                self._names(USER_ROLES, invalid_values=['Outlook Anywhere User Role',])))
 
     @property
     def total_user_roles(self) -> set:
-        """Get total user role from results dict"""
-        return self.results[USER_ROLES]
+        """Get total user roles"""
+        return names(self.user_roles_)
 
 
     def admin_roles(self) -> None:
         """Parse total admin roles from roles data"""
 
         self.log_object = self.admin_roles.__name__
-
-        self.get_value(
-            root_element=ADMIN_ROLES_ROOT,
-            element_path=ADMIN_ROLES,
-            invalid_values=['.Read-Only Administrators', '.Administrators', ]
-        )
+        if self.check_section(ADMIN_ROLES_ROOT):
+            self.admin_roles_ = tuple(Role(id_, name) for id_, name in enumerate(
+                self._names(ADMIN_ROLES, invalid_values=['.Read-Only Administrators', '.Administrators', ])))
 
     @property
     def total_admin_roles(self) -> set:
-        """Get total user role from results dict"""
-        return self.results[ADMIN_ROLES]
+        """Get total admin roles"""
+        return names(self.admin_roles_)
 
 
     def misc_aoa_roles(self) -> None:
@@ -286,12 +249,8 @@ class ICSIdleConfig(ICSXMLParser):
             if self.check_tree(MISC_AOA_ROLES):
                 logger.info(
                     "SUCCESS: (misc)Authorization-Only policy role mapping found.")
-                self.results[MISC_AOA_ROLES] = self.parse_element(
-                    MISC_AOA_ROLES)
-            else:
-                self.results[MISC_AOA_ROLES] = set()
+                self.aoa_roles_ = self._names(MISC_AOA_ROLES)
         else:
-            self.results[MISC_AOA_ROLES] = set()
             logger.warning(
                 "ERROR: (misc)Authorization-Only policy data not found.\
                 Roles data might be inaccurate!"
@@ -299,8 +258,8 @@ class ICSIdleConfig(ICSXMLParser):
 
     @property
     def aoa_roles(self) -> set:
-        """Gets the AOA roles from result"""
-        return self.results[MISC_AOA_ROLES]
+        """AOA role mappings"""
+        return set(self.aoa_roles_)
 
 
     def misc_ikev2_realms(self) -> None:
@@ -308,77 +267,63 @@ class ICSIdleConfig(ICSXMLParser):
 
         if self.check_tree(MISC_IKEV2_ROOT):
             logger.info("SUCCESS: (misc)IKEv2 config data found.")
+            realms = ()
 
             if self.check_tree(MISC_IKEV2_PORTREALM):
                 logger.info("SUCCESS: (misc)IKEv2 Port realm mapping found.")
-                self.results[MISC_IKEV2_PORTREALM] = self.parse_element(
-                    MISC_IKEV2_PORTREALM)
-            else:
-                self.results[MISC_IKEV2_PORTREALM] = set()
+                realms += self._names(MISC_IKEV2_PORTREALM)
 
             if self.check_tree(MISC_IKEV2_PROTOREALM):
                 logger.info(
                     "SUCCESS: (misc)IKEv2 Protocol realm mapping found.")
-                self.results[MISC_IKEV2_PROTOREALM] = self.parse_element(
-                    MISC_IKEV2_PROTOREALM)
-            else:
-                self.results[MISC_IKEV2_PROTOREALM] = set()
+                realms += self._names(MISC_IKEV2_PROTOREALM)
 
-            self.results[MISC_IKEV2_REALMS] = self.results[MISC_IKEV2_PORTREALM].union(
-                self.results[MISC_IKEV2_PROTOREALM]
-            )  # Union them to get all realms.
+            self.ikev2_realms_ = self._valid(realms)  # Union of both mappings.
 
         else:
             logger.warning(
                 "ERROR: (misc)IKEv2 Config data not found. Realms data might be inaccurate!")
-            self.results[MISC_IKEV2_REALMS] = set()
 
     @property
     def ikev2_realms(self) -> set:
         """IKEv2 Realms configured"""
-        return self.results[MISC_IKEV2_REALMS]
+        return set(self.ikev2_realms_)
 
 
     @property
     def idle_user_realms(self) -> set:
         """Idle User realms"""
         return sorted(self.total_user_realms.difference(
-            self.results[SIGNIN_USER_REALMS],
-            self.results[MISC_IKEV2_REALMS]
+            references(self.user_urls_, 'realms'),
+            self.ikev2_realms_
         ))
 
     @property
     def idle_admin_realms(self) -> set:
         """Idle Admin realms"""
         return sorted(self.total_admin_realms.difference(
-            self.results[SIGNIN_ADMIN_REALMS]
+            references(self.admin_urls_, 'realms')
         ))
 
     @property
     def idle_auth_servers(self) -> set:
         """Idle Auth Servers"""
         return sorted(self.total_auth_servers.difference(
-            self.results[USER_REALMS_AUTHSERVER],
-            self.results[USER_REALMS_SECAUTHSERVER],
-            self.results[USER_REALMS_DIRSERVER],
-            self.results[USER_REALMS_ACCSERVER],
-            self.results[ADMIN_REALMS_AUTHSERVER],
-            self.results[ADMIN_REALMS_SECAUTHSERVER],
-            self.results[ADMIN_REALMS_DIRSERVER],
-            self.results[ADMIN_REALMS_ACCSERVER]
+            references(self.user_realms_, 'servers'),
+            references(self.admin_realms_, 'servers')
         ))
 
     @property
     def idle_user_roles(self) -> set:
         """Idle User roles"""
         return sorted(self.total_user_roles.difference(
-            self.results[USER_REALMS_RMAP],
-            self.results[MISC_AOA_ROLES]
+            references(self.user_realms_, 'roles'),
+            self.aoa_roles_
         ))
 
     @property
     def idle_admin_roles(self) -> set:
         """Idle Admin roles"""
         return sorted(self.total_admin_roles.difference(
-            self.results[ADMIN_REALMS_RMAP]
+            references(self.admin_realms_, 'roles')
         ))
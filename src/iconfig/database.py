@@ -0,0 +1,193 @@
+"""
+SQLite export of the extracted config model (src.iconfig.model records).
+
+Ad-hoc questions - which realms use an auth server, which policies reference a role - are
+answered with SQL instead of re-parsing the export. Records are bulk-inserted table by table
+(`executemany` over generators, BATCH_SIZE rows at a time) in a single transaction, indexes
+are created after the inserts.
+
+    SELECT r.scope, r.name FROM realms r JOIN realm_servers s ON s.realm_id = r.id
+    WHERE s.server = 'LDAP-1';
+
+    SELECT p.family, p.policy_type, p.name FROM resource_policies p
+    JOIN policy_roles pr ON pr.policy_id = p.id WHERE pr.role = 'Role-12';
+
+Resource policies applied to all roles aren't part of the model (see ResourcePolicy), so they
+are not exported. Tables of an earlier export are replaced - other tables are left as is.
+
+"""
+
+import sqlite3
+from itertools import islice
+from typing import Iterable, Optional
+from .config import ICSIdleConfig
+from .rspolicy import ICSRSPolicy
+from .rsprofile import ICSRSProfile
+from .cleanup import PROFILE_FAMILIES, POLICY_FAMILIES
+
+BATCH_SIZE = 10000
+
+# Table -> columns (first column - integer primary key of the object tables).
+SCHEMA = {
+    'auth_servers': 'id INTEGER PRIMARY KEY, name TEXT NOT NULL, idle INTEGER NOT NULL',
+    'realms': 'id INTEGER PRIMARY KEY, scope TEXT NOT NULL, name TEXT, idle INTEGER NOT NULL',
+    'realm_servers': 'realm_id INTEGER NOT NULL REFERENCES realms(id), server TEXT NOT NULL',
+    'realm_roles': 'realm_id INTEGER NOT NULL REFERENCES realms(id), role TEXT NOT NULL',
+    'signin_urls': ('id INTEGER PRIMARY KEY, scope TEXT NOT NULL, url TEXT, '
+                    'enabled INTEGER NOT NULL, idle INTEGER NOT NULL'),
+    'signin_url_realms': ('url_id INTEGER NOT NULL REFERENCES signin_urls(id), '
+                          'realm TEXT NOT NULL'),
+    'roles': ('id INTEGER PRIMARY KEY, scope TEXT NOT NULL, name TEXT NOT NULL, '
+              'idle INTEGER NOT NULL'),
+    'resource_policies': ('id INTEGER PRIMARY KEY, family TEXT NOT NULL, '
+                          'policy_type TEXT NOT NULL, name TEXT, apply TEXT NOT NULL'),
+    'policy_roles': ('policy_id INTEGER NOT NULL REFERENCES resource_policies(id), '
+                     'role TEXT NOT NULL'),
+    'resource_profiles': ('id INTEGER PRIMARY KEY, family TEXT NOT NULL, name TEXT, '
+                          'idle INTEGER NOT NULL'),
+    'profile_roles': ('profile_id INTEGER NOT NULL REFERENCES resource_profiles(id), '
+                      'role TEXT NOT NULL'),
+    'misc_references': 'kind TEXT NOT NULL, name TEXT NOT NULL',
+}
+
+# Table -> indexed columns (names & references).
+INDEXES = {
+    'auth_servers': ['name'],
+    'realms': ['name'],
+    'realm_servers': ['realm_id', 'server'],
+    'realm_roles': ['realm_id', 'role'],
+    'signin_urls': ['url'],
+    'signin_url_realms': ['url_id', 'realm'],
+    'roles': ['name'],
+    'resource_policies': ['name'],
+    'policy_roles': ['policy_id', 'role'],
+    'resource_profiles': ['name'],
+    'profile_roles': ['profile_id', 'role'],
+    'misc_references': ['name'],
+}
+
+
+class ICSModelDatabase:
+    """
+    SQLite export of the config model
+
+    Attributes:
+        filename: filepath of the SQLite database.
+        rows: table -> number of rows inserted.
+
+    """
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self.rows = {}
+        self._ids = {}  # Table -> next ID.
+
+    def _next_ids(self, table: str, records: Iterable) -> Iterable[tuple]:
+        """(ID, record) pairs - IDs continue across the record tuples of the table."""
+
+        for record in records:
+            id_ = self._ids.get(table, 0)
+            self._ids[table] = id_ + 1
+            yield id_, record
+
+    def _insert(self, conn: sqlite3.Connection, table: str, rows: Iterable[tuple]) -> None:
+        """Bulk insert - executemany over BATCH_SIZE row slices."""
+
+        columns = len(SCHEMA[table].split(','))
+        statement = f"INSERT INTO {table} VALUES ({', '.join('?' * columns)})"
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, BATCH_SIZE))
+            if not batch:
+                break
+            conn.executemany(statement, batch)
+            self.rows[table] = self.rows.get(table, 0) + len(batch)
+
+    def _realms(self, conn, scope: str, realms: tuple, idle: set) -> None:
+        """Realms of the scope & their server / role-mapping role references"""
+
+        realms = tuple(self._next_ids('realms', realms))
+        self._insert(conn, 'realms', (
+            (id_, scope, realm.name, realm.name in idle) for id_, realm in realms))
+        self._insert(conn, 'realm_servers', (
+            (id_, server) for id_, realm in realms for server in realm.servers))
+        self._insert(conn, 'realm_roles', (
+            (id_, role) for id_, realm in realms for role in realm.roles))
+
+    def _signin_urls(self, conn, scope: str, urls: tuple, idle: set) -> None:
+        """Sign-in URLs of the scope & their realm references"""
+
+        urls = tuple(self._next_ids('signin_urls', urls))
+        self._insert(conn, 'signin_urls', (
+            (id_, scope, url.name, url.enabled, url.name in idle) for id_, url in urls))
+        self._insert(conn, 'signin_url_realms', (
+            (id_, realm) for id_, url in urls for realm in url.realms))
+
+    def write(
+            self,
+            config: ICSIdleConfig,
+            rs_policy: Optional[ICSRSPolicy] = None,
+            rs_profile: Optional[ICSRSProfile] = None) -> dict:
+        """Exports the config model records - single transaction, indexes built last.
+
+        Returns:
+            Table -> number of rows inserted."""
+
+        self.rows = {}
+        self._ids = {}
+        conn = sqlite3.connect(self.filename)
+        try:
+            with conn:  # Single transaction - committed at the end, rolled back on errors.
+                conn.execute("BEGIN")  # Table (re)creation is part of the transaction.
+                for table, columns in SCHEMA.items():
+                    conn.execute(f"DROP TABLE IF EXISTS {table}")
+                    conn.execute(f"CREATE TABLE {table} ({columns})")
+
+                idle = set(config.idle_auth_servers)
+                self._insert(conn, 'auth_servers', (
+                    (id_, server.name, server.name in idle)
+                    for id_, server in self._next_ids('auth_servers', config.auth_servers_)))
+
+                self._realms(conn, 'user', config.user_realms_, set(config.idle_user_realms))
+                self._realms(conn, 'admin', config.admin_realms_, set(config.idle_admin_realms))
+                self._signin_urls(conn, 'user', config.user_urls_, set(config.idle_user_urls))
+                self._signin_urls(conn, 'admin', config.admin_urls_, set(config.idle_admin_urls))
+
+                for scope, roles, idle in (
+                        ('user', config.user_roles_, set(config.idle_user_roles)),
+                        ('admin', config.admin_roles_, set(config.idle_admin_roles))):
+                    self._insert(conn, 'roles', (
+                        (id_, scope, role.name, role.name in idle)
+                        for id_, role in self._next_ids('roles', roles)))
+
+                self._insert(conn, 'misc_references', [
+                    ('aoa_role', name) for name in config.aoa_roles_] + [
+                    ('ikev2_realm', name) for name in config.ikev2_realms_])
+
+                if rs_policy is not None:
+                    for family, attr in POLICY_FAMILIES.items():
+                        policies = tuple(
+                            self._next_ids('resource_policies', getattr(rs_policy, attr)))
+                        self._insert(conn, 'resource_policies', (
+                            (id_, family, policy.policy_type.rpartition('/')[2], policy.name,
+                             policy.apply) for id_, policy in policies))
+                        self._insert(conn, 'policy_roles', (
+                            (id_, role) for id_, policy in policies for role in policy.roles))
+
+                if rs_profile is not None:
+                    for family, attr in PROFILE_FAMILIES.items():
+                        profiles = tuple(
+                            self._next_ids('resource_profiles', getattr(rs_profile, attr)))
+                        self._insert(conn, 'resource_profiles', (
+                            (id_, family, profile.name, not profile.roles)
+                            for id_, profile in profiles))
+                        self._insert(conn, 'profile_roles', (
+                            (id_, role) for id_, profile in profiles for role in profile.roles))
+
+                for table, columns in INDEXES.items():
+                    for column in columns:
+                        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} "
+                                     f"ON {table} ({column})")
+        finally:
+            conn.close()
+        return self.rows
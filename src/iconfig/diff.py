@@ -0,0 +1,218 @@
+"""
+Idle config diff between two XML exports of the same appliance.
+
+Baseline (previous) export is analyzed first. While analyzing the current export, each parser
+method (stage) whose config section content is unchanged reuses the baseline results instead
+of running the XML queries again - only the changed sections are recomputed.
+
+Stage inputs are the ROOT XPATH objects (src.xpath) of the config section read by the method.
+Section digests of plain XML exports are computed from the raw bytes (src.api.source) before
+anything is parsed - only the top-level sections holding a changed config section are parsed
+from the current export (nothing at all if every section is unchanged). Compressed exports
+are parsed in full and digested from the parsed tree.
+
+"""
+
+from contextlib import nullcontext
+from hashlib import sha256
+from typing import Optional
+from ..api import ICSXMLDocument, logger
+from ..api.source import element_digests
+from .config import ICSIdleConfig
+from .rspolicy import ICSRSPolicy
+from .rsprofile import ICSRSProfile
+from .report import write_rows
+from .stages import (
+    STAGES, IDLE_CATEGORIES, PROFILE_CATEGORIES, POLICY_CATEGORIES, run_stage, apply_stage)
+
+
+def root_tag(path: str) -> str:
+    """Element tag of the ROOT XPATH object, i.e., './/web-policies' -> 'web-policies'."""
+    return path.lstrip('./')
+
+
+def stage_digests(xml_file: str) -> Optional[dict]:
+    """Digests of the config sections read by each stage - raw bytes of the ROOT elements,
+    nothing is parsed (see src.api.source.element_digests).
+
+    Returns:
+        (parser, stage) -> digest. None if the export can't be scanned (compressed, etc.)."""
+
+    roots = {root_tag(root) for stages in STAGES.values() for _, paths in stages for root in paths}
+    digests = element_digests(xml_file, roots)
+    if digests is None:
+        return None
+
+    result = {}
+    for name, stages in STAGES.items():
+        for stage, paths in stages:
+            digest = sha256()
+            for path in paths:
+                digest.update(f"{path}\x00{digests[root_tag(path)]}\x01".encode('utf-8'))
+            result[(name, stage)] = digest.hexdigest()
+    return result
+
+
+class ICSConfigDiff:
+    """
+    Idle config diff between two XML exports
+
+    Attributes:
+        baseline_file: filepath of the previous XML export.
+        xml_file: filepath of the current XML export.
+        streaming: If set, XML exports are parsed with the streaming engine.
+        backend: XML backend - etree (default), lxml or auto.
+        changes: report category -> {'added': sorted list, 'removed': sorted list}
+        reused: parser methods (stages) reused from the baseline export.
+
+    """
+
+    def __init__(
+            self,
+            baseline_file: str,
+            xml_file: str,
+            streaming: bool = False,
+            backend: Optional[str] = None) -> None:
+        self.baseline_file = baseline_file
+        self.xml_file = xml_file
+        self.streaming = streaming
+        self.backend = backend
+        self.changes = {}
+        self.reused = []
+
+    def compare(self) -> dict:
+        """Analyzes both XML exports and returns the idle objects added/removed since the baseline."""
+
+        baseline_digests = stage_digests(self.baseline_file)
+        digests = stage_digests(self.xml_file) if baseline_digests is not None else None
+        if digests is None:  # Both exports are digested the same way.
+            baseline_digests = None
+            logger.info("Compressed XML export - config sections digested after parsing.")
+
+        logger.info("Analyzing baseline XML export - %s", self.baseline_file)
+        baseline = self._analyze(self.baseline_file, baseline_digests)
+        logger.info("Analyzing current XML export - %s", self.xml_file)
+        current = self._analyze(self.xml_file, digests, reference=baseline)
+
+        old_objects = self._idle_objects(baseline)
+        new_objects = self._idle_objects(current)
+        self.changes = {
+            category: {
+                'added': sorted(new_objects[category].difference(old_objects[category])),
+                'removed': sorted(old_objects[category].difference(new_objects[category]))
+            }
+            for category in new_objects
+        }
+        return self.changes
+
+    def _analyze(
+            self,
+            xml_file: str,
+            digests: Optional[dict] = None,
+            reference: Optional[dict] = None) -> dict:
+        """Runs all the parser stages over the XML export.
+
+        Args:
+            xml_file: filepath of the XML export.
+            digests: stage digests computed before parsing (see stage_digests) - if set with
+                the reference, only the sections of the changed stages are parsed.
+            reference: analysis of the baseline export - stage results are reused when the
+                config section digest is unchanged.
+
+        Returns:
+            Dictionary with the parsers, stage digests & stage deltas."""
+
+        analysis = {'parsers': {}, 'digests': dict(digests or {}), 'deltas': {}}
+        sections = None
+        if digests is not None and reference is not None:
+            sections = {root_tag(root)
+                        for name, stages in STAGES.items() for stage, roots in stages
+                        if reference['digests'].get((name, stage)) != digests[(name, stage)]
+                        for root in roots}
+
+        if sections is not None and not sections:
+            logger.info("All config sections unchanged - XML export not parsed.")
+            document = None
+        else:
+            document = ICSXMLDocument(
+                xml_file, streaming=self.streaming, backend=self.backend, sections=sections)
+
+        with document if document is not None else nullcontext():
+            config = ICSIdleConfig(document)
+            self._run_stages(config, analysis, reference)
+            config.release()
+
+            rs_policy = ICSRSPolicy(document, config.idle_user_roles)
+            self._run_stages(rs_policy, analysis, reference)
+            rs_policy.release()
+
+            rs_profile = ICSRSProfile(document)
+            self._run_stages(rs_profile, analysis, reference)
+            rs_profile.release()
+
+        return analysis
+
+    def _run_stages(self, parser, analysis: dict, reference: dict = None) -> None:
+        """Runs (or reuses from the reference analysis) each stage of the parser."""
+
+        name = type(parser).__name__
+        analysis['parsers'][name] = parser
+        for stage, roots in STAGES[name]:
+            key = (name, stage)
+            digest = analysis['digests'].get(key)
+            if digest is None:
+                digest = analysis['digests'][key] = parser.content_digest(roots)
+
+            if reference is not None and reference['digests'].get(key) == digest:
+                delta = reference['deltas'][key]
+                apply_stage(parser, delta)
+                self.reused.append(stage)
+                logger.info("UNCHANGED: %s - baseline results reused.", stage)
+            else:
+                delta = run_stage(parser, stage)
+            analysis['deltas'][key] = delta
+
+    @staticmethod
+    def _idle_objects(analysis: dict) -> dict:
+        """Returns the idle objects of the analysis - report category -> set of names."""
+
+        config = analysis['parsers'][ICSIdleConfig.__name__]
+        rs_policy = analysis['parsers'][ICSRSPolicy.__name__]
+        rs_profile = analysis['parsers'][ICSRSProfile.__name__]
+
+        objects = {category: set(getattr(config, prop))
+                   for category, prop in IDLE_CATEGORIES.items()}
+        objects.update({category: set(getattr(rs_profile, prop))
+                        for category, prop in PROFILE_CATEGORIES.items()})
+
+        for category, attr in POLICY_CATEGORIES.items():
+            objects[category] = {
+                f"{role} -> {policy_type.rpartition('/')[2]}:{policy}"
+                for role, dependencies in rs_policy.policy_index[attr].items()
+                for policy_type, policies in dependencies.items()
+                for policy in policies
+            }
+        return objects
+
+    def console_output(self) -> None:
+        """Prints the added/removed idle objects"""
+
+        for category, change in self.changes.items():
+            if not change['added'] and not change['removed']:
+                continue
+            logger.info("%s - %d added, %d removed\n",
+                        category, len(change['added']), len(change['removed']))
+            for name in change['added']:
+                print(f"+ {name}")
+            for name in change['removed']:
+                print(f"- {name}")
+            print()
+
+    def write_csv(self, filename: str) -> None:
+        """Writes the added/removed idle objects to a CSV file"""
+
+        write_rows(filename, ["CATEGORY", "CHANGE", "NAME"], (
+            (category, action, name)
+            for category, change in self.changes.items()
+            for action, names in (("ADDED", change['added']), ("REMOVED", change['removed']))
+            for name in names))
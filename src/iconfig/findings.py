@@ -0,0 +1,62 @@
+"""
+NDJSON findings writer - one JSON object per idle config finding, for log pipelines.
+
+Findings are written (and flushed) by the pipeline stages as soon as each check completes -
+ingestion can start before the run finishes. No padding & no report buffering, unlike the
+column-per-category CSV reports (src.iconfig.report).
+
+    {"category": "IDLE_USER_ROLES", "name": "Role-12", "appliance": "vpn-01",
+     "depends_on": ["web-acl:Intranet"]}
+
+depends_on lists the objects referencing the idle object (resource policies of idle user
+roles, see ICSRSPolicy.role_dependencies) - empty for the other categories.
+
+"""
+
+import json
+import threading
+from typing import Callable, Iterable, Optional, TextIO
+
+FINDING_FIELDS = ('category', 'name', 'appliance', 'depends_on')
+
+
+class ICSFindingsWriter:
+    """
+    NDJSON findings writer (thread-safe - pipeline stages write concurrently)
+
+    Attributes:
+        file_handle: text stream the findings are written to (file or stdout).
+        appliance: appliance name added to each finding.
+        count: number of findings written.
+
+    """
+
+    def __init__(self, file_handle: TextIO, appliance: str) -> None:
+        self.file_handle = file_handle
+        self.appliance = appliance
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def write(
+            self,
+            category: str,
+            names: Iterable[str],
+            depends_on: Optional[Callable[[str], list]] = None) -> int:
+        """Writes the findings of the category - one line per object name.
+
+        Args:
+            depends_on: object name -> referencing objects (optional).
+
+        Returns:
+            Number of findings written."""
+
+        count = 0
+        with self._lock:  # Lines of concurrent stages must not interleave.
+            for name in names:
+                self.file_handle.write(json.dumps(dict(zip(FINDING_FIELDS, (
+                    category, name, self.appliance,
+                    depends_on(name) if depends_on is not None else [])))) + '\n')
+                count += 1
+            self.file_handle.flush()
+            self.count += count
+        return count
@@ -0,0 +1,136 @@
+"""
+ICS Idle Config - object model.
+
+Config objects extracted by the parsers are kept as compact `__slots__` records (no per-object
+`__dict__`) in tuples - one tuple (table) per object type, filled once by the parser stage.
+Record IDs are the positions in their table. References to other objects (auth servers of a
+realm, roles of a role-mapping rule or a resource policy, etc.) are tuples of object names -
+config sections are parsed independently (and concurrently), so references are resolved by
+name when the idle checks run.
+
+Records are plain data - cheap to pickle (model cache) and to pass between processes (batch).
+
+"""
+
+from typing import Iterable
+
+
+class ICSRecord:
+    """Base record - ID (position in the table) & object name"""
+
+    __slots__ = ('id', 'name')
+
+    def __init__(self, id_: int, name: str) -> None:
+        self.id = id_
+        self.name = name
+
+    def _values(self) -> tuple:
+        """Slot values (base class slots first)."""
+        return tuple(getattr(self, field)
+                     for cls in reversed(type(self).__mro__)
+                     for field in cls.__dict__.get('__slots__', ()))
+
+    def __reduce__(self) -> tuple:
+        return type(self), self._values()
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and self._values() == other._values()
+
+    def __hash__(self) -> int:
+        return hash((type(self), self._values()))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}{self._values()!r}"
+
+
+class AuthServer(ICSRecord):
+    """Authentication server"""
+
+    __slots__ = ()
+
+
+class Realm(ICSRecord):
+    """User/admin authentication realm
+
+    Attributes:
+        servers: referenced servers - authentication, secondary authentication, directory
+            & accounting server names.
+        roles: roles of the role-mapping rules.
+    """
+
+    __slots__ = ('servers', 'roles')
+
+    def __init__(self, id_: int, name: str, servers: tuple = (), roles: tuple = ()) -> None:
+        super().__init__(id_, name)
+        self.servers = servers
+        self.roles = roles
+
+
+class Role(ICSRecord):
+    """User/admin role"""
+
+    __slots__ = ()
+
+
+class SignInURL(ICSRecord):
+    """User/admin sign-in URL (name - URL pattern)
+
+    Attributes:
+        enabled: sign-in URL status.
+        realms: realms mapped to the sign-in URL.
+    """
+
+    __slots__ = ('enabled', 'realms')
+
+    def __init__(self, id_: int, name: str, enabled: bool = True, realms: tuple = ()) -> None:
+        super().__init__(id_, name)
+        self.enabled = enabled
+        self.realms = realms
+
+
+class ResourcePolicy(ICSRecord):
+    """Role-scoped resource policy (policies applied to all roles are not recorded)
+
+    Attributes:
+        policy_type: XPATH object of the policy type (src.xpath.rspolicy).
+        apply: role scope - selected or except (roles listed are excluded).
+        roles: roles listed by the policy (sorted).
+    """
+
+    __slots__ = ('policy_type', 'apply', 'roles')
+
+    def __init__(
+            self,
+            id_: int,
+            name: str,
+            policy_type: str = '',
+            apply: str = 'selected',
+            roles: tuple = ()) -> None:
+        super().__init__(id_, name)
+        self.policy_type = policy_type
+        self.apply = apply
+        self.roles = roles
+
+
+class ResourceProfile(ICSRecord):
+    """Resource profile
+
+    Attributes:
+        roles: roles the profile is mapped to (idle profile - no roles).
+    """
+
+    __slots__ = ('roles',)
+
+    def __init__(self, id_: int, name: str, roles: tuple = ()) -> None:
+        super().__init__(id_, name)
+        self.roles = roles
+
+
+def names(records: Iterable[ICSRecord]) -> set:
+    """Names of the records."""
+    return {record.name for record in records}
+
+
+def references(records: Iterable[ICSRecord], field: str) -> set:
+    """Object names referenced by the records through the reference field (tuple)."""
+    return {name for record in records for name in getattr(record, field)}
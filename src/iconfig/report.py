@@ -0,0 +1,60 @@
+"""
+CSV report writer shared by the idle config, resource policy & resource profile reports.
+
+Rows are streamed from column iterators (zip_longest) straight into csv.writer.writerows -
+padding cells are only produced while writing, so memory is linear in the real data (no padded
+column lists, no per-row dicts). Report time & size still include the padding cells - grouped
+rows (resource policy reports) pad every group to the same length.
+
+"""
+
+from csv import writer
+from itertools import zip_longest
+from typing import Iterable, Iterator
+
+
+def write_rows(filename: str, headers: list, rows: Iterable) -> None:
+    """Writes the header & streams the rows to the CSV file"""
+
+    with open(filename, mode='w', encoding='utf-8', newline='') as file_handle:
+        write_output = writer(file_handle, dialect='excel')
+        write_output.writerow(headers)
+        write_output.writerows(rows)
+
+
+def column_rows(columns: Iterable[Iterable], fillvalue: str = " ") -> Iterator[tuple]:
+    """Rows from the columns - shorter columns are filled with the fill value"""
+
+    return zip_longest(*columns, fillvalue=fillvalue)
+
+
+def grouped_rows(
+        groups: Iterable[tuple],
+        length: int,
+        fillvalue: str = "",
+        keyfill: str = " ") -> Iterator[tuple]:
+    """
+    Rows for the grouped columns - (key, columns) pairs, e.g. idle role -> policy types.
+
+    Every group is written as a block of `length` rows (shorter columns are filled with the fill
+    value), the key on the first row of its block only (key fill on the others). Nothing is
+    written if the length is 0.
+    """
+
+    if not length:
+        return
+    for key, columns in groups:
+        columns = [iter(column) for column in columns]
+        for index in range(length):
+            yield (key if not index else keyfill,) + tuple(
+                next(column, fillvalue) for column in columns)
+
+
+def write_columns(
+        filename: str,
+        headers: list,
+        columns: Iterable[Iterable],
+        fillvalue: str = " ") -> None:
+    """Writes the columns (one per header) to the CSV file"""
+
+    write_rows(filename, headers, column_rows(columns, fillvalue=fillvalue))
@@ -11,26 +11,46 @@ CHG-01 -> RS policy parser logic updated, max_length optimizations made.
 CHG-02 -> Added "role_value" args for resource_policy_w_parent, resource_policy. file-policies &
           network-connect-bandwidth-policy using "role" tag instead "roles".
 
+[v1.1.0]
+CHG-03 -> Idle role dependencies read from the role -> policy inverted index (policy_index).
+          CSV rows streamed by src.iconfig.report - same rows, padding cells produced while writing.
+CHG-04 -> Policy families kept as ResourcePolicy records (src.iconfig.model) - empty tuple when
+          the policy data is not found.
+CHG-05 -> role_dependencies - resource policies of an idle role (`type:name` labels, shared with
+          the cleanup rounds & NDJSON findings).
+
 """
 from collections import defaultdict
-from csv import DictWriter
-from ..api import ICSXMLParser, logger, LOGGER
+from typing import Generator
+from ..api import ICSXMLParser, Optional, logger, LOGGER
+from ..api.memory import ICSSpillStore
+from .report import write_rows, grouped_rows
+from .model import ResourcePolicy
 from ..xpath.rspolicy import *
 
 
+def policy_label(policy_type: str, name: str) -> str:
+    """Resource policy label - policy type (element tag) & name, i.e., `web-acl:Intranet`."""
+    return f"{policy_type.rpartition('/')[2]}:{name}"
+
+
 class ICSRSPolicy(ICSXMLParser):
     """Base class for Resource policy parsing"""
 
+    model_attrs = ('web_policies_', 'file_policies_', 'sam_policies_', 'termserv_policies_',
+                   'html5_policies_', 'vpntunnel_policies_')
+
     def __init__(self, xml_file: str, idle_user_roles: set) -> None:
         self.log_object = ''
-        self.web_policies_ = {}
-        self.file_policies_ = {}
-        self.sam_policies_ = {}
-        self.termserv_policies_ = {}
-        self.html5_policies_ = {}
-        self.vpntunnel_policies_ = {}
+        self.web_policies_ = ()
+        self.file_policies_ = ()
+        self.sam_policies_ = ()
+        self.termserv_policies_ = ()
+        self.html5_policies_ = ()
+        self.vpntunnel_policies_ = ()
         self.idle_user_roles = idle_user_roles
-        self.policy_length = []
+        self._policy_index = None
+        self._spill_store = None
         super().__init__(xml_file)
 
     def rs_policies(self) -> None:
@@ -45,12 +65,14 @@ class ICSRSPolicy(ICSXMLParser):
     def resource_policy_w_parent(
             self,
             rspolicy_path: str,
-            role_value: str = "roles") -> set:
+            role_value: str = "roles") -> dict:
         """Parsing Resource access policy (PARENT-TYPE) - Selected & Excluded policies
         ("All Roles" will be ignored)"""
 
         #CHG-02 -> _element_findall_values args changed to role_value.
-        return {self._element_find_value(policy, "name"): sorted(self._element_findall_values(policy, role_value))
+        return {self._element_find_value(policy, "name"): (
+                    self._element_find_value(policy, "apply"),
+                    tuple(sorted(self._element_findall_values(policy, role_value))))
                 for policy in self._handle_iterfind(rspolicy_path)
                 if (self._element_find_value(policy, "parent-type") == "none" and
                 (self._element_find_value(policy, "apply") != "all"))
@@ -59,21 +81,38 @@ class ICSRSPolicy(ICSXMLParser):
     def resource_policy(
             self,
             rspolicy_path: str,
-            role_value: str = "roles") -> set:
+            role_value: str = "roles") -> dict:
         """Parsing Resource access policy (NON-PARENT TYPE) - Selected & Excluded policies
         ("All Roles" will be ignored)"""
 
         #CHG-02 -> _element_findall_values args changed to role_value.
-        return {self._element_find_value(policy, "name"): sorted(self._element_findall_values(policy, role_value))
+        return {self._element_find_value(policy, "name"): (
+                    self._element_find_value(policy, "apply"),
+                    tuple(sorted(self._element_findall_values(policy, role_value))))
                 for policy in self._handle_iterfind(rspolicy_path)
                 if (self._element_find_value(policy, "apply") != "all")
                 }
 
+    @staticmethod
+    def policy_records(policies: dict) -> tuple:
+        """ResourcePolicy records of the policy family.
+
+        Args:
+            policies: policy type (XPATH) -> policy name -> (apply, roles)."""
+
+        return tuple(
+            ResourcePolicy(id_, name, policy_type, apply, roles)
+            for id_, (policy_type, name, (apply, roles)) in enumerate(
+                (policy_type, name, policy)
+                for policy_type, policy_type_policies in policies.items()
+                for name, policy in policy_type_policies.items()))
+
     def web_policies(self) -> None:
         """Web Policies"""
         self.log_object = self.web_policies.__name__
         if self.check_tree(WEB_ROOT):
             logger.info(LOGGER[self.log_object]['success'])
+            policies = {}
             for elem in [
                 WEB_ACL,
                 WEB_SSO_BASIC_NTLM,
@@ -86,7 +125,7 @@ class ICSRSPolicy(ICSXMLParser):
                 WEB_COMPRESS_ACL,
                 WEB_LAUNCHJSAM,
                 WEB_CLIENTAUTH]:
-                self.web_policies_[elem] = self.resource_policy_w_parent(elem)
+                policies[elem] = self.resource_policy_w_parent(elem)
 
             for elem in [
                 WEB_SAML_ACCESS,
@@ -98,9 +137,9 @@ class ICSRSPolicy(ICSXMLParser):
                 WEB_ENCODING,
                 WEB_SAML_EXTERNAL
             ]:
-                self.web_policies_[elem] = self.resource_policy(elem)
+                policies[elem] = self.resource_policy(elem)
+            self.web_policies_ = self.policy_records(policies)
         else:
-            self.web_policies_ = set()
             logger.warning(LOGGER[self.log_object]['fail'])
 
     def file_policies(self) -> None:
@@ -108,15 +147,15 @@ class ICSRSPolicy(ICSXMLParser):
         self.log_object = self.file_policies.__name__
         if self.check_tree(FILE_ROOT):
             logger.info(LOGGER[self.log_object]['success'])
-            for elem in [
-                FILE_WIN_ACL,
-                FILE_WIN_COMPRESS_ACL,
-                FILE_WIN_SSO_ACL,
-            ]:
-                # CHG-02 -> Applied
-                self.file_policies_[elem] = self.resource_policy_w_parent(elem, role_value="role")
+            # CHG-02 -> Applied
+            self.file_policies_ = self.policy_records({
+                elem: self.resource_policy_w_parent(elem, role_value="role")
+                for elem in [
+                    FILE_WIN_ACL,
+                    FILE_WIN_COMPRESS_ACL,
+                    FILE_WIN_SSO_ACL,
+                ]})
         else:
-            self.file_policies_ = set()
             logger.warning(LOGGER[self.log_object]['fail'])
 
     def sam_policies(self) -> None:
@@ -124,10 +163,9 @@ class ICSRSPolicy(ICSXMLParser):
         self.log_object = self.sam_policies.__name__
         if self.check_tree(SAM_ROOT):
             logger.info(LOGGER[self.log_object]['success'])
-            self.sam_policies_[
-                SAM_ACL] = self.resource_policy_w_parent(SAM_ACL)
+            self.sam_policies_ = self.policy_records({
+                SAM_ACL: self.resource_policy_w_parent(SAM_ACL)})
         else:
-            self.sam_policies_ = set()
             logger.warning(LOGGER[self.log_object]['fail'])
 
     def termserv_policies(self) -> None:
@@ -135,10 +173,9 @@ class ICSRSPolicy(ICSXMLParser):
         self.log_object = self.termserv_policies.__name__
         if self.check_tree(TERM_SERV_ROOT):
             logger.info(LOGGER[self.log_object]['success'])
-            self.termserv_policies_[
-                TERM_SERV_ACL] = self.resource_policy_w_parent(TERM_SERV_ACL)
+            self.termserv_policies_ = self.policy_records({
+                TERM_SERV_ACL: self.resource_policy_w_parent(TERM_SERV_ACL)})
         else:
-            self.termserv_policies_ = set()
             logger.warning(LOGGER[self.log_object]['fail'])
 
     def html5_policies(self) -> None:
@@ -146,10 +183,9 @@ class ICSRSPolicy(ICSXMLParser):
         self.log_object = self.html5_policies.__name__
         if self.check_tree(HTML5_ROOT):
             logger.info(LOGGER[self.log_object]['success'])
-            self.html5_policies_[
-                HTML5_ACL] = self.resource_policy_w_parent(HTML5_ACL)
+            self.html5_policies_ = self.policy_records({
+                HTML5_ACL: self.resource_policy_w_parent(HTML5_ACL)})
         else:
-            self.html5_policies_ = set()
             logger.warning(LOGGER[self.log_object]['fail'])
 
     def vpntunnel_policies(self) -> None:
@@ -160,234 +196,157 @@ class ICSRSPolicy(ICSXMLParser):
         if self.check_tree(NC_ROOT):
             logger.info(LOGGER[self.log_object]['success'])
 
-            # NC_BWIDTH removed and added as separated as that's only policy with "role" tag.
+            policies = {}
             for elem in [
                 NC_ACL,
                 NC_CONNPROF,
                 NC_STUNNEL,
                 NC_NODE_CONNPROF
             ]:
-                self.vpntunnel_policies_[
-                    elem] = self.resource_policy(elem)
-                self.vpntunnel_policies_[
-                    NC_BWIDTH] = self.resource_policy(NC_BWIDTH, role_value="role")
+                policies[elem] = self.resource_policy(elem)
+            # NC_BWIDTH removed and added as separated as that's only policy with "role" tag.
+            policies[NC_BWIDTH] = self.resource_policy(NC_BWIDTH, role_value="role")
+            self.vpntunnel_policies_ = self.policy_records(policies)
         else:
-            self.vpntunnel_policies_ = set()
             logger.warning(LOGGER[self.log_object]['fail'])
 
-    def _policy_parser(self, resource_policy: dict) -> dict:
+    @property
+    def policy_index(self) -> dict:
         """
-        RS policy dependency finder.
-        This will check if the idle roles are part of any RS policy dependency.
-        After filtering, data will be sent to policy padding method for filling with null values.
+        Idle role -> resource policy inverted index (built once, shared by all the CSV writers).
+
+        Each policy's roles are read once - an idle role's dependencies are found with a single
+        lookup instead of checking every policy of every policy type for each idle role.
+        Index is built on disk instead if `spill` was called (memory budget, see index_entries).
+
+        Returns:
+            Policy family attribute (model_attrs) -> idle role -> policy type -> policy names.
         """
 
-        #CHG-01 -> Applied.
-        result_roles = {}
-        for role in self.idle_user_roles:
-            result_ = defaultdict(list)
-            for policy_type in resource_policy:
-                # If the policy data is empty.
-                if len(resource_policy[policy_type]) == 0:
-                    # Creating empty dict to maintain CSV header integrity.
-                    _ = result_[policy_type]
-                    # This is needed as the CSV headers are static.
-                    # default dict will just fill the empty one with empty LIST.
-                policy_count = 0
-                for policy in resource_policy[policy_type]:
-                    # if type has atleast one policy configured.
-                    if {role, }.issubset(resource_policy[policy_type][policy]):
-                        result_[policy_type].append(policy)
-                        policy_count += 1
-                        # creating a new ddict with the same type name and policy name as value.
-                    else:
-                        # check if there are policy added to the dd already.
-                        # To create TOP keys with empty LIST (useful for CSV)
-                        if result_[policy_type]:
-                            pass # ignore if another policy from same type added already. :)
-                self.policy_length.append(len(result_[policy_type]))
-
-            result_roles.update({role: result_})
-            # Result dict will have mapping for idle role and its data.
-        return self._policy_padding(result_roles)
-        # padding ops for the result roles.
-
-    def _policy_padding(self, roles_rspolicies: dict) -> dict:
+        if self._policy_index is None:
+            idle_roles = set(self.idle_user_roles)
+            self._policy_index = {}
+            for family in self.model_attrs:
+                role_index = self._policy_index[family] = defaultdict(lambda: defaultdict(list))
+                for role, policy_type, policy in self._index_rows(family, idle_roles):
+                    role_index[role][policy_type].append(policy)
+        return self._policy_index
+
+    def index_entries(self) -> int:
+        """Number of policy index entries (idle role, policy) - sizes the index before it is
+        built (memory budget)."""
+
+        idle_roles = set(self.idle_user_roles)
+        return sum(len(idle_roles.intersection(policy.roles))
+                   for family in self.model_attrs for policy in getattr(self, family))
+
+    def _index_rows(self, family: str, idle_roles: set) -> Generator:
+        """(idle role, policy type, policy name) entries of the policy family."""
+
+        for policy in getattr(self, family):
+            for role in idle_roles.intersection(policy.roles):
+                yield role, policy.policy_type, policy.name
+
+    def role_dependencies(self, role: str) -> list:
+        """Resource policies referencing the idle role - sorted policy labels (see policy_label)."""
+
+        return sorted(
+            policy_label(policy_type, name)
+            for role_index in self.policy_index.values() if role in role_index
+            for policy_type, names in role_index[role].items()
+            for name in names)
+
+    def spill(self, spill_dir: Optional[str] = None) -> None:
+        """Builds the policy index in a temporary on-disk store instead of memory (memory budget).
+        Dependencies read from the spilled index are the same as the in-memory index."""
+
+        idle_roles = set(self.idle_user_roles)
+        self._policy_index = None
+        store = ICSSpillStore(spill_dir)
+        for family in self.model_attrs:
+            store.add(family, self._index_rows(family, idle_roles))
+        store.index()
+        self._spill_store = store
+        self._policy_index = {family: store.map(family) for family in self.model_attrs}
+
+    def _policy_rows(self, family: str, policy_types: list) -> Generator:
         """
-        Getting the length of filtered RS policy and filling with NULL - Padding.
-        Sorting the filtered RS policy.
+        RS policy dependency rows - idle role block with a column per policy type.
+        Dependencies are read from the inverted index (see policy_index), sorted per policy type.
+        Every idle role block is padded to the max. no. of rs policies found (any idle role,
+        any policy type) - no rows if the idle roles have no dependencies.
         """
 
         #CHG-01 -> Applied.
-        if max(self.policy_length): # policy length is the no. of rs policies found.
-            for role in roles_rspolicies:
-                for policy in roles_rspolicies[role]:
-                    if len(roles_rspolicies[role][policy]) != max(self.policy_length):
-                    # catching policies that are less than the max. bucket and fill it with null.
-                        diff_len = max(self.policy_length) - \
-                            len(roles_rspolicies[role][policy])
-                        roles_rspolicies[role][policy] = sorted(roles_rspolicies[role][policy]) + \
-                            ["" for i in range(diff_len)] # empty "" added.
-                    else:
-                        roles_rspolicies[role][policy] = sorted(roles_rspolicies[role][policy])
-
-        return roles_rspolicies
-
-    def _first_key(self, rs_policy: dict) -> str:
-        """First key from level 1"""
-        return list(rs_policy)[0] # for getting the first idle role.
-
-    def _second_key(self, rs_policy: dict) -> str:
-        """First key from level 2"""
-        # for getting the first resource policy type mapped to first idle role.
-        # types - ACL, SSO-POST, etc.
-        return list(rs_policy[self._first_key(rs_policy)])[0]
-
-    def _first_policy_length(self, rs_policy: dict) -> int:
-        """Getting the length of first policy - after padding"""
-        # for getting the first policy type data.
-        # i.e., how many web ACL policies were found.
-        # Since we have added NULL values to match the max policy size
-        # All policy will give the same length :)
-        # NOTE: This length will be (-1) as we have ROLE header in the CSV report.
-        return len(rs_policy[self._first_key(rs_policy)][self._second_key(rs_policy)])
-
-    def write_web_policies(
-            self,
-            filename: str) -> None:
+        role_index = self.policy_index[family]
+        length = max((len(policies)
+                      for role in self.idle_user_roles
+                      for policy_type, policies in role_index.get(role, {}).items()
+                      if policy_type in policy_types), default=0)
+        groups = (
+            (role, [sorted(policies.get(policy_type, ())) for policy_type in policy_types])
+            for role, policies in (
+                (role, role_index.get(role, {})) for role in self.idle_user_roles))
+        return grouped_rows(groups, length)
+
+    def write_web_policies(self, filename: str) -> None:
         """Web policies write CSV file"""
 
-        self.policy_length = []
-        rs_policy = self._policy_parser(self.web_policies_)
-        with open(filename, mode='w', encoding='utf-8', newline='') as file_handle:
-            write_output = DictWriter(
-                file_handle, dialect='excel', fieldnames=WEB_POLICIES_HEADERS)
-            write_output.writeheader()
-            for role in rs_policy:
-                roles = [
-                    role, ] + [" " for i in range(self._first_policy_length(rs_policy)-1)]
-                policy = rs_policy[roles[0]]
-                for item in range(self._first_policy_length(rs_policy)):
-                    write_output.writerow({
-                        WEB_POLICIES_HEADERS[0]: roles[item],
-                        WEB_POLICIES_HEADERS[1]: policy[WEB_ACL][item],
-                        WEB_POLICIES_HEADERS[2]: policy[WEB_SSO_BASIC_NTLM][item],
-                        WEB_POLICIES_HEADERS[3]: policy[WEB_SSO_POST][item],
-                        WEB_POLICIES_HEADERS[4]: policy[WEB_SSO_HEADERS][item],
-                        WEB_POLICIES_HEADERS[5]: policy[WEB_CACHING_ACL][item],
-                        WEB_POLICIES_HEADERS[6]: policy[WEB_JAVA_ACL][item],
-                        WEB_POLICIES_HEADERS[7]: policy[WEB_CODESIGNING_ACL][item],
-                        WEB_POLICIES_HEADERS[8]: policy[WEB_SELECTIVE_REWRITE][item],
-                        WEB_POLICIES_HEADERS[9]: policy[WEB_COMPRESS_ACL][item],
-                        WEB_POLICIES_HEADERS[10]: policy[WEB_LAUNCHJSAM][item],
-                        WEB_POLICIES_HEADERS[11]: policy[WEB_CLIENTAUTH][item],
-                        WEB_POLICIES_HEADERS[12]: policy[WEB_SAML_ACCESS][item],
-                        WEB_POLICIES_HEADERS[13]: policy[WEB_SAML_SSO][item],
-                        WEB_POLICIES_HEADERS[14]: policy[WEB_CUSTOM_HEADER][item],
-                        WEB_POLICIES_HEADERS[15]: policy[WEB_CROSS_DOMAIN_ACL][item],
-                        WEB_POLICIES_HEADERS[16]: policy[WEB_PROXY_POLICY][item],
-                        WEB_POLICIES_HEADERS[17]: policy[WEB_PROTOCOL][item],
-                        WEB_POLICIES_HEADERS[18]: policy[WEB_ENCODING][item],
-                        WEB_POLICIES_HEADERS[19]: policy[WEB_SAML_EXTERNAL][item],
-                    })
+        write_rows(filename, WEB_POLICIES_HEADERS, self._policy_rows('web_policies_', [
+            WEB_ACL,
+            WEB_SSO_BASIC_NTLM,
+            WEB_SSO_POST,
+            WEB_SSO_HEADERS,
+            WEB_CACHING_ACL,
+            WEB_JAVA_ACL,
+            WEB_CODESIGNING_ACL,
+            WEB_SELECTIVE_REWRITE,
+            WEB_COMPRESS_ACL,
+            WEB_LAUNCHJSAM,
+            WEB_CLIENTAUTH,
+            WEB_SAML_ACCESS,
+            WEB_SAML_SSO,
+            WEB_CUSTOM_HEADER,
+            WEB_CROSS_DOMAIN_ACL,
+            WEB_PROXY_POLICY,
+            WEB_PROTOCOL,
+            WEB_ENCODING,
+            WEB_SAML_EXTERNAL
+        ]))
 
     def write_file_policies(self, filename: str) -> None:
         """Writing File policies to CSV"""
 
-        self.policy_length = []
-        rs_policy = self._policy_parser(self.file_policies_)
-        with open(filename, mode='w', encoding='utf-8', newline='') as file_handle:
-            write_output = DictWriter(
-                file_handle, dialect='excel', fieldnames=FILE_POLICIES_HEADERS)
-            write_output.writeheader()
-            for role in rs_policy:
-                roles = [
-                    role, ] + [" " for i in range(self._first_policy_length(rs_policy)-1)]
-                policy = rs_policy[roles[0]]
-                for item in range(self._first_policy_length(rs_policy)):
-                    write_output.writerow({
-                        FILE_POLICIES_HEADERS[0]: roles[item],
-                        FILE_POLICIES_HEADERS[1]: policy[FILE_WIN_ACL][item],
-                        FILE_POLICIES_HEADERS[2]: policy[FILE_WIN_SSO_ACL][item],
-                        FILE_POLICIES_HEADERS[3]: policy[FILE_WIN_COMPRESS_ACL][item]
-                    })
+        write_rows(filename, FILE_POLICIES_HEADERS, self._policy_rows('file_policies_', [
+            FILE_WIN_ACL,
+            FILE_WIN_SSO_ACL,
+            FILE_WIN_COMPRESS_ACL
+        ]))
 
     def write_sam_policies(self, filename: str) -> None:
         """Writing SAM policies to CSV"""
 
-        self.policy_length = []
-        rs_policy = self._policy_parser(self.sam_policies_)
-        with open(filename, mode='w', encoding='utf-8', newline='') as file_handle:
-            write_output = DictWriter(
-                file_handle, dialect='excel', fieldnames=SAM_POLICIES_HEADERS)
-            write_output.writeheader()
-            for role in rs_policy:
-                roles = [
-                    role, ] + [" " for i in range(self._first_policy_length(rs_policy)-1)]
-                policy = rs_policy[roles[0]]
-                for item in range(self._first_policy_length(rs_policy)):
-                    write_output.writerow({
-                        SAM_POLICIES_HEADERS[0]: roles[item],
-                        SAM_POLICIES_HEADERS[1]: policy[SAM_ACL][item]
-                    })
+        write_rows(filename, SAM_POLICIES_HEADERS, self._policy_rows('sam_policies_', [SAM_ACL]))
 
     def write_termsrv_policies(self, filename: str) -> None:
         """Writing termserv policies to CSV"""
 
-        self.policy_length = []
-        rs_policy = self._policy_parser(self.termserv_policies_)
-        with open(filename, mode='w', encoding='utf-8', newline='') as file_handle:
-            write_output = DictWriter(
-                file_handle, dialect='excel', fieldnames=TERMSERV_POLICIES_HEADERS)
-            write_output.writeheader()
-            for role in rs_policy:
-                roles = [
-                    role, ] + [" " for i in range(self._first_policy_length(rs_policy)-1)]
-                policy = rs_policy[roles[0]]
-                for item in range(self._first_policy_length(rs_policy)):
-                    write_output.writerow({
-                        TERMSERV_POLICIES_HEADERS[0]: roles[item],
-                        TERMSERV_POLICIES_HEADERS[1]: policy[TERM_SERV_ACL][item]
-                    })
+        write_rows(filename, TERMSERV_POLICIES_HEADERS,
+                   self._policy_rows('termserv_policies_', [TERM_SERV_ACL]))
 
     def write_html5_policies(self, filename: str) -> None:
         """Writing HTML5 policies to CSV"""
 
-        self.policy_length = []
-        rs_policy = self._policy_parser(self.html5_policies_)
-        with open(filename, mode='w', encoding='utf-8', newline='') as file_handle:
-            write_output = DictWriter(
-                file_handle, dialect='excel', fieldnames=HTML5_POLICIES_HEADERS)
-            write_output.writeheader()
-            for role in rs_policy:
-                roles = [
-                    role, ] + [" " for i in range(self._first_policy_length(rs_policy)-1)]
-                policy = rs_policy[roles[0]]
-                for item in range(self._first_policy_length(rs_policy)):
-                    write_output.writerow({
-                        HTML5_POLICIES_HEADERS[0]: roles[item],
-                        HTML5_POLICIES_HEADERS[1]: policy[HTML5_ACL][item]
-                    })
+        write_rows(filename, HTML5_POLICIES_HEADERS,
+                   self._policy_rows('html5_policies_', [HTML5_ACL]))
 
     def write_vpntunnel_policies(self, filename: str) -> None:
-        """Writing HTML5 policies to CSV"""
-
-        self.policy_length = []
-        rs_policy = self._policy_parser(self.vpntunnel_policies_)
-        with open(filename, mode='w', encoding='utf-8', newline='') as file_handle:
-            write_output = DictWriter(
-                file_handle, dialect='excel', fieldnames=NC_POLICIES_HEADERS)
-            write_output.writeheader()
-            for role in rs_policy:
-                roles = [
-                    role, ] + [" " for i in range(self._first_policy_length(rs_policy)-1)]
-                policy = rs_policy[roles[0]]
-                for item in range(self._first_policy_length(rs_policy)):
-                    write_output.writerow({
-                        NC_POLICIES_HEADERS[0]: roles[item],
-                        NC_POLICIES_HEADERS[1]: policy[NC_ACL][item],
-                        NC_POLICIES_HEADERS[2]: policy[NC_CONNPROF][item],
-                        NC_POLICIES_HEADERS[3]: policy[NC_STUNNEL][item],
-                        NC_POLICIES_HEADERS[4]: policy[NC_BWIDTH][item],
-                        NC_POLICIES_HEADERS[5]: policy[NC_NODE_CONNPROF][item]
-                    })
+        """Writing VPN tunnelling policies to CSV"""
+
+        write_rows(filename, NC_POLICIES_HEADERS, self._policy_rows('vpntunnel_policies_', [
+            NC_ACL,
+            NC_CONNPROF,
+            NC_STUNNEL,
+            NC_BWIDTH,
+            NC_NODE_CONNPROF
+        ]))
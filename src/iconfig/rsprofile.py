@@ -3,18 +3,25 @@ Resource profiles parser
 """
 from ..api import ICSXMLParser, logger, LOGGER
 from ..xpath.rsprofile import *
+from .model import ResourceProfile
 
 class ICSRSProfile(ICSXMLParser):
-    """Base class for RS Profile parsing"""
+    """Base class for RS Profile parsing
+
+    Profile families are kept as ResourceProfile records (src.iconfig.model) - idle profiles
+    (not mapped to any role) are listed by the `idle_*` properties."""
+
+    model_attrs = ('web_profiles_', 'file_profiles_', 'sam_profiles_capp_', 'sam_profiles_dest_',
+                   'termsrv_profiles_', 'vdi_profiles_', 'html5_profiles_')
 
     def __init__(self, xml_file) -> None:
-        self.web_profiles_ = []
-        self.file_profiles_ = []
-        self.sam_profiles_capp_ = []
-        self.sam_profiles_dest_ = []
-        self.termsrv_profiles_ = []
-        self.vdi_profiles_ = []
-        self.html5_profiles_ = []
+        self.web_profiles_ = ()
+        self.file_profiles_ = ()
+        self.sam_profiles_capp_ = ()
+        self.sam_profiles_dest_ = ()
+        self.termsrv_profiles_ = ()
+        self.vdi_profiles_ = ()
+        self.html5_profiles_ = ()
         self.log_object = ''
         super().__init__(xml_file)
     
@@ -27,47 +34,91 @@ class ICSRSProfile(ICSXMLParser):
         self.vdi_profiles()
         self.html5_profiles()
 
-    def idle_resource_profiles(
+    def resource_profiles(
         self,
         rsprofile_root: str,
-        rsprofile_path: str):
-        """Parsing resource profiles"""
+        rsprofile_path: str) -> tuple:
+        """Parsing resource profiles - ResourceProfile records with the mapped roles"""
         if self.check_tree(rsprofile_root):
             logger.info(LOGGER[self.log_object]['success'])
-            return [self._element_find_value(profile, "name")
-                for profile in self._handle_iterfind(rsprofile_path)
-                if self._element_find(profile, "roles").text is None]
+            return tuple(
+                ResourceProfile(
+                    id_,
+                    self._element_find_value(profile, "name"),
+                    roles=tuple(sorted(role for role in self._element_findall_values(profile, "roles")
+                                       if role is not None)))
+                for id_, profile in enumerate(self._handle_iterfind(rsprofile_path)))
 
         logger.warning(LOGGER[self.log_object]['fail'])
-        return []
+        return ()
+
+    @staticmethod
+    def idle_resource_profiles(profiles: tuple) -> list:
+        """Idle resource profiles (not mapped to any role) - document order"""
+        return [profile.name for profile in profiles if not profile.roles]
+
+    @property
+    def idle_web_profiles(self) -> list:
+        """Idle web resource profiles"""
+        return self.idle_resource_profiles(self.web_profiles_)
+
+    @property
+    def idle_file_profiles(self) -> list:
+        """Idle file resource profiles"""
+        return self.idle_resource_profiles(self.file_profiles_)
+
+    @property
+    def idle_sam_profiles_capp(self) -> list:
+        """Idle SAM client application profiles"""
+        return self.idle_resource_profiles(self.sam_profiles_capp_)
+
+    @property
+    def idle_sam_profiles_dest(self) -> list:
+        """Idle SAM destination profiles"""
+        return self.idle_resource_profiles(self.sam_profiles_dest_)
+
+    @property
+    def idle_termsrv_profiles(self) -> list:
+        """Idle terminal services profiles"""
+        return self.idle_resource_profiles(self.termsrv_profiles_)
+
+    @property
+    def idle_vdi_profiles(self) -> list:
+        """Idle VDI profiles"""
+        return self.idle_resource_profiles(self.vdi_profiles_)
+
+    @property
+    def idle_html5_profiles(self) -> list:
+        """Idle HTML5 profiles"""
+        return self.idle_resource_profiles(self.html5_profiles_)
 
     def web_profiles(self):
         """Web resource profiles"""
         self.log_object = self.web_profiles.__name__
-        self.web_profiles_ = self.idle_resource_profiles(WEB_PROF_ROOT, WEB_PROF)
+        self.web_profiles_ = self.resource_profiles(WEB_PROF_ROOT, WEB_PROF)
 
     def file_profiles(self):
         """Files resource profiles"""
         self.log_object = self.file_profiles.__name__
-        self.file_profiles_ = self.idle_resource_profiles(FILE_PROF_ROOT, FILE_PROF)
+        self.file_profiles_ = self.resource_profiles(FILE_PROF_ROOT, FILE_PROF)
 
     def sam_profiles(self):
         """SAM resource profiles"""
         self.log_object = self.sam_profiles.__name__
-        self.sam_profiles_capp_ = self.idle_resource_profiles(SAM_PROF_ROOT, SAM_PROF_CAPP)
-        self.sam_profiles_dest_ = self.idle_resource_profiles(SAM_PROF_ROOT, SAM_PROF_DEST)
+        self.sam_profiles_capp_ = self.resource_profiles(SAM_PROF_ROOT, SAM_PROF_CAPP)
+        self.sam_profiles_dest_ = self.resource_profiles(SAM_PROF_ROOT, SAM_PROF_DEST)
 
     def termserv_profiles(self):
         """TermSrv profiles"""
         self.log_object = self.termserv_profiles.__name__
-        self.termsrv_profiles_ = self.idle_resource_profiles(TERMSERV_PROF_ROOT, TERMSERV_PROF)
+        self.termsrv_profiles_ = self.resource_profiles(TERMSERV_PROF_ROOT, TERMSERV_PROF)
 
     def html5_profiles(self):
         """HTML5 profiles"""
         self.log_object = self.html5_profiles.__name__
-        self.html5_profiles_ = self.idle_resource_profiles(HTML5_PROF_ROOT, HTML5_PROF)
+        self.html5_profiles_ = self.resource_profiles(HTML5_PROF_ROOT, HTML5_PROF)
 
     def vdi_profiles(self):
         """VDI profiles"""
         self.log_object = self.vdi_profiles.__name__
-        self.vdi_profiles_ = self.idle_resource_profiles(VDI_PROF_ROOT, VDI_PROF)
+        self.vdi_profiles_ = self.resource_profiles(VDI_PROF_ROOT, VDI_PROF)
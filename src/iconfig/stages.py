@@ -0,0 +1,114 @@
+"""
+Parser stages & report categories.
+
+Each parser method (stage) reads a single config section - stages run on their own parser
+instance and hand their results over as deltas of the model attributes, so they can be
+scheduled concurrently (src.pipeline) or reused from a baseline export (src.iconfig.diff).
+
+"""
+
+from copy import copy
+from ..xpath.iconfig import *
+from ..xpath.rspolicy import *
+from ..xpath.rsprofile import *
+from .config import ICSIdleConfig
+from .rspolicy import ICSRSPolicy
+from .rsprofile import ICSRSProfile
+
+# Parser method -> ROOT XPATH objects of the config section (pipeline order).
+STAGES = {
+    ICSIdleConfig.__name__: [
+        ('auth_servers', [AUTH_SERVERS_ROOT]),
+        ('admin_realms', [ADMIN_REALMS_ROOT]),
+        ('user_realms', [USER_REALMS_ROOT]),
+        ('signin_urls', [SIGNIN_ROOT]),
+        ('user_roles', [USER_ROLES_ROOT]),
+        ('admin_roles', [ADMIN_ROLES_ROOT]),
+        ('misc_aoa_roles', [MISC_AOA_ROOT]),
+        ('misc_ikev2_realms', [MISC_IKEV2_ROOT]),
+    ],
+    ICSRSPolicy.__name__: [
+        ('web_policies', [WEB_ROOT]),
+        ('file_policies', [FILE_ROOT]),
+        ('sam_policies', [SAM_ROOT]),
+        ('termserv_policies', [TERM_SERV_ROOT]),
+        ('html5_policies', [HTML5_ROOT]),
+        ('vpntunnel_policies', [NC_ROOT]),
+    ],
+    ICSRSProfile.__name__: [
+        ('web_profiles', [WEB_PROF_ROOT]),
+        ('file_profiles', [FILE_PROF_ROOT]),
+        ('sam_profiles', [SAM_PROF_ROOT]),
+        ('termserv_profiles', [TERMSERV_PROF_ROOT]),
+        ('vdi_profiles', [VDI_PROF_ROOT]),
+        ('html5_profiles', [HTML5_PROF_ROOT]),
+    ],
+}
+
+# Report category -> ICSIdleConfig property.
+IDLE_CATEGORIES = {
+    'IDLE_AUTH_SERVERS': 'idle_auth_servers',
+    'IDLE_USER_REALMS': 'idle_user_realms',
+    'IDLE_USER_ROLES': 'idle_user_roles',
+    'IDLE_ADMIN_REALMS': 'idle_admin_realms',
+    'IDLE_ADMIN_ROLES': 'idle_admin_roles',
+    'IDLE_USER_URLS': 'idle_user_urls',
+    'IDLE_ADMIN_URLS': 'idle_admin_urls',
+    'IDLE_SIGNIN_USER_REALMS': 'idle_signin_user_realm',
+    'IDLE_SIGNIN_ADMIN_REALMS': 'idle_signin_admin_realm',
+}
+
+# Report category -> ICSRSProfile property.
+PROFILE_CATEGORIES = {
+    'WEB_PROFILES': 'idle_web_profiles',
+    'FILE_PROFILES': 'idle_file_profiles',
+    'SAM_CLIENT_APPS': 'idle_sam_profiles_capp',
+    'SAM_DESTS': 'idle_sam_profiles_dest',
+    'TERMSERV_PROFILES': 'idle_termsrv_profiles',
+    'VDI_PROFILES': 'idle_vdi_profiles',
+    'HTML5_PROFILES': 'idle_html5_profiles',
+}
+
+# Report category -> ICSRSPolicy attribute (idle user roles - resource policy dependencies).
+POLICY_CATEGORIES = {
+    'WEB_POLICY_DEPENDENCIES': 'web_policies_',
+    'FILE_POLICY_DEPENDENCIES': 'file_policies_',
+    'SAM_POLICY_DEPENDENCIES': 'sam_policies_',
+    'TERMSERV_POLICY_DEPENDENCIES': 'termserv_policies_',
+    'HTML5_POLICY_DEPENDENCIES': 'html5_policies_',
+    'VPN_POLICY_DEPENDENCIES': 'vpntunnel_policies_',
+}
+
+
+
+def run_stage(parser, stage: str) -> dict:
+    """Runs the parser method and returns the results it added/updated (stage delta).
+
+    Returns:
+        Dictionary of model attribute -> (merge, value). Merge is set for dict attributes
+        where only the added/updated keys are recorded."""
+
+    before = {attr: copy(getattr(parser, attr)) for attr in parser.model_attrs}
+    getattr(parser, stage)()
+
+    delta = {}
+    for attr in parser.model_attrs:
+        old, new = before[attr], getattr(parser, attr)
+        if isinstance(old, dict) and isinstance(new, dict):
+            changed = {key: value for key, value in new.items()
+                       if key not in old or old[key] is not value}
+            if changed:
+                delta[attr] = (True, changed)
+        elif old != new or type(old) is not type(new):
+            delta[attr] = (False, new)
+    return delta
+
+
+def apply_stage(parser, delta: dict) -> None:
+    """Applies the stage delta (see run_stage) to the parser results."""
+
+    for attr, (merge, value) in delta.items():
+        if merge and isinstance(getattr(parser, attr), dict):
+            getattr(parser, attr).update(value)
+        else:
+            setattr(parser, attr, value)
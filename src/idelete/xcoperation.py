@@ -1,105 +1,306 @@
 """
 Module for XC operations
+
+Idle config objects are deleted with an XML import of `xc:operation="delete"` elements -
+one element per object, identified by its key child element (name, url-pattern).
+
+The delete config is written incrementally - container elements are opened & closed as the
+objects are written, no XML tree is built (constant memory for any number of objects).
+
+Large delete configs are split into bundles (ICSXCBundles) limited by object count and/or
+byte size - short imports that can be retried one by one, listed in order by a manifest.
+Categories are written dependents first (src.xpath.idelete.XC_PATHS order), so bundles can
+be imported in manifest order. Idle objects still referenced by objects that aren't deleted
+(idle user roles listed by resource policies/profiles) are left out and listed by the manifest
+with their references (`kept`).
 """
-from ..api.parser import ET, Element, Union, ICSXMLParser
+
+import json
+import os
+from typing import Iterable, Optional
+from xml.sax.saxutils import escape, quoteattr
+from ..api import ICSXMLParser
+from ..xpath.idelete import XC_ROOT, XC_NAMESPACE, XC_PATHS
 
 class ICSXCOperation:
-    """XC operation for XML config creation"""
+    """
+    Streaming XC operation writer for XML delete config creation
+
+    Usage:
+        with ICSXCOperation(filename) as xc_operation:
+            xc_operation.delete_category('IDLE_USER_ROLES', names)
+
+    Attributes:
+        file: filepath of the XML delete config.
+        root_attrib: root element attrib - namespace & attributes of the XML export root.
+        count: number of delete elements written.
+        categories: report category -> number of delete elements written.
+        size: bytes written.
+
+    """
+
+    indent = '  '
+
+    def __init__(self, file: str, root_attrib: Optional[dict] = None) -> None:
+        self.file = file
+        self.root_attrib = ICSXMLParser.root_attrib if root_attrib is None else root_attrib
+        self.count = 0
+        self.categories = {}
+        self.size = 0
+        self._fhandle = None
+        self._path = []  # Open container elements below the root element.
+
+
+    def __enter__(self) -> 'ICSXCOperation':
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+    def _attrib(self) -> str:
+        """Root element attributes - namespaced (Clark notation) keys use the declared prefixes"""
+
+        attrib = dict(self.root_attrib)
+        attrib.setdefault('xmlns:xc', XC_NAMESPACE)
+        prefixes = {uri: key.partition(':')[2]
+                    for key, uri in attrib.items() if key.startswith('xmlns:')}
+
+        attrs = []
+        for key, value in attrib.items():
+            if key.startswith('{'):
+                uri, _, local = key[1:].partition('}')
+                key = f"{prefixes[uri]}:{local}" if uri in prefixes else local
+            attrs.append(f" {key}={quoteattr(value)}")
+        return ''.join(attrs)
+
+
+    def _line(self, depth: int, text: str) -> str:
+        return f"{self.indent * depth}{text}\n"
+
+    def _write(self, text: str) -> None:
+        self._fhandle.write(text)
+        self.size += len(text.encode('utf-8'))
+
+
+    def _container_lines(self, xpath: str) -> tuple:
+        """Closing & opening lines of the move to the container path - (lines, new path)"""
+
+        tags = xpath.split('/') if xpath else []
+        common = 0
+        while common < min(len(tags), len(self._path)) and tags[common] == self._path[common]:
+            common += 1
+
+        lines = [self._line(depth + 1, f"</{self._path[depth]}>")
+                 for depth in reversed(range(common, len(self._path)))]
+        lines.extend(
+            self._line(depth + 1, f"<{tags[depth]}>") for depth in range(common, len(tags)))
+        return ''.join(lines), tags
+
+    def _container(self, xpath: str) -> None:
+        """Moves the writer to the container path - closes & opens the container elements"""
+
+        lines, self._path = self._container_lines(xpath)
+        self._write(lines)
+
+
+    def _element(self, xpath: str, xc_element: str, child: str, value: str) -> str:
+        depth = len(xpath.split('/')) + 1
+        return self._line(
+            depth,
+            f'<{xc_element} xc:operation="delete"><{child}>{escape(value)}</{child}></{xc_element}>')
+
+
+    def open(self) -> None:
+        """Opens the XML delete config file and writes the root element"""
+
+        self._fhandle = open(self.file, mode='w', encoding='utf-8')
+        self._write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        self._write(self._line(0, f"<{XC_ROOT}{self._attrib()}>"))
+
+
+    def delete_size(self, xpath: str, xc_element: str, child: str, value: str) -> int:
+        """Bytes the file grows to once the delete element is written and the file is closed"""
+
+        lines, tags = self._container_lines(xpath)
+        closing = ''.join(self._line(depth + 1, f"</{tags[depth]}>")
+                          for depth in reversed(range(len(tags))))
+        return self.size + len(
+            (lines + self._element(xpath, xc_element, child, value) + closing
+             + self._line(0, f"</{XC_ROOT}>")).encode('utf-8'))
+
+
+    def delete_value(self, xpath: str, xc_element: str, child: str, value: str) -> None:
+        """Writes the XC operation delete element of the value under the container path"""
+
+        if self._path != xpath.split('/'):
+            self._container(xpath)
+        self._write(self._element(xpath, xc_element, child, value))
+        self.count += 1
+
+
+    def delete(self, xpath: str, xc_element: str, child: str, values: Iterable[str]) -> int:
+        """Writes the XC operation delete elements of the values under the container path.
+
+        Returns:
+            Number of delete elements written."""
+
+        count = 0
+        for value in values:  # Containers are written only if there is something to delete.
+            self.delete_value(xpath, xc_element, child, value)
+            count += 1
+        return count
+
+
+    def delete_category(self, category: str, values: Iterable[str]) -> int:
+        """Writes the delete elements of the report category objects (src.xpath.idelete)"""
+
+        count = self.delete(*XC_PATHS[category], values)
+        if count:
+            self.categories[category] = self.categories.get(category, 0) + count
+        return count
+
+
+    def close(self) -> None:
+        """Closes the open container elements, the root element & the file"""
+
+        if self._fhandle is not None:
+            self._container('')
+            self._write(self._line(0, f"</{XC_ROOT}>"))
+            self._fhandle.close()
+            self._fhandle = None
+
+
+class ICSXCBundles:
+    """
+    Size-bounded XML delete config bundles
+
+    Objects are written to numbered bundle files (`<prefix>_001.xml`, ...) - a new bundle is
+    started once the current one holds `max_objects` objects or the next delete element would
+    grow it beyond `max_bytes` (a bundle holds at least one object). The manifest lists the
+    bundles in import order.
+
+    Usage:
+        with ICSXCBundles(directory, max_objects=500) as bundles:
+            bundles.delete_category('IDLE_USER_ROLES', names)
+
+    Attributes:
+        directory: bundles directory (created if missing).
+        max_objects: maximum number of objects per bundle (None - no limit).
+        max_bytes: maximum bundle size in bytes (None - no limit).
+        bundles: closed bundles (ICSXCOperation) in import order.
+        kept: report category -> idle object -> referencing objects (left out, see `keep`).
+
+    """
 
-    def __init__(self, xpath: str) -> None:
-        self.xpath = xpath
-        self.root_attrib = ICSXMLParser.root_attrib
-        self.root = ''
-        self.subelem = ''
-        self.create_xml_model()
+    manifest_file = 'manifest.json'
 
+    def __init__(
+            self,
+            directory: str,
+            max_objects: Optional[int] = None,
+            max_bytes: Optional[int] = None,
+            prefix: str = 'idle_delete_config',
+            root_attrib: Optional[dict] = None) -> None:
+        if any(limit is not None and limit < 1 for limit in (max_objects, max_bytes)):
+            raise SystemExit("Delete config bundle limits must be positive.")
+        self.directory = directory
+        self.max_objects = max_objects
+        self.max_bytes = max_bytes
+        self.prefix = prefix
+        self.root_attrib = root_attrib
+        self.bundles = []
+        self.kept = {}
+        self._bundle = None
 
-    def create_xml_model(self) -> None:
-        """XML Model creator with XPATH"""
-        if isinstance(self.xpath, str):
-            xpath_list: list = self.xpath.split('/')
-        else:
-            raise SystemExit()
 
-        if len(xpath_list) == 1:
-            self.root: Element = ET.Element(xpath_list[0], attrib=self.root_attrib)
+    def __enter__(self) -> 'ICSXCBundles':
+        os.makedirs(self.directory, exist_ok=True)
+        return self
 
-        self.root: Element = ET.Element(xpath_list[0], attrib=self.root_attrib)
-        xpath_list.pop(0)
-        parent = self.root
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
-        for child in xpath_list:
-            self.subelem = ET.SubElement(parent, child)
-            parent = self.subelem
 
+    @property
+    def count(self) -> int:
+        """Number of objects written to the bundles"""
+        return sum(bundle.count for bundle in self.bundles) + (
+            self._bundle.count if self._bundle is not None else 0)
 
-    def _delete(self, xc_element: str, child: str, value: str) -> None:
-        """Setting the XC operation delete"""
 
-        xc_delete = ET.SubElement(
-            self.subelem, # End of static XML tree (don't override self.subelem after this point)
-            xc_element,
-            attrib={"xc:operation": "delete"})
+    def _next_bundle(self) -> ICSXCOperation:
+        """Closes the current bundle and opens the next one"""
 
-        subelem = ET.SubElement(xc_delete, child) # loop config here
-        subelem.text = value
+        self._close_bundle()
+        filename = os.path.join(self.directory, f"{self.prefix}_{len(self.bundles) + 1:03d}.xml")
+        self._bundle = ICSXCOperation(filename, self.root_attrib)
+        self._bundle.open()
+        return self._bundle
 
+    def _close_bundle(self) -> None:
+        if self._bundle is not None:
+            self._bundle.close()
+            self.bundles.append(self._bundle)
+            self._bundle = None
 
-    def write_xml(self, file) -> None:
-        """Writes the generated Idle XML delete config to a file"""
 
-        ET.indent(self.root)
-        etree = ET.ElementTree(self.root, file=None)
-        with open(file, mode='w', encoding='utf') as fhandle:
-            etree.write(
-                fhandle,
-                encoding='unicode',
-                short_empty_elements=False,
-                xml_declaration=False)
+    def _full(self, bundle: ICSXCOperation, *element) -> bool:
+        """Bundle can't take the delete element - object count or byte size limit"""
 
+        if not bundle.count:
+            return False
+        if self.max_objects is not None and bundle.count >= self.max_objects:
+            return True
+        return self.max_bytes is not None and bundle.delete_size(*element) > self.max_bytes
 
-    def dump(self) -> None:
-        """Indents and dumps XML tree to stdout"""
-        ET.indent(self.root)
-        ET.dump(self.root)
 
+    def keep(self, category: str, references: dict) -> None:
+        """Records the idle objects of the category left out of the delete config.
 
-    def signin_url_delete(self, value: Union[str,set]) -> None:
-        """Idle SignIn URL delete XML generation"""
+        Args:
+            references: idle object -> objects still referencing it."""
 
-        if isinstance(value, str):
-            self._delete(xc_element="access-url",child="url-pattern",value=value)
-        else:
-            for val in value:
-                self._delete(xc_element="access-url",child="url-pattern",value=val)
+        if references:
+            self.kept.setdefault(category, {}).update(references)
 
 
-    def realms_delete(self, value: Union[str,set]) -> None:
-        """Realms delete XML generation"""
+    def delete_category(self, category: str, values: Iterable[str]) -> int:
+        """Writes the delete elements of the report category objects across the bundles"""
 
-        if isinstance(value, str):
-            self._delete(xc_element="realm",child="name",value=value)
-        else:
-            for val in value:
-                self._delete(xc_element="realm",child="name",value=val)
+        xpath, xc_element, child = XC_PATHS[category]
+        count = 0
+        for value in values:
+            bundle = self._bundle or self._next_bundle()
+            if self._full(bundle, xpath, xc_element, child, value):
+                bundle = self._next_bundle()
+            bundle.delete_value(xpath, xc_element, child, value)
+            bundle.categories[category] = bundle.categories.get(category, 0) + 1
+            count += 1
+        return count
 
 
-    def auth_servers_delete(self, value: Union[str,set]) -> None:
-        """Auth Servers delete XML generation"""
+    def manifest(self) -> dict:
+        """Bundles in import order - file, objects, bytes & objects per category. Idle objects
+        left out (still referenced) are listed with their references."""
 
-        if isinstance(value, str):
-            self._delete(xc_element="auth-server",child="name",value=value)
-        else:
-            for val in value:
-                self._delete(xc_element="auth-server",child="name",value=val)
+        return {
+            "max_objects": self.max_objects,
+            "max_bytes": self.max_bytes,
+            "objects": sum(bundle.count for bundle in self.bundles),
+            "bundles": [
+                {"order": order, "file": os.path.basename(bundle.file), "objects": bundle.count,
+                 "bytes": bundle.size, "categories": bundle.categories}
+                for order, bundle in enumerate(self.bundles, start=1)],
+            "kept": self.kept,
+        }
 
 
-    def admin_role_delete(self, value: Union[str,set]) -> None:
-        """Auth Servers delete XML generation"""
+    def close(self) -> None:
+        """Closes the last bundle and writes the manifest"""
 
-        if isinstance(value, str):
-            self._delete(xc_element="admin-role",child="name",value=value)
-        else:
-            for val in value:
-                self._delete(xc_element="admin-role",child="name",value=val)
-                
\ No newline at end of file
+        self._close_bundle()
+        manifest_path = os.path.join(self.directory, self.manifest_file)
+        with open(manifest_path, mode='w', encoding='utf-8') as fhandle:
+            json.dump(self.manifest(), fhandle, indent=2)
@@ -0,0 +1,8 @@
+"""
+ICS Idle Config - Pipeline (single XML export, fleet batch & watch mode)
+"""
+from .pipeline import ICSPipeline
+from .scheduler import ICSStage, ICSStageScheduler
+from .profiler import ICSProfiler
+from .batch import collect_exports, run_batch
+from .watch import ICSSpoolWatcher
@@ -0,0 +1,151 @@
+"""
+src.pipeline.batch
+~~~~~~~~~~~~~~~~~~
+Fleet batch mode - idle config pipeline for many appliance XML exports.
+
+Each XML export is analyzed in its own worker process (bounded process pool), per-appliance
+CSV reports (or NDJSON findings) are written under `<results_path>/<appliance>` and a
+consolidated fleet summary (`fleet_summary.csv`) lists the idle config counts of every appliance.
+
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from csv import DictWriter
+from glob import glob
+from typing import Optional
+from ..api import logger as api_logger
+from ..api.cache import ICSModelCache
+from ..api.memory import ICSMemoryBudget
+from ..api.source import EXPORT_SUFFIXES, export_name
+from ..iconfig.findings import ICSFindingsWriter
+from .pipeline import ICSPipeline, IDLE_CONFIG_REPORT, RS_PROFILE_REPORT, logger
+
+FLEET_SUMMARY_HEADERS = ["APPLIANCE", "XML_EXPORT_FILE", "STATUS"] + \
+    list(IDLE_CONFIG_REPORT) + list(RS_PROFILE_REPORT)
+
+
+def collect_exports(target: str) -> list:
+    """Returns the XML export files - all the XML exports (`*.xml`, `*.xml.gz`, `*.xml.bz2`,
+    `*.xml.xz`, `*.zip`) if the target is a directory, otherwise the target is used as a glob
+    pattern."""
+
+    if os.path.isdir(target):
+        return sorted(path for path in glob(os.path.join(target, "*"))
+                      if os.path.isfile(path) and path.lower().endswith(EXPORT_SUFFIXES))
+    return sorted(path for path in glob(target) if os.path.isfile(path))
+
+
+def appliance_name(xml_file: str) -> str:
+    """Appliance name used for the report directory - XML export filename without extension(s)."""
+
+    return export_name(xml_file)
+
+
+def analyze_export(
+        xml_file: str,
+        results_path: str,
+        streaming: bool = False,
+        cache_dir: Optional[str] = None,
+        cache_size: int = 512 * 1024 * 1024,
+        version: str = '',
+        max_memory: Optional[int] = None,
+        backend: Optional[str] = None,
+        output_format: str = 'csv') -> dict:
+    """Worker - runs the full pipeline for one XML export and writes its CSV reports
+    (idle_findings.ndjson if the output format is ndjson).
+
+    Returns:
+        Fleet summary row - appliance, status & idle config counts."""
+
+    # Parser & report logs of all the appliances would flood the console.
+    api_logger.setLevel(logging.WARNING)
+    logger.setLevel(logging.WARNING)
+
+    row = {"APPLIANCE": os.path.basename(os.path.normpath(results_path)), "XML_EXPORT_FILE": xml_file}
+    cache = ICSModelCache(cache_dir, version, max_size=cache_size) if cache_dir else None
+    budget = ICSMemoryBudget(max_memory) if max_memory else None
+    output = None
+    if output_format == 'ndjson':
+        os.makedirs(results_path, exist_ok=True)
+        output = open(
+            os.path.join(results_path, "idle_findings.ndjson"), mode='w', encoding='utf-8')
+    pipeline = ICSPipeline(
+        xml_file, results_path, streaming=streaming, cache=cache, budget=budget,
+        backend=backend,
+        findings=ICSFindingsWriter(output, row["APPLIANCE"]) if output is not None else None)
+    try:
+        pipeline.run(console_output=False, reports=output is None)
+        row.update(pipeline.summary())
+        row["STATUS"] = "OK"
+    except SystemExit as exc:  # Parser errors (invalid XML export, etc.)
+        row["STATUS"] = f"FAILED: {' '.join(str(exc).split())}"
+    except Exception as exc:  # Unexpected export layout - the other appliances still run.
+        row["STATUS"] = f"FAILED: {exc!r}"
+    finally:
+        pipeline.close()
+        if output is not None:
+            output.close()
+    return row
+
+
+def run_batch(
+        exports: list,
+        results_path: str,
+        workers: Optional[int] = None,
+        streaming: bool = False,
+        cache_dir: Optional[str] = None,
+        cache_size: int = 512 * 1024 * 1024,
+        version: str = '',
+        max_memory: Optional[int] = None,
+        backend: Optional[str] = None,
+        output_format: str = 'csv') -> list:
+    """Analyzes the XML exports in a process pool and writes the fleet summary.
+
+    Args:
+        exports: XML export filepaths.
+        results_path: directory for the per-appliance reports & fleet summary.
+        workers: maximum number of worker processes. Default - CPU count.
+        max_memory: memory budget (bytes) of each worker process.
+        backend: XML backend - etree (default), lxml or auto.
+        output_format: per-appliance reports - csv (default) or ndjson findings.
+
+    Returns:
+        Fleet summary rows (same order as the exports)."""
+
+    os.makedirs(results_path, exist_ok=True)
+    names = []
+    for xml_file in exports:
+        name = appliance_name(xml_file)
+        # Same filename from different directories - report directories must not clash.
+        names.append(name if name not in names else f"{name}-{len(names)}")
+    rows = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(
+                analyze_export, xml_file, os.path.join(results_path, name),
+                streaming, cache_dir, cache_size, version, max_memory, backend,
+                output_format): (xml_file, name)
+            for xml_file, name in zip(exports, names)
+        }
+        for future in as_completed(futures):
+            xml_file, name = futures[future]
+            try:
+                row = future.result()
+            except Exception as exc:  # Worker crash (killed, out of memory, etc.)
+                row = {"APPLIANCE": name, "XML_EXPORT_FILE": xml_file,
+                       "STATUS": f"FAILED: {exc!r}"}
+            rows[xml_file] = row
+            logger.info("%s - %s", row["APPLIANCE"], row["STATUS"])
+
+    summary = [rows[xml_file] for xml_file in exports]
+    with open(
+            os.path.join(results_path, "fleet_summary.csv"), mode='w', encoding='utf-8', newline=''
+        ) as file_handle:
+        write_output = DictWriter(
+            file_handle, dialect='excel', fieldnames=FLEET_SUMMARY_HEADERS, restval="")
+        write_output.writeheader()
+        write_output.writerows(summary)
+    return summary
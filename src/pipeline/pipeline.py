@@ -0,0 +1,504 @@
+"""
+src.pipeline.pipeline
+~~~~~~~~~~~~~~~~~~~~~
+Idle config pipeline for a single XML export.
+
+Parses the XML export (or loads the cached config model), runs the idle config checks and
+writes the console output & CSV reports. Used by the CLI (ics_idle_config.py) and the fleet
+batch mode (src.pipeline.batch).
+
+Checks & reports are declared as pipeline stages (see `ICSPipeline.stages`) and run by the
+stage scheduler (src.pipeline.scheduler). Stages & sub-stages (parser init, resource policy &
+profile families, policy CSV writers) are timed by the pipeline profiler, if set.
+
+"""
+
+import logging
+import os
+from contextlib import nullcontext
+from functools import partial
+from typing import Optional
+from ..api import ICSXMLDocument
+from ..api.cache import ICSModelCache
+from ..api.memory import ICSMemoryBudget
+from ..iconfig.config import ICSIdleConfig
+from ..iconfig.rspolicy import ICSRSPolicy
+from ..iconfig.rsprofile import ICSRSProfile
+from ..iconfig.report import write_columns
+from ..iconfig.cleanup import ICSCleanup, role_references
+from ..iconfig.findings import ICSFindingsWriter
+from ..iconfig.database import ICSModelDatabase
+from ..iconfig.stages import STAGES, IDLE_CATEGORIES, PROFILE_CATEGORIES, run_stage, apply_stage
+from ..idelete.xcoperation import ICSXCBundles
+from ..xpath.idelete import XC_PATHS
+from .scheduler import ICSStage, ICSStageScheduler
+from .profiler import ICSProfiler
+
+# Console logger - handlers are set by the CLI.
+logger = logging.getLogger('ICS_Idle_Config')
+
+# Idle config report - CSV header -> ICSIdleConfig property.
+IDLE_CONFIG_REPORT = IDLE_CATEGORIES
+
+# Idle resource profiles report - CSV header -> ICSRSProfile property.
+RS_PROFILE_REPORT = PROFILE_CATEGORIES
+
+# ICSIdleConfig stages the idle user roles (resource policy dependencies) are computed from.
+IDLE_USER_ROLES_STAGES = ('user_realms', 'user_roles', 'misc_aoa_roles')
+
+# Resource policy reports - ICSRSPolicy writer method -> CSV filename.
+RS_POLICY_REPORTS = {
+    'write_web_policies': 'web_policy.csv',
+    'write_file_policies': 'file_policy.csv',
+    'write_sam_policies': 'sam_policy.csv',
+    'write_termsrv_policies': 'termsrv_policy.csv',
+    'write_html5_policies': 'html5_policy.csv',
+    'write_vpntunnel_policies': 'vpn_policy.csv',
+}
+
+
+def pprint(data):
+    """Unpacks the items and print it"""
+    for item_ in data:
+        print(item_)
+
+
+class ICSPipeline:
+    """
+    ICS Idle Config Pipeline
+
+    Attributes:
+        xml_file: filepath of the XML export.
+        results_path: directory for the CSV reports.
+        streaming: If set, XML export is parsed with the streaming engine.
+        cache: config model cache (optional).
+        budget: memory budget (optional) - parser strategy & spilling of the policy index.
+        profiler: pipeline profiler (optional) - stage timings & cProfile stats.
+        backend: XML backend - etree (default), lxml or auto (see src.api.backend).
+        bundle_objects: maximum number of objects per XML delete config bundle (optional).
+        bundle_bytes: maximum size of an XML delete config bundle in bytes (optional).
+        findings: NDJSON findings writer (optional) - findings are streamed as the checks complete.
+        sqlite: filepath of the SQLite export of the config model (optional).
+        document: shared XML document (None if the model was loaded from the cache).
+        config: idle config parser.
+
+    """
+
+    def __init__(
+            self,
+            xml_file: str,
+            results_path: str,
+            streaming: bool = False,
+            cache: Optional[ICSModelCache] = None,
+            budget: Optional[ICSMemoryBudget] = None,
+            profiler: Optional[ICSProfiler] = None,
+            backend: Optional[str] = None,
+            bundle_objects: Optional[int] = None,
+            bundle_bytes: Optional[int] = None,
+            findings: Optional[ICSFindingsWriter] = None,
+            sqlite: Optional[str] = None) -> None:
+        self.xml_file = xml_file
+        self.results_path = results_path
+        self.streaming = streaming
+        self.cache = cache
+        self.budget = budget
+        self.profiler = profiler
+        self.backend = backend
+        self.bundle_objects = bundle_objects
+        self.bundle_bytes = bundle_bytes
+        self.findings = findings
+        self.sqlite = sqlite
+        self.document = None
+        self.model = None
+        self.config = None
+        self._rs_policy = None
+        self._rs_profile = None
+
+    def analyze(self) -> None:
+        """Loads the XML export (or the cached config model) - parser stages are run by `run`."""
+
+        if self.cache is not None:
+            with self._profile("model_cache_load"):
+                self.model = self.cache.load(self.xml_file)
+
+        if self.model is None:
+            if not self.streaming and self.budget is not None:
+                self.streaming = self.budget.streaming(self.xml_file)
+
+            with self._profile("parser_init"):
+                # XML export is parsed once & shared by all the parser stages.
+                self.document = ICSXMLDocument(
+                    self.xml_file, streaming=self.streaming, backend=self.backend)
+                self.config = ICSIdleConfig(self.document)
+                # Index & planner are built up front - stages query the tree from worker threads.
+                self.document.planner(self.config.nsmap)
+                self.config.release() # Results are merged from the stages, XML tree is kept.
+        else:
+            logger.info("Config model loaded from cache - XML parsing skipped.\n")
+            self.config = ICSIdleConfig(None)
+            self.config.load_model(self.model[ICSIdleConfig.__name__])
+
+    def stages(
+            self,
+            console_output: bool = True,
+            reports: bool = True,
+            delete_config: bool = False) -> list:
+        """Pipeline stages (DAG) - idle config checks, resource policies & profiles, reports.
+
+        Args:
+            console_output: If set, console output stage is included.
+            reports: If set, CSV report stages are included.
+            delete_config: If set, XML delete config stage is included."""
+
+        stages = []
+        config_stages = []
+        if self.model is None:
+            for method, _ in STAGES[ICSIdleConfig.__name__]:
+                name = f"config.{method}"
+                stages.append(ICSStage(name, partial(self._config_stage, method)))
+                config_stages.append(name)
+        stages.append(ICSStage("idle_configs", self._idle_configs, inputs=config_stages))
+
+        if console_output:
+            stages.append(ICSStage(
+                "console_output", self.console_output, after=["idle_configs"], exclusive=True))
+        if reports or delete_config:
+            stages.append(ICSStage("results_dir", self.results_dir))
+        if reports:
+            stages.append(ICSStage(
+                "csv_report", self.csv_report, after=["idle_configs", "results_dir"]))
+
+        caching = self.cache is not None and self.model is None
+        findings = self.findings is not None
+        model_export = self.sqlite is not None
+        if reports or caching or delete_config or findings or model_export:
+            # Only the idle user roles are needed - resource policies don't wait for all checks.
+            stages.append(ICSStage(
+                "rs_policy", self._rs_policy_stage,
+                inputs=[f"config.{method}" for method in IDLE_USER_ROLES_STAGES
+                        if f"config.{method}" in config_stages]))
+        if reports:
+            stages.append(ICSStage(
+                "rs_policy_report", self.rs_policy_report, after=["rs_policy", "results_dir"]))
+        if reports or caching or delete_config or findings or model_export:
+            stages.append(ICSStage("rs_profile", self._rs_profile_stage))
+        if reports:
+            stages.append(ICSStage(
+                "rs_profile_report", self.rs_profile_report, after=["rs_profile", "results_dir"]))
+            stages.append(ICSStage(
+                "cleanup_report", self.cleanup_report,
+                after=["idle_configs", "rs_policy", "rs_profile", "results_dir"]))
+        if findings:
+            stages.append(ICSStage("config_findings", self.config_findings, after=["idle_configs"]))
+            # Policy index (spill store) is read by one stage at a time.
+            stages.append(ICSStage(
+                "role_findings", self.role_findings,
+                after=["idle_configs", "rs_policy"] + (["rs_policy_report"] if reports else [])))
+            stages.append(ICSStage("profile_findings", self.profile_findings, after=["rs_profile"]))
+        if delete_config:
+            stages.append(ICSStage(
+                "delete_config", self.delete_config,
+                after=["idle_configs", "rs_policy", "rs_profile", "results_dir"]))
+        if model_export:
+            stages.append(ICSStage(
+                "sqlite_export", self.sqlite_export,
+                after=["idle_configs", "rs_policy", "rs_profile"]))
+        if caching:
+            stages.append(ICSStage(
+                "model_cache", self._store_model, after=["idle_configs", "rs_policy", "rs_profile"]))
+        return stages
+
+    def run(
+            self,
+            console_output: bool = True,
+            reports: bool = True,
+            workers: int = 1,
+            delete_config: bool = False) -> dict:
+        """Runs the pipeline stages - independent stages run concurrently if workers > 1.
+
+        Returns:
+            Stage name -> wall-clock seconds."""
+
+        if self.profiler is not None and self.profiler.sequential and workers > 1:
+            # cProfile stats (rejected - Python 3.12+) & memory peaks of concurrent stages
+            # would be mixed up.
+            logger.warning("cProfile/memory accounting enabled - pipeline stages run sequentially.")
+            workers = 1
+
+        if self.config is None:
+            self.analyze()
+
+        scheduler = ICSStageScheduler(
+            self.stages(console_output, reports, delete_config),
+            workers=workers,
+            profiler=self.profiler)
+        print()
+        scheduler.run()
+        return scheduler.timings
+
+    def _profile(self, name: str):
+        """Pipeline profiler stage context (no-op if the profiler is not set)."""
+
+        return self.profiler.stage(name) if self.profiler is not None else nullcontext()
+
+    def _config_stage(self, method: str) -> dict:
+        """Runs an idle config method on its own parser instance (thread-safe) and
+        returns the results it added (see src.iconfig.stages.run_stage)."""
+
+        parser = ICSIdleConfig(self.document)
+        delta = run_stage(parser, method)
+        parser.release()
+        return delta
+
+    def _idle_configs(self, *deltas) -> ICSIdleConfig:
+        """Merges the idle config stage results (pipeline order)."""
+
+        for delta in deltas:
+            apply_stage(self.config, delta)
+        print()
+        return self.config
+
+    def _rs_policy_stage(self, *deltas) -> ICSRSPolicy:
+        """Resource policies stage - idle user roles are computed from the required stages only."""
+
+        logger.info("Parsing Resource policy dependencies.")
+
+        if deltas:
+            config = ICSIdleConfig(None)
+            for delta in deltas:
+                apply_stage(config, delta)
+            self._rs_policy = self._parse_rs_policy(config.idle_user_roles)
+        rs_policy = self.rs_policy
+
+        if self.budget is not None and self.budget.spill(rs_policy.index_entries()):
+            rs_policy.spill(self.budget.spill_dir)
+        return rs_policy
+
+    def _rs_profile_stage(self) -> ICSRSProfile:
+        """Resource profiles stage"""
+
+        logger.info("Parsing Idle Resource Profiles.")
+        return self.rs_profile
+
+    def _store_model(self) -> None:
+        """Stores the complete model - later runs might need any of the reports."""
+
+        self.cache.store(self.xml_file, {
+            ICSIdleConfig.__name__: self.config.model(),
+            ICSRSPolicy.__name__: self.rs_policy.model(),
+            ICSRSProfile.__name__: self.rs_profile.model()
+        })
+
+    def _parse_rs_policy(self, idle_user_roles: list) -> ICSRSPolicy:
+        """Resource policies - parsed from the XML export or loaded from the cached model"""
+
+        rs_policy = ICSRSPolicy(self.document, idle_user_roles)
+        if self.document is None:
+            rs_policy.load_model(self.model[ICSRSPolicy.__name__])
+        else:
+            for method, _ in STAGES[ICSRSPolicy.__name__]:  # ICSRSPolicy.rs_policies order.
+                with self._profile(f"rs_policy.{method}"):
+                    getattr(rs_policy, method)()
+            rs_policy.release()
+        return rs_policy
+
+    @property
+    def rs_policy(self) -> ICSRSPolicy:
+        """Resource policies - parsed from the XML export or loaded from the cached model"""
+
+        if self._rs_policy is None:
+            self._rs_policy = self._parse_rs_policy(self.config.idle_user_roles)
+        return self._rs_policy
+
+    @property
+    def rs_profile(self) -> ICSRSProfile:
+        """Resource profiles - parsed from the XML export or loaded from the cached model"""
+
+        if self._rs_profile is None:
+            self._rs_profile = ICSRSProfile(self.document)
+            if self.document is None:
+                self._rs_profile.load_model(self.model[ICSRSProfile.__name__])
+            else:
+                for method, _ in STAGES[ICSRSProfile.__name__]:  # ICSRSProfile.rs_profiles order.
+                    with self._profile(f"rs_profile.{method}"):
+                        getattr(self._rs_profile, method)()
+                self._rs_profile.release()
+        return self._rs_profile
+
+    def close(self) -> None:
+        """Releases the XML tree after the last parser."""
+
+        if self.document is not None:
+            self.document.close()
+
+    def results_dir(self) -> None:
+        """Results directory creator"""
+
+        os.makedirs(os.path.join(self.results_path, "resource_policies"))
+
+    def summary(self) -> dict:
+        """Idle config counts - CSV header -> number of idle objects."""
+
+        summary = {header: len(getattr(self.config, prop))
+                   for header, prop in IDLE_CONFIG_REPORT.items()}
+        summary.update({header: len(getattr(self.rs_profile, prop))
+                        for header, prop in RS_PROFILE_REPORT.items()})
+        return summary
+
+    def console_output(self) -> None:
+        """Enables the Console output"""
+
+        config = self.config
+
+        print("****** TOTAL CONFIGS ******")
+        print()
+
+        logger.info("Total Admin Realms - %d\n", len(config.total_admin_realms))
+        logger.info("Total User Realms - %d\n", len(config.total_user_realms))
+        logger.info(
+        "Total Authentication servers - %d\n", len(config.total_auth_servers))
+        logger.info("Total Admin Roles - %d\n", len(config.total_admin_roles))
+        logger.info("Total User Roles - %d\n", len(config.total_user_roles))
+
+        print()
+        print("****** MISC CONFIGS ******")
+        print()
+
+        logger.info("AOA Role mappings - %d\n", len(config.aoa_roles))
+        logger.info("IKEv2 Realm mappings - %d\n", len(config.ikev2_realms))
+
+        print()
+        print("****** IDLE CONFIGS ******")
+        print()
+
+        logger.info("Idle Admin realms - %d\n", len(config.idle_admin_realms))
+        pprint(config.idle_admin_realms)
+        print()
+
+        logger.info("Idle User realms - %d\n", len(config.idle_user_realms))
+        pprint(config.idle_user_realms)
+        print()
+
+        logger.info("Idle Admin sign-in urls - %d\n", len(config.idle_admin_urls))
+        pprint(config.idle_admin_urls)
+        print()
+
+        logger.info("Idle User sign-in urls - %d\n", len(config.idle_user_urls))
+        pprint(config.idle_user_urls)
+        print()
+
+        logger.info("Idle Admin sign-in realms - %d\n", len(config.idle_signin_admin_realm))
+        pprint(config.idle_signin_admin_realm)
+        print()
+
+        logger.info("Idle User sign-in realms - %d\n", len(config.idle_signin_user_realm))
+        pprint(config.idle_signin_user_realm)
+        print()
+
+        logger.info("Idle Authentication servers - %d\n",
+                len(config.idle_auth_servers))
+        pprint(config.idle_auth_servers)
+        print()
+
+        logger.info("Idle Admin roles - %d\n", len(config.idle_admin_roles))
+        pprint(config.idle_admin_roles)
+        print()
+
+        logger.info("Idle User roles - %d\n", len(config.idle_user_roles))
+        pprint(config.idle_user_roles)
+        print()
+
+    def csv_report(self) -> None:
+        """Enables CSV report"""
+
+        write_columns(
+            os.path.join(self.results_path, "idle_config_report.csv"),
+            list(IDLE_CONFIG_REPORT),
+            [getattr(self.config, prop) for prop in IDLE_CONFIG_REPORT.values()])
+        print()
+
+    def rs_policy_report(self) -> None:
+        """Pipeline for all CSV write operations"""
+
+        rs_policy = self.rs_policy
+        policies_path = os.path.join(self.results_path, "resource_policies")
+
+        for method, filename in RS_POLICY_REPORTS.items():
+            with self._profile(f"rs_policy_report.{method}"):
+                getattr(rs_policy, method)(os.path.join(policies_path, filename))
+
+        print()
+
+    def cleanup_report(self) -> None:
+        """Transitive cleanup report - idle objects of each cleanup round (src.iconfig.cleanup)"""
+
+        cleanup = ICSCleanup(self.config, self.rs_profile, self.rs_policy)
+        rounds = cleanup.run()
+        logger.info("Idle config cleanup - %d round(s), %d objects.", len(rounds),
+                    sum(len(names) for idle in rounds for names in idle.values()))
+        cleanup.write_csv(os.path.join(self.results_path, "idle_cleanup_rounds.csv"))
+        print()
+
+    def sqlite_export(self) -> None:
+        """SQLite export of the config model - objects & references (src.iconfig.database)"""
+
+        rows = ICSModelDatabase(self.sqlite).write(self.config, self.rs_policy, self.rs_profile)
+        logger.info("Config model exported to '%s' - %d rows.", self.sqlite, sum(rows.values()))
+        print()
+
+    def config_findings(self) -> None:
+        """NDJSON findings - idle config objects (idle user roles are written with their
+        resource policy dependencies by `role_findings`)"""
+
+        for category, prop in IDLE_CONFIG_REPORT.items():
+            if category != 'IDLE_USER_ROLES':
+                self.findings.write(category, getattr(self.config, prop))
+
+    def role_findings(self) -> None:
+        """NDJSON findings - idle user roles & the resource policies referencing them"""
+
+        self.findings.write(
+            'IDLE_USER_ROLES', self.config.idle_user_roles, self.rs_policy.role_dependencies)
+
+    def profile_findings(self) -> None:
+        """NDJSON findings - idle resource profiles"""
+
+        for category, prop in RS_PROFILE_REPORT.items():
+            self.findings.write(category, getattr(self.rs_profile, prop))
+
+    def delete_config(self) -> None:
+        """XML delete config bundles & manifest - idle objects of each idle category, dependents
+        first (src.idelete.xcoperation). Idle user roles still listed by resource policies or
+        profiles are left out (manifest `kept`) - no dangling role references are imported."""
+
+        referenced = role_references(self.config, self.rs_profile, self.rs_policy)
+        bundles = ICSXCBundles(
+            os.path.join(self.results_path, "delete_config"),
+            max_objects=self.bundle_objects,
+            max_bytes=self.bundle_bytes)
+        with bundles:
+            bundles.keep('IDLE_USER_ROLES', referenced)
+            for category in XC_PATHS:
+                if category in IDLE_CONFIG_REPORT:
+                    values = getattr(self.config, IDLE_CONFIG_REPORT[category])
+                else:
+                    values = getattr(self.rs_profile, RS_PROFILE_REPORT[category])
+                if category == 'IDLE_USER_ROLES':
+                    values = [role for role in values if role not in referenced]
+                bundles.delete_category(category, values)
+        logger.info("Idle config XML delete config - %d objects, %d bundle(s).",
+                    bundles.count, len(bundles.bundles))
+        if referenced:
+            logger.warning("%d idle user role(s) still referenced by resource policies/profiles "
+                           "- left out of the delete config (manifest.json 'kept').",
+                           len(referenced))
+        print()
+
+    def rs_profile_report(self) -> None:
+        """Pipeline for RS profiles"""
+
+        write_columns(
+            os.path.join(self.results_path, "idle_resource_profiles.csv"),
+            list(RS_PROFILE_REPORT),
+            [getattr(self.rs_profile, prop) for prop in RS_PROFILE_REPORT.values()])
+        print()
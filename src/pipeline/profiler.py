@@ -0,0 +1,184 @@
+"""
+src.pipeline.profiler
+~~~~~~~~~~~~~~~~~~~~~
+Per-stage timing & cProfile instrumentation for the idle config pipeline.
+
+Pipeline stages (and their sub-stages - XML parser init, each ICSIdleConfig method, each
+ICSRSPolicy family parse & CSV write, each ICSRSProfile family) are timed with
+`ICSProfiler.stage`. The timing report is written as JSON (`ICSProfiler.write`).
+
+If a pstats directory is set, each top-level stage also runs under cProfile and its stats are
+dumped to `<pstats_dir>/<stage>.pstats` (load with `python -m pstats`). Sub-stages are part of
+their parent stage's stats - a thread runs one profiler at a time.
+
+Memory accounting (opt-in - tracemalloc slows the run down) records for each stage the traced
+allocation peak, the memory retained once it finished (parsed XML tree, idle config results,
+resource policy dicts, etc.) and the process memory (RSS). Top-level stages also list their
+top allocation sites (`ICSProfiler.memory_report`).
+
+"""
+
+import cProfile
+import json
+import os
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Optional
+from ..api.memory import process_memory, peak_process_memory
+
+# Allocations of the profiler, the tracing itself & the import machinery are left out of the
+# top sites.
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+class ICSProfiler:
+    """
+    ICS Pipeline Profiler
+
+    Attributes:
+        pstats_dir: directory for the cProfile stats of each stage (None - timings only).
+        memory: If set, memory of each stage is accounted (tracemalloc & RSS).
+        top: number of top allocation sites listed per top-level stage.
+        stages: recorded stages (start order) - name, start offset & wall-clock seconds.
+        memory_stages: memory records of the stages (completion order) - memory accounting.
+
+    """
+
+    def __init__(
+            self,
+            pstats_dir: Optional[str] = None,
+            memory: bool = False,
+            top: int = 10) -> None:
+        self.pstats_dir = pstats_dir
+        self.memory = memory
+        self.top = top
+        self.stages = []
+        self.memory_stages = []
+        self._origin = perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()  # Active cProfile of the current thread.
+        self._memory_stack = []  # Memory records of the running (nested) stages.
+        self._snapshot = None
+        if memory:
+            tracemalloc.start()
+            self._snapshot = self._take_snapshot()
+
+    @property
+    def sequential(self) -> bool:
+        """True if the stages must not overlap - cProfile stats & memory accounting are
+        process/thread wide."""
+        return self.pstats_dir is not None or self.memory
+
+    @contextmanager
+    def stage(self, name: str):
+        """Times the wrapped block as the named stage (and profiles it - pstats directory set)."""
+
+        record = {"name": name, "start": perf_counter() - self._origin, "seconds": None}
+        with self._lock:
+            self.stages.append(record)
+
+        profile = None
+        if self.pstats_dir is not None and getattr(self._local, 'profile', None) is None:
+            profile = self._local.profile = cProfile.Profile()
+
+        memory = self._memory_enter(name) if self.memory else None
+        start = perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield record
+        finally:
+            if profile is not None:
+                profile.disable()
+                self._local.profile = None
+            record["seconds"] = perf_counter() - start
+            if memory is not None:
+                self._memory_exit(memory)
+            if profile is not None:
+                os.makedirs(self.pstats_dir, exist_ok=True)
+                record["pstats"] = os.path.join(self.pstats_dir, f"{name}.pstats")
+                profile.dump_stats(record["pstats"])
+
+    def _memory_enter(self, name: str) -> dict:
+        """Starts the memory record of the stage - traced peak is reset for the stage."""
+
+        current, peak = tracemalloc.get_traced_memory()
+        if self._memory_stack:  # Peak so far is kept for the parent stage before the reset.
+            parent = self._memory_stack[-1]
+            parent["_peak"] = max(parent["_peak"], peak)
+        tracemalloc.reset_peak()
+        memory = {"name": name, "_before": current, "_peak": current}
+        self._memory_stack.append(memory)
+        return memory
+
+    def _memory_exit(self, memory: dict) -> None:
+        """Completes the memory record of the stage - peak, retained memory, RSS & top sites."""
+
+        self._memory_stack.pop()
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(memory.pop("_peak"), peak)
+        before = memory.pop("_before")
+        if self._memory_stack:
+            parent = self._memory_stack[-1]
+            parent["_peak"] = max(parent["_peak"], peak)
+
+        memory.update(
+            peak=peak - before,  # Allocated on top of the memory in use when the stage started.
+            retained=current - before,
+            traced=current,
+            rss=process_memory())
+        if not self._memory_stack and self.top:
+            snapshot = self._take_snapshot()
+            memory["top_allocations"] = [
+                {"site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                 "size_diff": stat.size_diff, "count_diff": stat.count_diff}
+                for stat in snapshot.compare_to(self._snapshot, 'lineno')[:self.top]]
+            self._snapshot = snapshot
+        self.memory_stages.append(memory)
+
+    @staticmethod
+    def _take_snapshot() -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+    @property
+    def timings(self) -> dict:
+        """Stage name -> wall-clock seconds."""
+        return {record["name"]: record["seconds"] for record in self.stages}
+
+    def report(self, **details) -> dict:
+        """Timing report - details (XML export, version, etc.), total & per stage timings."""
+
+        return dict(details, total_seconds=perf_counter() - self._origin, stages=self.stages)
+
+    def write(self, filename: str, **details) -> None:
+        """Writes the timing report (see `report`) to the JSON file."""
+
+        with open(filename, mode='w', encoding='utf-8') as file_handle:
+            json.dump(self.report(**details), file_handle, indent=2)
+
+    def memory_report(self, **details) -> dict:
+        """Memory report - details, traced & RSS peaks and the stage memory records
+        (bytes). Memory accounting is stopped."""
+
+        current, peak = None, None
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self._snapshot = None
+        return dict(
+            details, traced=current, traced_peak=peak, rss=process_memory(),
+            peak_rss=peak_process_memory(), stages=self.memory_stages)
+
+    def write_memory(self, filename: str, **details) -> None:
+        """Writes the memory report (see `memory_report`) to the JSON file."""
+
+        with open(filename, mode='w', encoding='utf-8') as file_handle:
+            json.dump(self.memory_report(**details), file_handle, indent=2)
@@ -0,0 +1,200 @@
+"""
+src.pipeline.scheduler
+~~~~~~~~~~~~~~~~~~~~~~
+Dependency-aware stage scheduler for the idle config pipeline.
+
+Pipeline stages are declared as a small DAG - each stage names the stages whose outputs it
+reads (inputs) and the stages it must only run after (side effects, e.g. results directory).
+Ready stages run on a worker (thread) pool, so independent analyses (auth servers, realms,
+sign-in URLs, resource profiles, etc.) overlap and the wall-clock time approaches the longest
+dependency chain instead of the sum of all the stages.
+
+With a single worker the stages run one by one in declaration order (same output as before).
+Stages can be timed & profiled with a pipeline profiler (src.pipeline.profiler).
+
+"""
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from heapq import heapify, heappop, heappush
+from time import perf_counter
+from typing import Callable, Iterable, Optional
+from .profiler import ICSProfiler
+
+
+class ICSStage:
+    """
+    Pipeline stage
+
+    Attributes:
+        name: stage name - also the name of its output.
+        func: stage callable - receives the input stage outputs as positional arguments.
+        inputs: stages whose outputs are passed to the stage callable.
+        after: stages that must finish before this stage (no output passed).
+        exclusive: If set, no other stage runs at the same time (console output).
+
+    """
+
+    def __init__(
+            self,
+            name: str,
+            func: Callable,
+            inputs: Iterable[str] = (),
+            after: Iterable[str] = (),
+            exclusive: bool = False) -> None:
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+        self.after = tuple(after)
+        self.exclusive = exclusive
+
+    @property
+    def depends(self) -> set:
+        """All the stages this stage depends on."""
+        return set(self.inputs).union(self.after)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.name!r})"
+
+
+class ICSStageScheduler:
+    """
+    ICS Pipeline Stage Scheduler
+
+    Attributes:
+        stages: pipeline stages (declaration order).
+        workers: number of worker threads. 1 - stages run sequentially.
+        profiler: pipeline profiler (optional) - stages are timed/profiled by it.
+        results: stage name -> stage output.
+        timings: stage name -> wall-clock seconds.
+
+    """
+
+    def __init__(
+            self,
+            stages: list,
+            workers: int = 1,
+            profiler: Optional[ICSProfiler] = None) -> None:
+        """
+        Args:
+            stages: list of ICSStage objects.
+            workers: number of worker threads.
+            profiler: pipeline profiler.
+
+        Raises:
+            ValueError: duplicate stage name, unknown dependency or dependency cycle.
+        """
+
+        self.stages = list(stages)
+        self.workers = max(1, workers or 1)
+        self.profiler = profiler
+        self.results = {}
+        self.timings = {}
+        self._positions = {}
+
+        for position, stage in enumerate(self.stages):
+            if stage.name in self._positions:
+                raise ValueError(f"Duplicate pipeline stage - {stage.name}")
+            self._positions[stage.name] = position
+
+        for stage in self.stages:
+            unknown = stage.depends.difference(self._positions)
+            if unknown:
+                raise ValueError(
+                    f"Pipeline stage {stage.name} depends on unknown stages - {sorted(unknown)}")
+        self.order()  # Rejects dependency cycles before running anything.
+
+    def _dependents(self) -> dict:
+        """Stage name -> stages depending on it."""
+
+        dependents = {stage.name: [] for stage in self.stages}
+        for stage in self.stages:
+            for name in stage.depends:
+                dependents[name].append(stage)
+        return dependents
+
+    def order(self) -> list:
+        """Returns the stages in execution order - dependencies first, declaration order otherwise.
+
+        Raises:
+            ValueError: dependency cycle.
+        """
+
+        dependents = self._dependents()
+        pending = {stage.name: len(stage.depends) for stage in self.stages}
+        ready = [position for position, stage in enumerate(self.stages) if not pending[stage.name]]
+        heapify(ready)
+
+        order = []
+        while ready:
+            stage = self.stages[heappop(ready)]
+            order.append(stage)
+            for dependent in dependents[stage.name]:
+                pending[dependent.name] -= 1
+                if not pending[dependent.name]:
+                    heappush(ready, self._positions[dependent.name])
+
+        if len(order) != len(self.stages):
+            cycle = sorted(name for name, count in pending.items() if count)
+            raise ValueError(f"Pipeline stages have a dependency cycle - {cycle}")
+        return order
+
+    def run(self) -> dict:
+        """Runs all the stages and returns their outputs (stage name -> output).
+
+        Exceptions raised by a stage are re-raised once the running stages finish."""
+
+        if self.workers == 1:
+            for stage in self.order():
+                self.results[stage.name] = self._execute(stage)
+        else:
+            self._run_concurrent()
+        return self.results
+
+    def _execute(self, stage: ICSStage):
+        """Runs the stage callable with its input values."""
+
+        start = perf_counter()
+        try:
+            if self.profiler is None:
+                return stage.func(*(self.results[name] for name in stage.inputs))
+            with self.profiler.stage(stage.name):
+                return stage.func(*(self.results[name] for name in stage.inputs))
+        finally:
+            self.timings[stage.name] = perf_counter() - start
+
+    def _run_concurrent(self) -> None:
+        """Runs the ready stages on the worker pool until all the stages are done."""
+
+        dependents = self._dependents()
+        pending = {stage.name: len(stage.depends) for stage in self.stages}
+        ready = [position for position, stage in enumerate(self.stages) if not pending[stage.name]]
+        heapify(ready)
+        running = {}  # Future -> stage.
+
+        def complete(stage: ICSStage) -> None:
+            for dependent in dependents[stage.name]:
+                pending[dependent.name] -= 1
+                if not pending[dependent.name]:
+                    heappush(ready, self._positions[dependent.name])
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while ready or running:
+                while ready:
+                    stage = self.stages[ready[0]]
+                    if stage.exclusive:
+                        if running:
+                            break  # Waits for the running stages to finish.
+                        heappop(ready)
+                        self.results[stage.name] = self._execute(stage)
+                        complete(stage)
+                        continue
+                    heappop(ready)
+                    running[executor.submit(self._execute, stage)] = stage
+
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    self.results[stage.name] = future.result()
+                    complete(stage)
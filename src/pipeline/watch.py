@@ -0,0 +1,228 @@
+"""
+src.pipeline.watch
+~~~~~~~~~~~~~~~~~~
+Watch mode - long-running idle config pipeline for a spool directory of XML exports.
+
+The spool directory is polled (no platform file-system events - works on network shares).
+A new or changed XML export is analyzed once it is fully written - size & modification time
+unchanged for at least one poll interval. Exports are analyzed in a bounded process pool that
+stays up between runs (parser modules imported once, model cache shared through `cache_dir`) -
+at most `workers` exports are in flight, ready exports wait in the spool until a worker is free.
+
+Reports of each run are written to a temporary directory and renamed into place
+(`<results_path>/<appliance>/<timestamp>`) only if the analysis succeeded - readers never see
+partial reports. Each run is appended to `watch_summary.csv` (fleet summary columns).
+
+"""
+
+import os
+import shutil
+import signal
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from csv import DictWriter
+from time import monotonic, sleep, strftime
+from typing import Optional
+from uuid import uuid4
+from .batch import FLEET_SUMMARY_HEADERS, analyze_export, appliance_name, collect_exports, logger
+
+WATCH_SUMMARY_HEADERS = FLEET_SUMMARY_HEADERS + ["REPORTS"]
+
+
+def publish_reports(tmp_path: str, reports_path: str) -> str:
+    """Renames the reports directory into place - `-N` suffix if the name is taken.
+
+    Returns:
+        Final reports directory."""
+
+    os.makedirs(os.path.dirname(reports_path), exist_ok=True)
+    target = reports_path
+    count = 1
+    while True:
+        try:
+            os.rename(tmp_path, target)  # Atomic on the same file system.
+            return target
+        except FileExistsError:
+            pass
+        except OSError:  # Windows raises PermissionError/OSError for existing targets.
+            if not os.path.exists(target):
+                raise
+        target = f"{reports_path}-{count}"
+        count += 1
+
+
+def analyze_spooled(xml_file: str, results_path: str, appliance: str, options: dict) -> dict:
+    """Worker - analyzes the spooled XML export into a temporary directory and publishes the
+    reports if the analysis succeeded.
+
+    Returns:
+        Watch summary row - fleet summary row & final reports directory."""
+
+    tmp_path = os.path.join(results_path, f".{appliance}.{uuid4().hex}.tmp")
+    try:
+        row = analyze_export(xml_file, tmp_path, **options)
+        row["APPLIANCE"] = appliance
+        if row["STATUS"] == "OK":
+            row["REPORTS"] = publish_reports(
+                tmp_path, os.path.join(results_path, appliance, strftime("%d-%m-%Y-%H%M%S")))
+        return row
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)  # Failed run (or already published).
+
+
+def ignore_interrupt() -> None:
+    """Worker initializer - Ctrl+C/SIGTERM reach the whole process group, only the watcher
+    handles them (exports in progress are completed)."""
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+
+
+class ICSSpoolWatcher:
+    """
+    Spool directory watcher
+
+    Attributes:
+        spool_dir: directory the XML exports are dropped into.
+        results_path: directory for the per-run reports & watch summary.
+        workers: worker processes - maximum number of exports analyzed at once.
+        poll_interval: seconds between the spool directory scans.
+        options: analyze_export options (streaming, cache_dir, backend, etc.).
+        analyzed: XML export -> (size, mtime) of the last analyzed version.
+
+    """
+
+    def __init__(
+            self,
+            spool_dir: str,
+            results_path: str,
+            workers: Optional[int] = None,
+            poll_interval: float = 5.0,
+            **options) -> None:
+        if not os.path.isdir(spool_dir):
+            raise SystemExit(f"Spool directory not found - {spool_dir}")
+        self.spool_dir = spool_dir
+        self.results_path = results_path
+        self.workers = workers or os.cpu_count() or 1
+        self.poll_interval = poll_interval
+        self.options = options
+        self.analyzed = {}
+        self._candidates = {}  # XML export -> ((size, mtime), first seen) of the previous scan.
+        self._ready = deque()  # Fully written exports waiting for a worker.
+        self._running = {}  # Future -> (XML export, (size, mtime)).
+
+    @staticmethod
+    def _signature(xml_file: str) -> Optional[tuple]:
+        try:
+            stat = os.stat(xml_file)
+        except OSError:  # Removed/renamed since the scan.
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def scan(self) -> list:
+        """Scans the spool directory - returns the new or changed exports fully written
+        (same size & modification time for at least one poll interval)."""
+
+        now = monotonic()
+        queued = {xml_file for xml_file, _ in self._ready}
+        queued.update(xml_file for xml_file, _ in self._running.values())
+        candidates = {}
+        ready = []
+        for xml_file in collect_exports(self.spool_dir):
+            signature = self._signature(xml_file)
+            if signature is None or not signature[0] or self.analyzed.get(xml_file) == signature:
+                continue
+            previous, since = self._candidates.get(xml_file, (None, now))
+            if previous != signature:
+                since = now  # Still being written - stability is timed from this scan.
+            candidates[xml_file] = (signature, since)
+            if now - since >= self.poll_interval and xml_file not in queued:
+                ready.append((xml_file, signature))
+        self._candidates = candidates
+        return ready
+
+    def _submit(self, executor: ProcessPoolExecutor) -> None:
+        """Submits the ready exports while a worker is free (backpressure - the rest wait)."""
+
+        while self._ready and len(self._running) < self.workers:
+            xml_file, signature = self._ready.popleft()
+            if self._signature(xml_file) != signature:  # Changed while waiting - rescanned.
+                continue
+            future = executor.submit(
+                analyze_spooled, xml_file, self.results_path, appliance_name(xml_file),
+                self.options)
+            self._running[future] = (xml_file, signature)
+            logger.info("%s - analyzing.", xml_file)
+
+    def _complete(self, futures) -> list:
+        """Collects the finished runs - summary rows appended to watch_summary.csv."""
+
+        rows = []
+        for future in futures:
+            xml_file, signature = self._running.pop(future)
+            self.analyzed[xml_file] = signature  # Failed exports are retried once changed.
+            try:
+                row = future.result()
+            except Exception as exc:  # Worker crash (killed, out of memory, etc.)
+                row = {"APPLIANCE": appliance_name(xml_file), "XML_EXPORT_FILE": xml_file,
+                       "STATUS": f"FAILED: {exc!r}"}
+            logger.info("%s - %s", row["APPLIANCE"], row["STATUS"])
+            rows.append(row)
+        if rows:
+            self._write_summary(rows)
+        return rows
+
+    def _write_summary(self, rows: list) -> None:
+        filename = os.path.join(self.results_path, "watch_summary.csv")
+        header = not os.path.exists(filename)
+        with open(filename, mode='a', encoding='utf-8', newline='') as file_handle:
+            write_output = DictWriter(
+                file_handle, dialect='excel', fieldnames=WATCH_SUMMARY_HEADERS, restval="")
+            if header:
+                write_output.writeheader()
+            write_output.writerows(rows)
+
+    def _executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=ignore_interrupt)
+
+    @staticmethod
+    def _terminate(signum, frame) -> None:
+        raise KeyboardInterrupt  # Service stop (SIGTERM) - same shutdown as Ctrl+C.
+
+    def run(self, max_scans: Optional[int] = None) -> None:
+        """Watches the spool directory until interrupted - Ctrl+C/SIGTERM (or `max_scans` scans
+        are done and the submitted exports are analyzed). Exports in progress are completed on
+        shutdown, exports waiting for a worker are left for the next run."""
+
+        os.makedirs(self.results_path, exist_ok=True)
+        logger.info("Watching '%s' - %d worker(s), %.1fs poll interval.\n",
+                    self.spool_dir, self.workers, self.poll_interval)
+        scans = 0
+        previous_handler = signal.signal(signal.SIGTERM, self._terminate)
+        executor = self._executor()
+        try:
+            while max_scans is None or scans < max_scans or self._running or self._ready:
+                if max_scans is None or scans < max_scans:
+                    self._ready.extend(self.scan())
+                    scans += 1
+                try:
+                    self._submit(executor)
+                except BrokenProcessPool:  # A worker died - pool is replaced, exports wait.
+                    executor.shutdown(wait=False)
+                    executor = self._executor()
+                if self._running:
+                    done, _ = wait(
+                        self._running, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                    self._complete(done)
+                else:
+                    sleep(self.poll_interval)
+        except KeyboardInterrupt:
+            logger.info("Watch mode stopping - waiting for %d export(s) in progress.",
+                        len(self._running))
+            self._ready.clear()
+            done, _ = wait(self._running)
+            self._complete(done)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            signal.signal(signal.SIGTERM, previous_handler)
@@ -1,3 +1,10 @@
 """
 ICS Idle Config - XPATH objects
 """
+
+
+def xpath_constants(module) -> dict:
+    """Returns the XPATH constants (`.//` prefixed strings) defined in the xpath module."""
+
+    return {name: value for name, value in vars(module).items()
+            if name.isupper() and isinstance(value, str) and value.startswith('.//')}
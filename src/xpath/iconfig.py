@@ -5,6 +5,7 @@ XPATH for config objects.
 
 ROOT -> Used for validating the presence of the XML tree
 MISC -> Optional config objects that might affect the result.
+FIELDS -> Child tags read from each record element (used by the streaming parser).
 
 """
 
@@ -12,10 +13,21 @@ AUTH_SERVERS_ROOT = './/auth-servers'
 AUTH_SERVERS = './/auth-server/name'
 
 SIGNIN_ROOT = './/access-urls'
+SIGNIN_URL = './/access-urls/access-url'
+SIGNIN_URL_FIELDS = ['url-pattern', 'enabled', 'user', 'user/realms', 'admin', 'admin/realms']
 SIGNIN_USER_REALMS = './/access-url/user/realms'
 SIGNIN_ADMIN_REALMS = './/access-url/admin/realms'
 
+REALM_SERVER_FIELDS = [
+    'authentication-server',
+    'secondary-authentication-settings/name',
+    'directory-server',
+    'accounting-server']
+REALM_ROLES_FIELD = 'role-mapping-rules/rule/roles'
+REALM_FIELDS = ['name', REALM_ROLES_FIELD] + REALM_SERVER_FIELDS
+
 USER_REALMS_ROOT = './/user-realms'
+USER_REALM = './/user-realms/realm'
 USER_REALMS = './/user-realms/realm/name'
 USER_REALMS_AUTHSERVER = './/user-realms/realm/authentication-server'
 USER_REALMS_DIRSERVER = './/user-realms/realm/directory-server'
@@ -24,6 +36,7 @@ USER_REALMS_SECAUTHSERVER = './/user-realms/realm/secondary-authentication-setti
 USER_REALMS_RMAP = './/user-realms/realm/role-mapping-rules/rule/roles'
 
 ADMIN_REALMS_ROOT = './/admin-realms'
+ADMIN_REALM = './/admin-realms/realm'
 ADMIN_REALMS = './/admin-realms/realm/name'
 ADMIN_REALMS_AUTHSERVER = './/admin-realms/realm/authentication-server'
 ADMIN_REALMS_DIRSERVER = './/admin-realms/realm/directory-server'
@@ -43,4 +56,3 @@ MISC_AOA_ROLES = './/authorization-only-policy/role-option'
 MISC_IKEV2_ROOT = './/ike-options'
 MISC_IKEV2_PORTREALM = './/ike-options/port-realm-mappings/port-realm/realm'
 MISC_IKEV2_PROTOREALM = './/ike-options/realm-protocol-mappings/realm-protocol/realm'
-MISC_IKEV2_REALMS = 'ikev2_realms'
@@ -0,0 +1,42 @@
+"""
+XML delete config - element paths (src.idelete.xcoperation).
+
+Paths are absolute from the root element of the XML export (`configuration`), as expected by
+the ICS XML import.
+
+XC_ROOT -> Root element of the delete config.
+XC_NAMESPACE -> NETCONF namespace of the `xc:operation` attribute.
+XC_PATHS -> Report category: (container path, object element, key child element).
+
+XC_PATHS order is the delete order - objects referencing other objects (dependents) are deleted
+before the objects they reference: sign-in URLs (-> realms), realms (-> roles, auth servers),
+resource profiles (-> roles), roles, auth servers. Categories of a section are kept together.
+
+"""
+
+XC_ROOT = 'configuration'
+XC_NAMESPACE = 'urn:ietf:params:xml:ns:netconf:base:1.0'
+
+XC_PATHS = {
+    'IDLE_USER_URLS': ('signin/access-urls', 'access-url', 'url-pattern'),
+    'IDLE_ADMIN_URLS': ('signin/access-urls', 'access-url', 'url-pattern'),
+    'IDLE_USER_REALMS': ('users/user-realms', 'realm', 'name'),
+    'WEB_PROFILES': ('users/resource-profiles/web-profiles', 'web-profile', 'name'),
+    'FILE_PROFILES': ('users/resource-profiles/file-win-profiles', 'file-win-profile', 'name'),
+    'SAM_CLIENT_APPS': (
+        'users/resource-profiles/sam-profiles/client-application-profiles',
+        'client-application-profile', 'name'),
+    'SAM_DESTS': (
+        'users/resource-profiles/sam-profiles/wsam-destination-profiles',
+        'wsam-destination-profile', 'name'),
+    'TERMSERV_PROFILES': (
+        'users/resource-profiles/terminal-services-profiles', 'terminal-services-profile', 'name'),
+    'VDI_PROFILES': (
+        'users/resource-profiles/virtual-desktops-profiles', 'virtual-desktops-profile', 'name'),
+    'HTML5_PROFILES': (
+        'users/resource-profiles/html5-access-profiles', 'html5-access-profile', 'name'),
+    'IDLE_USER_ROLES': ('users/user-roles', 'user-role', 'name'),
+    'IDLE_ADMIN_REALMS': ('administrators/admin-realms', 'realm', 'name'),
+    'IDLE_ADMIN_ROLES': ('administrators/admin-roles', 'admin-role', 'name'),
+    'IDLE_AUTH_SERVERS': ('authentication/auth-servers', 'auth-server', 'name'),
+}
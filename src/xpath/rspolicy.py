@@ -10,7 +10,11 @@ All VPN tunneling policies.
 
 " rest of the policies have parent "
 
+RS_POLICY_FIELDS -> Child tags read from each policy element (used by the streaming parser).
+
 """
+RS_POLICY_FIELDS = ['name', 'parent-type', 'apply', 'roles', 'role']
+
 # Resource policies.
 
 WEB_ROOT = './/web-policies'
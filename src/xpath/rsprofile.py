@@ -1,5 +1,8 @@
 """Resource profiles XPATH"""
 
+# Child tags read from each profile element (used by the streaming parser).
+RS_PROFILE_FIELDS = ['name', 'roles']
+
 # Resource profiles.
 
 WEB_PROF_ROOT = './/web-profiles'
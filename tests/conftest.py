@@ -0,0 +1,60 @@
+"""
+Shared fixtures - synthetic XML exports (benchmarks.generator).
+"""
+
+import pytest
+from benchmarks.generator import ICSExportGenerator
+from src.iconfig.stages import POLICY_CATEGORIES, PROFILE_CATEGORIES
+from .helpers import parse
+
+# Small exports - every config section & policy/profile family, tiny ESAP/client packages.
+EXPORT_COUNTS = {'esap_size': 4096, 'package_size': 4096}
+
+# Top-level sections preceded by a comment & a processing instruction (edge layout export).
+EDGE_SECTIONS = (b'users', b'signin', b'resource-profiles', b'host-checker', b'client-packages')
+
+
+@pytest.fixture(scope='session')
+def export(tmp_path_factory) -> str:
+    """Plain synthetic XML export"""
+
+    filename = str(tmp_path_factory.mktemp('exports') / 'ive-export.xml')
+    ICSExportGenerator.scaled(0.5, EXPORT_COUNTS).write(filename)
+    return filename
+
+
+@pytest.fixture(scope='session')
+def expected(export) -> dict:
+    """Idle sets of the plain export - full DOM without the tag index & section skip."""
+
+    sets = parse(export, indexed=False, skip_sections=False)
+    # Idle user roles with resource policy dependencies, profiles & several cleanup rounds.
+    assert all(sets[category] for category in POLICY_CATEGORIES)
+    assert all(sets[category] for category in PROFILE_CATEGORIES)
+    assert len(sets['CLEANUP_ROUNDS']) > 1
+    return sets
+
+
+@pytest.fixture(scope='session')
+def edge_export(export, tmp_path_factory) -> str:
+    """Same export with edge layouts - comments & processing instructions between the top-level
+    sections, nested same-name tags and self-closing sections (none of them queried)."""
+
+    with open(export, mode='rb') as file_handle:
+        content = file_handle.read()
+
+    for section in EDGE_SECTIONS:
+        start_tag = b'<' + section + b'>'
+        comment = b'<!-- ' + start_tag + b'<web-policies/> -->\n'  # Markup in comments.
+        instruction = b'<?ics-export section="' + section + b'"?>\n'
+        content = content.replace(start_tag, comment + instruction + start_tag, 1)
+    content = content.replace(
+        b'</host-checker>', b'<host-checker><esap/></host-checker></host-checker>', 1)
+    content = content.replace(
+        b'</configuration>',
+        b'<log-monitoring/><!-- trailer --><snmp a="1" />\n</configuration>', 1)
+
+    filename = str(tmp_path_factory.mktemp('exports') / 'ive-export-edge.xml')
+    with open(filename, mode='wb') as file_handle:
+        file_handle.write(content)
+    return filename
@@ -0,0 +1,39 @@
+"""
+Test helpers - idle config objects reported by the parsers.
+"""
+
+from src import ICSIdleConfig, ICSRSPolicy, ICSRSProfile, ICSXMLDocument
+from src.iconfig.cleanup import ICSCleanup
+from src.iconfig.stages import IDLE_CATEGORIES, POLICY_CATEGORIES, PROFILE_CATEGORIES, STAGES
+
+
+def idle_sets(config, rs_policy, rs_profile) -> dict:
+    """Idle config objects of the parsers - report category -> sorted names, resource policy
+    dependencies of the idle user roles & cleanup rounds."""
+
+    sets = {category: sorted(getattr(config, prop)) for category, prop in IDLE_CATEGORIES.items()}
+    sets.update({category: sorted(getattr(rs_profile, prop))
+                 for category, prop in PROFILE_CATEGORIES.items()})
+    index = rs_policy.policy_index
+    sets.update({category: {role: {policy_type: sorted(names)
+                                   for policy_type, names in types.items()}
+                            for role, types in index[family].items()}
+                 for category, family in POLICY_CATEGORIES.items()})
+    sets['CLEANUP_ROUNDS'] = ICSCleanup(config, rs_profile, rs_policy).run()
+    return sets
+
+
+def parse(xml_file: str, **options) -> dict:
+    """Parses the XML export with the document options (ICSXMLDocument) - idle sets."""
+
+    with ICSXMLDocument(xml_file, **options) as document:
+        config = ICSIdleConfig(document)
+        for method, _ in STAGES[ICSIdleConfig.__name__]:
+            getattr(config, method)()
+        rs_policy = ICSRSPolicy(document, config.idle_user_roles)
+        rs_policy.rs_policies()
+        rs_profile = ICSRSProfile(document)
+        rs_profile.rs_profiles()
+        for parser in (config, rs_policy, rs_profile):
+            parser.release()
+    return idle_sets(config, rs_policy, rs_profile)
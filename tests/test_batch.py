@@ -0,0 +1,58 @@
+"""
+Fleet batch mode - one worker process per XML export, failed exports don't stop the fleet.
+"""
+
+import csv
+import os
+import shutil
+from src.api import logger as api_logger
+from src.pipeline.batch import FLEET_SUMMARY_HEADERS, analyze_export, collect_exports, run_batch
+from src.pipeline.pipeline import ICSPipeline, IDLE_CONFIG_REPORT, RS_PROFILE_REPORT, logger
+
+
+def test_fleet_summary(export, expected, tmp_path):
+    exports_dir = tmp_path / 'exports'
+    exports_dir.mkdir()
+    shutil.copy(export, exports_dir / 'appliance-a.xml')
+    with open(export, mode='rb') as file_handle:  # Truncated export - invalid XML.
+        (exports_dir / 'appliance-b.xml').write_bytes(file_handle.read()[:4096])
+    (exports_dir / 'notes.txt').write_text('not an export')
+
+    exports = collect_exports(str(exports_dir))
+    assert [os.path.basename(xml_file) for xml_file in exports] == \
+        ['appliance-a.xml', 'appliance-b.xml']
+
+    results_path = str(tmp_path / 'results')
+    summary = run_batch(exports, results_path, workers=2)
+    with open(os.path.join(results_path, 'fleet_summary.csv'), encoding='utf-8') as file_handle:
+        reader = csv.DictReader(file_handle)
+        assert reader.fieldnames == FLEET_SUMMARY_HEADERS
+        rows = list(reader)
+
+    assert [row['APPLIANCE'] for row in rows] == ['appliance-a', 'appliance-b']
+    assert [row['APPLIANCE'] for row in summary] == ['appliance-a', 'appliance-b']
+    healthy, failed = rows
+
+    assert healthy['STATUS'] == 'OK'
+    for category in list(IDLE_CONFIG_REPORT) + list(RS_PROFILE_REPORT):
+        assert int(healthy[category]) == len(expected[category])
+    assert os.path.isfile(os.path.join(results_path, 'appliance-a', 'idle_config_report.csv'))
+
+    assert failed['STATUS'].startswith('FAILED: ') and 'XML Parsing failed' in failed['STATUS']
+    assert all(failed[category] == '' for category in IDLE_CONFIG_REPORT)
+
+
+def test_unexpected_export_error(export, tmp_path, monkeypatch):
+    def run(self, *args, **kwargs):
+        raise KeyError('web-acl')
+
+    monkeypatch.setattr(ICSPipeline, 'run', run)
+    levels = api_logger.level, logger.level
+    try:
+        row = analyze_export(export, str(tmp_path / 'appliance-a'))
+    finally:  # Worker log levels.
+        api_logger.setLevel(levels[0])
+        logger.setLevel(levels[1])
+
+    assert row['APPLIANCE'] == 'appliance-a'
+    assert row['STATUS'] == "FAILED: KeyError('web-acl')"
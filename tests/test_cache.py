@@ -0,0 +1,80 @@
+"""
+Config model cache - re-runs against the same XML export load the cached model.
+"""
+
+import os
+from src import ICSModelCache
+from src.pipeline import ICSPipeline
+from .helpers import idle_sets
+
+
+def test_cached_model(export, expected, tmp_path):
+    cache = ICSModelCache(str(tmp_path / 'cache'), 'test')
+
+    pipeline = ICSPipeline(export, str(tmp_path / 'results'), cache=cache)
+    pipeline.run(console_output=False, reports=False)
+    assert pipeline.model is None
+    assert idle_sets(pipeline.config, pipeline.rs_policy, pipeline.rs_profile) == expected
+    pipeline.close()
+
+    pipeline = ICSPipeline(export, str(tmp_path / 'results'), cache=cache)
+    pipeline.analyze()
+    assert pipeline.model is not None and pipeline.document is None  # XML not parsed.
+    assert idle_sets(pipeline.config, pipeline.rs_policy, pipeline.rs_profile) == expected
+    pipeline.close()
+
+
+def store(cache: ICSModelCache, xml_file: str, size: int = 4096) -> str:
+    """Stores a model of about `size` bytes - returns its cache filepath."""
+
+    cache.store(xml_file, {'xml_file': xml_file, 'data': b'x' * size})
+    return cache._path(xml_file)
+
+
+def test_cache_hit_and_miss(export, tmp_path):
+    cache = ICSModelCache(str(tmp_path / 'cache'), 'test')
+    with open(export, mode='rb') as file_handle:
+        content = file_handle.read()
+    copy, edited = tmp_path / 'copy.xml', tmp_path / 'edited.xml'
+    copy.write_bytes(content)  # Byte-identical copy - same model.
+    edited.write_bytes(content.replace(b'Role-1<', b'Role-2<', 1))  # One byte changed.
+
+    pipeline = ICSPipeline(export, str(tmp_path / 'results'), cache=cache)
+    pipeline.run(console_output=False, reports=False)
+    pipeline.close()
+
+    for xml_file, cached in ((copy, True), (edited, False)):
+        pipeline = ICSPipeline(str(xml_file), str(tmp_path / 'results'), cache=cache)
+        pipeline.analyze()
+        assert (pipeline.model is not None) is cached
+        assert (pipeline.document is None) is cached  # XML parsed on cache misses only.
+        pipeline.close()
+
+    # Models stored by other versions are not used.
+    assert ICSModelCache(str(tmp_path / 'cache'), 'other').load(export) is None
+
+
+def test_cache_lru_eviction(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    exports = []
+    for name in ('a', 'b', 'c'):
+        xml_file = tmp_path / f'{name}.xml'
+        xml_file.write_text(f'<configuration name="{name}"/>')
+        exports.append(str(xml_file))
+    first, second, third = exports
+
+    cache = ICSModelCache(cache_dir, 'test', max_size=2 * 4096 + 2048)  # Room for two models.
+    paths = [store(cache, first), store(cache, second)]
+    for mtime, path in zip((100, 200), paths):  # Stored in this order.
+        os.utime(path, (mtime, mtime))
+    assert cache.load(first) is not None  # Most recently used now.
+
+    store(cache, third)
+    assert cache.load(second) is None  # Least recently used - evicted.
+    assert cache.load(first) is not None and cache.load(third) is not None
+    assert sum(entry.stat().st_size for entry in os.scandir(cache_dir)) <= cache.max_size
+
+    # The model that was just stored is kept even if it doesn't fit alone.
+    small = ICSModelCache(cache_dir, 'test', max_size=1024)
+    path = store(small, second)
+    assert [entry.path for entry in os.scandir(cache_dir)] == [path]
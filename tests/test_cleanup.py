@@ -0,0 +1,53 @@
+"""
+Cleanup rounds - round 1 is the idle config report, later rounds only hold objects released by
+the earlier rounds.
+"""
+
+import pytest
+from src.iconfig.cleanup import ICSCleanup
+from src.iconfig.stages import IDLE_CATEGORIES
+from src.pipeline import ICSPipeline
+
+
+@pytest.fixture(scope='module')
+def cleanup(export, tmp_path_factory):
+    """Pipeline models & the cleanup rounds - (pipeline, cleanup)"""
+
+    pipeline = ICSPipeline(export, str(tmp_path_factory.mktemp('results')))
+    pipeline.run(console_output=False, reports=False)
+    cleanup = ICSCleanup(pipeline.config, pipeline.rs_profile, pipeline.rs_policy)
+    cleanup.run()
+    yield pipeline, cleanup
+    pipeline.close()
+
+
+def test_first_round(cleanup):
+    pipeline, cleanup = cleanup
+    first = cleanup.rounds[0]
+
+    for category in {category for category, _ in cleanup.holders}:
+        if category in IDLE_CATEGORIES:
+            assert first.get(category, []) == sorted(
+                getattr(pipeline.config, IDLE_CATEGORIES[category]))
+    for (category, name), holders in cleanup.holders.items():
+        assert (name in first.get(category, ())) == (not holders and
+                                                     (category, name) not in cleanup.pinned)
+
+
+def test_later_rounds(cleanup):
+    _, cleanup = cleanup
+    assert len(cleanup.rounds) > 1
+
+    removed = set()
+    for idle in cleanup.rounds:
+        nodes = {(category, name) for category, names in idle.items() for name in names}
+        assert not nodes & removed  # Each object is removed once.
+        assert not nodes & cleanup.pinned
+        for node in nodes:
+            assert cleanup.holders[node] <= removed
+        removed |= nodes
+
+    # Objects left behind are held by pinned or surviving objects.
+    for node, holders in cleanup.holders.items():
+        if node not in removed and node not in cleanup.pinned:
+            assert holders - removed
@@ -0,0 +1,66 @@
+"""
+SQLite export - config model records & references.
+"""
+
+import sqlite3
+import pytest
+from src.iconfig.cleanup import POLICY_FAMILIES, PROFILE_FAMILIES
+from src.pipeline import ICSPipeline
+
+
+@pytest.fixture(scope='module')
+def database(export, tmp_path_factory):
+    """Pipeline run with the SQLite export - (pipeline, connection)"""
+
+    directory = tmp_path_factory.mktemp('sqlite')
+    pipeline = ICSPipeline(export, str(directory / 'results'), sqlite=str(directory / 'model.db'))
+    pipeline.run(console_output=False, reports=False)
+    conn = sqlite3.connect(str(directory / 'model.db'))
+    yield pipeline, conn
+    conn.close()
+    pipeline.close()
+
+
+def count(conn: sqlite3.Connection, table: str) -> int:
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def test_row_counts(database):
+    pipeline, conn = database
+    config, rs_policy, rs_profile = pipeline.config, pipeline.rs_policy, pipeline.rs_profile
+    realms = config.user_realms_ + config.admin_realms_
+    policies = [policy for attr in POLICY_FAMILIES.values() for policy in getattr(rs_policy, attr)]
+    profiles = [profile for attr in PROFILE_FAMILIES.values()
+                for profile in getattr(rs_profile, attr)]
+
+    assert count(conn, 'auth_servers') == len(config.auth_servers_)
+    assert count(conn, 'realms') == len(realms)
+    assert count(conn, 'realm_servers') == sum(len(realm.servers) for realm in realms)
+    assert count(conn, 'realm_roles') == sum(len(realm.roles) for realm in realms)
+    assert count(conn, 'signin_urls') == len(config.user_urls_) + len(config.admin_urls_)
+    assert count(conn, 'roles') == len(config.user_roles_) + len(config.admin_roles_)
+    assert count(conn, 'resource_policies') == len(policies)
+    assert count(conn, 'policy_roles') == sum(len(policy.roles) for policy in policies)
+    assert count(conn, 'resource_profiles') == len(profiles)
+    assert count(conn, 'profile_roles') == sum(len(profile.roles) for profile in profiles)
+    assert count(conn, 'misc_references') == len(config.aoa_roles_) + len(config.ikev2_realms_)
+
+    idle_roles = conn.execute(
+        "SELECT name FROM roles WHERE scope = 'user' AND idle ORDER BY name").fetchall()
+    assert [name for name, in idle_roles] == sorted(config.idle_user_roles)
+
+
+def test_role_policy_join(database):
+    pipeline, conn = database
+    rs_policy = pipeline.rs_policy
+
+    checked = 0
+    for role in pipeline.config.idle_user_roles:
+        rows = conn.execute(
+            "SELECT p.family, p.name FROM resource_policies p "
+            "JOIN policy_roles pr ON pr.policy_id = p.id WHERE pr.role = ?", (role,)).fetchall()
+        assert sorted(rows) == sorted(
+            (family, policy.name) for family, attr in POLICY_FAMILIES.items()
+            for policy in getattr(rs_policy, attr) if role in policy.roles)
+        checked += bool(rows)
+    assert checked  # Idle roles referenced by resource policies.
@@ -0,0 +1,84 @@
+"""
+XML delete config - deleted objects must not be referenced by the config objects left behind.
+"""
+
+import json
+import os
+import xml.etree.ElementTree as ET
+import pytest
+from src.pipeline import ICSPipeline
+from src.xpath.idelete import XC_PATHS
+
+
+def local(tag: str) -> str:
+    return tag.rpartition('}')[2]
+
+
+def deleted_objects(directory: str) -> dict:
+    """Report category -> names deleted by the bundles of the manifest"""
+
+    with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as file_handle:
+        manifest = json.load(file_handle)
+
+    deleted = {category: set() for category in XC_PATHS}
+    for bundle in manifest['bundles']:
+        root = ET.parse(os.path.join(directory, bundle['file'])).getroot()
+        for category, (container, element, key) in XC_PATHS.items():
+            nodes = [root]
+            for tag in container.split('/') + [element]:
+                nodes = [child for node in nodes for child in node if local(child.tag) == tag]
+            deleted[category].update(
+                child.text for node in nodes for child in node if local(child.tag) == key)
+    return deleted
+
+
+@pytest.fixture(scope='module')
+def delete_config(export, tmp_path_factory):
+    """Pipeline run with the XML delete config - (pipeline, deleted objects, manifest)"""
+
+    results_path = str(tmp_path_factory.mktemp('results'))
+    pipeline = ICSPipeline(export, results_path)
+    pipeline.run(console_output=False, reports=False, delete_config=True)
+    directory = os.path.join(results_path, 'delete_config')
+    with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as file_handle:
+        manifest = json.load(file_handle)
+    yield pipeline, deleted_objects(directory), manifest
+    pipeline.close()
+
+
+def test_deleted_objects_not_referenced(delete_config):
+    pipeline, deleted, _ = delete_config
+    config, rs_policy, rs_profile = pipeline.config, pipeline.rs_policy, pipeline.rs_profile
+
+    urls = deleted['IDLE_USER_URLS'] | deleted['IDLE_ADMIN_URLS']
+    realms = deleted['IDLE_USER_REALMS'] | deleted['IDLE_ADMIN_REALMS']
+    roles = deleted['IDLE_USER_ROLES'] | deleted['IDLE_ADMIN_ROLES']
+    profiles = set().union(*(deleted[category] for category in XC_PATHS if 'PROFILES' in category
+                             or category.startswith('SAM_')))
+
+    for url in config.user_urls_ + config.admin_urls_:
+        if url.name not in urls:
+            assert not realms.intersection(url.realms), url.name
+    for realm in config.user_realms_ + config.admin_realms_:
+        if realm.name not in realms:
+            assert not deleted['IDLE_AUTH_SERVERS'].intersection(realm.servers), realm.name
+            assert not roles.intersection(realm.roles), realm.name
+    for attr in rs_policy.model_attrs:  # Resource policies are never deleted.
+        for policy in getattr(rs_policy, attr):
+            assert not roles.intersection(policy.roles), policy.name
+    for attr in rs_profile.model_attrs:
+        for profile in getattr(rs_profile, attr):
+            if profile.name not in profiles:
+                assert not roles.intersection(profile.roles), profile.name
+    assert not realms.intersection(config.ikev2_realms_)
+    assert not roles.intersection(config.aoa_roles_)
+
+
+def test_referenced_roles_kept(delete_config):
+    pipeline, deleted, manifest = delete_config
+    kept = manifest['kept']['IDLE_USER_ROLES']
+
+    assert kept  # The generated export maps idle roles to resource policies.
+    assert deleted['IDLE_USER_ROLES'].isdisjoint(kept)
+    assert deleted['IDLE_USER_ROLES'] | set(kept) == set(pipeline.config.idle_user_roles)
+    assert all(kept.values())
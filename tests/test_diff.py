@@ -0,0 +1,107 @@
+"""
+Baseline diff - raw section digests, stage deltas & reuse of the unchanged stages.
+"""
+
+import gzip
+import re
+import shutil
+import pytest
+from src import ICSIdleConfig, ICSXMLDocument
+from src.api.source import element_digests
+from src.iconfig import diff
+from src.iconfig.diff import ICSConfigDiff, stage_digests
+from src.iconfig.stages import (
+    IDLE_CATEGORIES, PROFILE_CATEGORIES, STAGES, apply_stage, run_stage)
+from src.xpath.iconfig import AUTH_SERVERS_ROOT
+from .helpers import parse
+
+ALL_STAGES = [stage for stages in STAGES.values() for stage, _ in stages]
+
+
+@pytest.fixture
+def documents(monkeypatch) -> list:
+    """Sections argument of each XML document parsed by the diff (None - whole export)."""
+
+    sections = []
+
+    def document(xml_file, **options):
+        sections.append(options.get('sections'))
+        return ICSXMLDocument(xml_file, **options)
+
+    monkeypatch.setattr(diff, 'ICSXMLDocument', document)
+    return sections
+
+
+def copy_export(export: str, filename: str, compression: str, edit=None) -> str:
+    """Copy of the export (gzip compressed or plain) - content edited by `edit` if set."""
+
+    with open(export, mode='rb') as file_handle:
+        content = file_handle.read()
+    if edit is not None:
+        content = edit(content)
+    with (gzip.open if compression == 'gzip' else open)(filename, mode='wb') as file_handle:
+        file_handle.write(content)
+    return filename
+
+
+def test_element_digests_edge_layouts(export, edge_export):
+    # Comments & processing instructions between the sections don't change the digests.
+    assert stage_digests(export) == stage_digests(edge_export)
+    # Nested same-name element is digested with the outer one.
+    assert element_digests(export, ['host-checker']) != \
+        element_digests(edge_export, ['host-checker'])
+
+
+def test_stage_deltas(export):
+    with ICSXMLDocument(export) as document:
+        parser = ICSIdleConfig(document)
+        restored = ICSIdleConfig(None)
+        for stage, _ in STAGES[ICSIdleConfig.__name__]:
+            apply_stage(restored, run_stage(parser, stage))
+        parser.release()
+
+    assert restored.model() == parser.model()
+    assert restored.idle_user_roles == parser.idle_user_roles
+
+
+@pytest.mark.parametrize('compression', ['xml', 'gzip'])
+def test_compare_one_edit(compression, export, expected, tmp_path, documents):
+    server = expected['IDLE_AUTH_SERVERS'][0]
+    pattern = re.compile(
+        b'<auth-server><name>' + re.escape(server.encode()) + b'</name>.*?</auth-server>')
+
+    def remove_server(content: bytes) -> bytes:
+        content, count = pattern.subn(b'', content)
+        assert count == 1
+        return content
+
+    baseline = copy_export(export, str(tmp_path / 'baseline.xml'), compression)
+    current = copy_export(export, str(tmp_path / 'current.xml'), compression, remove_server)
+    config_diff = ICSConfigDiff(baseline, current)
+    changes = config_diff.compare()
+
+    assert changes['IDLE_AUTH_SERVERS'] == {'added': [], 'removed': [server]}
+    assert all(not change['added'] and not change['removed']
+               for category, change in changes.items() if category != 'IDLE_AUTH_SERVERS')
+    assert config_diff.reused == [stage for stage in ALL_STAGES if stage != 'auth_servers']
+    # Baseline results & changes - same idle objects as a full analysis of the current export.
+    full = parse(current)
+    for category in list(IDLE_CATEGORIES) + list(PROFILE_CATEGORIES):
+        change = changes[category]
+        assert sorted(set(expected[category]).difference(change['removed'])
+                      .union(change['added'])) == full[category]
+    if compression == 'xml':  # Only the changed section is parsed.
+        assert documents == [None, {AUTH_SERVERS_ROOT.lstrip('./')}]
+    else:  # Compressed exports are parsed in full.
+        assert documents == [None, None]
+
+
+def test_compare_unchanged(export, tmp_path, documents):
+    baseline = str(tmp_path / 'baseline.xml')
+    shutil.copy(export, baseline)
+    config_diff = ICSConfigDiff(baseline, export)
+    changes = config_diff.compare()
+
+    assert all(not change['added'] and not change['removed'] for change in changes.values())
+    assert config_diff.reused == ALL_STAGES
+    assert documents == [None]  # Current export not parsed at all.
@@ -0,0 +1,35 @@
+"""
+NDJSON findings - one JSON object per idle config object.
+"""
+
+import io
+import json
+from src.iconfig.findings import FINDING_FIELDS, ICSFindingsWriter
+from src.pipeline import ICSPipeline
+from src.pipeline.pipeline import IDLE_CONFIG_REPORT, RS_PROFILE_REPORT
+
+
+def test_ndjson_findings(export, expected, tmp_path):
+    output = io.StringIO()
+    findings = ICSFindingsWriter(output, 'vpn-01')
+    pipeline = ICSPipeline(export, str(tmp_path / 'results'), findings=findings)
+    pipeline.run(console_output=False, reports=False, workers=4)  # Stages write concurrently.
+    pipeline.close()
+
+    lines = output.getvalue().splitlines()
+    records = [json.loads(line) for line in lines]
+    categories = list(IDLE_CONFIG_REPORT) + list(RS_PROFILE_REPORT)
+    assert len(lines) == findings.count == sum(len(expected[category]) for category in categories)
+
+    names = {category: [] for category in categories}
+    for record in records:
+        assert tuple(record) == FINDING_FIELDS
+        assert record['appliance'] == 'vpn-01'
+        names[record['category']].append(record['name'])
+        if record['category'] == 'IDLE_USER_ROLES':
+            assert record['depends_on'] == pipeline.rs_policy.role_dependencies(record['name'])
+        else:
+            assert record['depends_on'] == []
+    assert {category: sorted(values) for category, values in names.items()} == \
+        {category: expected[category] for category in categories}
+    assert any(record['depends_on'] for record in records)
@@ -0,0 +1,35 @@
+"""
+Tag index - `.//a/b` queries must return the ElementTree results (document order).
+"""
+
+import xml.etree.ElementTree as ET
+import pytest
+from src.api.index import ICSTagIndex
+
+NAMESPACE = 'http://xml.pulsesecure.net/system/9.1R14'
+
+# Nested same-name tags, same tag under different parents & self-closing elements.
+CONTENT = f"""<configuration xmlns="{NAMESPACE}">
+<users><user-roles><role><name>r1</name><role><name>r2</name></role></role>
+<role/><!-- comment --><role><name>r3</name></role></user-roles></users>
+<?ics-export section="resource-policies"?>
+<resource-policies><web-acls><web-acl><name>w1</name><roles><role>r1</role></roles>
+<apply>selected</apply></web-acl></web-acls></resource-policies>
+<users><user-roles><role><name>r4</name></role></user-roles></users>
+</configuration>"""
+
+PATHS = ['.//role', './/role/name', './/user-roles/role', './/role/role', './/roles/role',
+         './/name', './/users/user-roles/role/name', './/missing', './/configuration']
+
+
+@pytest.mark.parametrize('path', PATHS)
+def test_findall(path):
+    root = ET.fromstring(CONTENT)
+    nsmap = {'': NAMESPACE}
+
+    assert ICSTagIndex(root).findall(path, nsmap) == root.findall(path, nsmap)
+
+
+@pytest.mark.parametrize('path', ['./users/user-roles', './/role[name]', './/*/name'])
+def test_findall_unsupported(path):
+    assert ICSTagIndex(ET.fromstring(CONTENT)).findall(path, {'': NAMESPACE}) is None
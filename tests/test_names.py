@@ -0,0 +1,50 @@
+"""
+Name table - references to the same object share one string across the parsers.
+"""
+
+from src import ICSIdleConfig, ICSRSPolicy, ICSRSProfile, ICSXMLDocument
+from src.iconfig.cleanup import POLICY_FAMILIES, PROFILE_FAMILIES
+
+
+def parsers(document: ICSXMLDocument) -> tuple:
+    config = ICSIdleConfig(document)
+    config.idle_configs()
+    rs_policy = ICSRSPolicy(document, config.idle_user_roles)
+    rs_policy.rs_policies()
+    rs_profile = ICSRSProfile(document)
+    rs_profile.rs_profiles()
+    for parser in (config, rs_policy, rs_profile):
+        parser.release()
+    return config, rs_policy, rs_profile
+
+
+def test_interned_names(export):
+    document = ICSXMLDocument(export)
+    config, rs_policy, rs_profile = parsers(document)
+    document.close()
+
+    roles = {role.name: role.name for role in config.user_roles_}
+    servers = {server.name: server.name for server in config.auth_servers_}
+    realms = {realm.name: realm.name for realm in config.user_realms_}
+    references = [
+        (roles, [role for realm in config.user_realms_ for role in realm.roles]),
+        (roles, [role for attr in POLICY_FAMILIES.values()
+                 for policy in getattr(rs_policy, attr) for role in policy.roles]),
+        (roles, [role for attr in PROFILE_FAMILIES.values()
+                 for profile in getattr(rs_profile, attr) for role in profile.roles]),
+        (roles, list(config.aoa_roles_)),
+        (servers, [server for realm in config.user_realms_ for server in realm.servers]),
+        (realms, [realm for url in config.user_urls_ for realm in url.realms]),
+    ]
+
+    for names, values in references:
+        shared = [value for value in values if value in names]
+        assert shared
+        assert all(value is names[value] for value in shared)
+    assert len(document.names) == 0  # Table dropped with the document.
+
+    # Tables are per document - another document has its own string objects.
+    document = ICSXMLDocument(export)
+    other, _, _ = parsers(document)
+    document.close()
+    assert all(role.name is not roles[role.name] for role in other.user_roles_)
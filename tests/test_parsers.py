@@ -0,0 +1,50 @@
+"""
+Parsing modes - DOM, streaming, tag index, section skip & lxml must report the same idle
+config objects.
+"""
+
+import pytest
+from src import ICSIdleConfig, ICSRSPolicy, ICSRSProfile
+from src.api.backend import lxml_etree
+from .helpers import idle_sets, parse
+
+MODES = {
+    'dom': {},
+    'streaming': {'streaming': True},
+    'no_index': {'indexed': False},
+    'no_section_skip': {'skip_sections': False},
+    'streaming_no_section_skip': {'streaming': True, 'skip_sections': False},
+    'lxml': {'backend': 'lxml'},
+    'lxml_streaming': {'backend': 'lxml', 'streaming': True},
+}
+
+
+def test_standalone_parsers(export, expected):
+    """Baseline usage - each parser parses the XML export on its own (three parses)."""
+
+    config = ICSIdleConfig(export)
+    config.idle_configs()
+    rs_policy = ICSRSPolicy(export, config.idle_user_roles)
+    rs_policy.rs_policies()
+    rs_profile = ICSRSProfile(export)
+    rs_profile.rs_profiles()
+    for parser in (config, rs_policy, rs_profile):
+        parser.release()
+
+    assert idle_sets(config, rs_policy, rs_profile) == expected
+    assert parse(export) == expected
+
+
+@pytest.mark.parametrize('mode', MODES)
+def test_parsing_modes(mode, export, expected):
+    if MODES[mode].get('backend') == 'lxml' and lxml_etree is None:
+        pytest.skip("lxml not installed")
+    assert parse(export, **MODES[mode]) == expected
+
+
+@pytest.mark.parametrize('mode', ['dom', 'streaming', 'lxml'])
+def test_parsing_modes_edge_layouts(mode, edge_export, expected):
+    if MODES[mode].get('backend') == 'lxml' and lxml_etree is None:
+        pytest.skip("lxml not installed")
+    assert parse(edge_export, **MODES[mode]) == expected
+    assert parse(edge_export, skip_sections=False, **MODES[mode]) == expected
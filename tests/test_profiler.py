@@ -0,0 +1,83 @@
+"""
+Pipeline profiler - nested stage records, per top-level stage cProfile stats & memory
+accounting.
+"""
+
+import os
+import pstats
+import tracemalloc
+from src.pipeline.profiler import ICSProfiler
+
+
+def test_nested_stages(tmp_path):
+    pstats_dir = str(tmp_path / 'pstats')
+    profiler = ICSProfiler(pstats_dir=pstats_dir)
+    assert profiler.sequential
+    with profiler.stage('idle_configs'):
+        with profiler.stage('realms'):
+            sorted(range(1000))
+        with profiler.stage('roles'):
+            pass
+    with profiler.stage('rs_policies'):
+        pass
+
+    # Start order - sub-stages are recorded after their parent.
+    assert [record['name'] for record in profiler.stages] == \
+        ['idle_configs', 'realms', 'roles', 'rs_policies']
+    records = {record['name']: record for record in profiler.stages}
+    assert records['realms']['start'] >= records['idle_configs']['start']
+    assert records['idle_configs']['seconds'] >= \
+        records['realms']['seconds'] + records['roles']['seconds']
+    assert set(profiler.timings) == set(records)
+    assert profiler.report(version='9.1R18')['stages'] == profiler.stages
+
+    # One stats file per top-level stage - sub-stages are part of their parent's stats.
+    assert sorted(os.listdir(pstats_dir)) == ['idle_configs.pstats', 'rs_policies.pstats']
+    assert 'pstats' not in records['realms']
+    stats = pstats.Stats(records['idle_configs']['pstats'])
+    assert any(function == '<built-in method builtins.sorted>'
+               for _, _, function in stats.stats)
+
+
+def test_timings_only():
+    profiler = ICSProfiler()
+    assert not profiler.sequential
+    with profiler.stage('idle_configs') as record:
+        pass
+    assert record['seconds'] is not None and 'pstats' not in record
+
+
+def test_memory_stages():
+    profiler = ICSProfiler(memory=True, top=5)
+    try:
+        assert profiler.sequential
+        with profiler.stage('idle_configs'):
+            with profiler.stage('realms'):
+                realms = [bytearray(1024) for _ in range(256)]
+            with profiler.stage('roles'):
+                roles = bytearray(4096)
+                del roles
+    finally:
+        report = profiler.memory_report(version='9.1R18')
+
+    assert not tracemalloc.is_tracing()  # Memory accounting stopped.
+    # Completion order - sub-stages before their parent.
+    assert [memory['name'] for memory in report['stages']] == ['realms', 'roles', 'idle_configs']
+    memory = {memory['name']: memory for memory in report['stages']}
+    assert memory['realms']['retained'] >= 256 * 1024
+    assert memory['roles']['peak'] >= 4096 > memory['roles']['retained']
+    assert memory['idle_configs']['peak'] >= memory['realms']['peak']
+    assert 'top_allocations' in memory['idle_configs']
+    assert 'top_allocations' not in memory['realms']
+    assert report['version'] == '9.1R18' and report['traced_peak'] >= 256 * 1024
+    del realms
+
+
+def test_memory_report_without_accounting():
+    tracemalloc.start()
+    try:
+        report = ICSProfiler().memory_report()
+        assert tracemalloc.is_tracing()  # Tracing started elsewhere is left running.
+    finally:
+        tracemalloc.stop()
+    assert report['traced'] is None and report['stages'] == []
@@ -0,0 +1,57 @@
+"""
+CSV report writer - column & grouped rows padding.
+"""
+
+import pytest
+from src.iconfig.report import column_rows, grouped_rows, write_columns
+
+
+def test_column_rows():
+    columns = [['AuthServer-1', 'AuthServer-2', 'AuthServer-3'], [], iter(['Realm-1'])]
+
+    assert list(column_rows(columns)) == [
+        ('AuthServer-1', ' ', 'Realm-1'),
+        ('AuthServer-2', ' ', ' '),
+        ('AuthServer-3', ' ', ' '),
+    ]
+    assert list(column_rows([[], []])) == []
+    assert list(column_rows([['a'], []], fillvalue='')) == [('a', '')]
+
+
+def test_grouped_rows():
+    groups = [
+        ('Role-1', [['web-acl-1', 'web-acl-2'], ['sso-1']]),
+        ('Role-2', [[], []]),  # Idle role without dependencies - padded block.
+        ('Role-3', [iter(['web-acl-3']), iter(['sso-2', 'sso-3', 'sso-4'])]),
+    ]
+
+    assert list(grouped_rows(groups, 3)) == [
+        ('Role-1', 'web-acl-1', 'sso-1'),
+        (' ', 'web-acl-2', ''),
+        (' ', '', ''),
+        ('Role-2', '', ''),
+        (' ', '', ''),
+        (' ', '', ''),
+        ('Role-3', 'web-acl-3', 'sso-2'),
+        (' ', '', 'sso-3'),
+        (' ', '', 'sso-4'),
+    ]
+
+
+@pytest.mark.parametrize('length, rows', [
+    (0, []),  # No dependencies at all - no rows.
+    (1, [('Role-1', 'web-acl-1'), ('Role-2', '-')]),  # Blocks are cut at the length.
+])
+def test_grouped_rows_length(length, rows):
+    groups = [('Role-1', [['web-acl-1', 'web-acl-2']]), ('Role-2', [[]])]
+    assert list(grouped_rows(groups, length, fillvalue='-')) == rows
+
+
+def test_write_columns(tmp_path):
+    filename = str(tmp_path / 'idle_config_report.csv')
+    write_columns(filename, ['IDLE_AUTH_SERVERS', 'IDLE_USER_REALMS'],
+                  [['AuthServer-1', 'AuthServer-2'], ['Realm-1']])
+
+    with open(filename, encoding='utf-8', newline='') as file_handle:
+        assert file_handle.read() == \
+            'IDLE_AUTH_SERVERS,IDLE_USER_REALMS\r\nAuthServer-1,Realm-1\r\nAuthServer-2, \r\n'
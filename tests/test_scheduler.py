@@ -0,0 +1,101 @@
+"""
+Stage scheduler - dependency order, concurrent independent stages & stage errors.
+"""
+
+import threading
+import pytest
+from src.pipeline.scheduler import ICSStage, ICSStageScheduler
+
+
+def recorded(events: list, name: str, func=None):
+    """Stage callable recording its start & end - returns func(*inputs) or the stage name."""
+
+    lock = threading.Lock()
+
+    def stage(*inputs):
+        with lock:
+            events.append(('start', name))
+        result = func(*inputs) if func is not None else name
+        with lock:
+            events.append(('end', name))
+        return result
+    return stage
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_dependency_order(workers):
+    events = []
+    stages = [
+        ICSStage('report', recorded(events, 'report', lambda *inputs: inputs),
+                 inputs=['realms', 'roles'], after=['results_dir']),
+        ICSStage('realms', recorded(events, 'realms')),
+        ICSStage('roles', recorded(events, 'roles'), inputs=['realms']),
+        ICSStage('results_dir', recorded(events, 'results_dir')),
+    ]
+    scheduler = ICSStageScheduler(stages, workers=workers)
+    results = scheduler.run()
+
+    assert results['report'] == ('realms', 'roles')  # Input outputs in declaration order.
+    assert set(scheduler.timings) == {stage.name for stage in stages}
+    for stage in stages:
+        start = events.index(('start', stage.name))
+        for name in stage.depends:
+            assert events.index(('end', name)) < start
+    if workers == 1:  # Dependencies first, declaration order otherwise.
+        assert [stage.name for stage in scheduler.order()] == \
+            ['realms', 'roles', 'results_dir', 'report']
+
+
+def test_independent_stages_overlap():
+    # Both stages must be running at the same time to pass the barrier.
+    barrier = threading.Barrier(2, timeout=5)
+    stages = [
+        ICSStage('auth_servers', lambda: barrier.wait() is not None),
+        ICSStage('signin_urls', lambda: barrier.wait() is not None),
+        ICSStage('summary', lambda *inputs: all(inputs), inputs=['auth_servers', 'signin_urls']),
+    ]
+
+    assert ICSStageScheduler(stages, workers=2).run()['summary'] is True
+
+
+def test_exclusive_stage_runs_alone():
+    events = []
+    stages = [
+        ICSStage('realms', recorded(events, 'realms')),
+        ICSStage('console_output', recorded(events, 'console_output'), exclusive=True),
+        ICSStage('roles', recorded(events, 'roles')),
+    ]
+    ICSStageScheduler(stages, workers=4).run()
+
+    start = events.index(('start', 'console_output'))
+    assert events[start + 1] == ('end', 'console_output')
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_stage_error(workers):
+    ran = []
+
+    def failing():
+        raise RuntimeError("XML section missing")
+
+    stages = [
+        ICSStage('realms', failing),
+        ICSStage('roles', lambda: ran.append('roles')),
+        ICSStage('report', lambda *inputs: ran.append('report'), inputs=['realms', 'roles']),
+    ]
+    scheduler = ICSStageScheduler(stages, workers=workers)
+    with pytest.raises(RuntimeError, match='XML section missing'):
+        scheduler.run()
+
+    assert 'report' not in ran  # Dependents of the failed stage never run.
+    assert 'realms' in scheduler.timings
+
+
+@pytest.mark.parametrize('stages, message', [
+    ([ICSStage('a', list), ICSStage('a', list)], 'Duplicate'),
+    ([ICSStage('a', list, inputs=['b'])], 'unknown'),
+    ([ICSStage('a', list, after=['b']), ICSStage('b', list, inputs=['a'])], 'cycle'),
+])
+def test_invalid_stages(stages, message):
+    with pytest.raises(ValueError, match=message):
+        ICSStageScheduler(stages)
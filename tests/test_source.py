@@ -0,0 +1,135 @@
+"""
+XML export sources - compressed & archived exports, section scan & section-skipping reader.
+"""
+
+import bz2
+import gzip
+import lzma
+import shutil
+import zipfile
+import xml.etree.ElementTree as ET
+import pytest
+from src.api.source import (
+    ICSSectionReader, QUERY_TAG_PATTERN, detect_format, export_name, open_export, scan_sections)
+from .helpers import parse
+
+COMPRESSORS = {
+    'gzip': ('ive-export.xml.gz', gzip.open),
+    'bz2': ('ive-export.xml.bz2', bz2.open),
+    'xz': ('ive-export.xml.xz', lzma.open),
+}
+
+SECTIONS = [
+    b'authentication', b'users', b'administrators', b'signin', b'resource-policies',
+    b'resource-profiles', b'users-aoa', b'vpn-tunneling', b'host-checker', b'client-packages']
+
+# Sections without any queried config object.
+SKIPPED = ['host-checker', 'client-packages']
+
+
+def read(xml_file: str) -> bytes:
+    with open(xml_file, mode='rb') as file_handle:
+        return file_handle.read()
+
+
+@pytest.fixture(params=['gzip', 'bz2', 'xz', 'zip'])
+def compressed(request, export, tmp_path) -> tuple:
+    """Compressed/archived copy of the export - (format, filepath)"""
+
+    if request.param == 'zip':
+        xml_file = str(tmp_path / 'ive-export.zip')
+        with zipfile.ZipFile(xml_file, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.write(export, arcname='ive-export.xml')
+    else:
+        filename, opener = COMPRESSORS[request.param]
+        xml_file = str(tmp_path / filename)
+        with open(export, mode='rb') as source, opener(xml_file, mode='wb') as target:
+            shutil.copyfileobj(source, target)
+    return request.param, xml_file
+
+
+def test_compressed_exports(compressed, export, expected):
+    file_format, xml_file = compressed
+
+    assert detect_format(xml_file) == file_format
+    assert export_name(xml_file) == 'ive-export'
+    with open_export(xml_file) as file_handle:
+        assert file_handle.read() == read(export)
+    assert parse(xml_file) == expected
+    assert parse(xml_file, streaming=True) == expected
+
+
+def test_zip_archive_members(export, tmp_path):
+    xml_file = str(tmp_path / 'exports.zip')
+    with zipfile.ZipFile(xml_file, mode='w') as archive:
+        archive.write(export, arcname='ive-export-1.xml')
+        archive.write(export, arcname='ive-export-2.xml')
+
+    with pytest.raises(ValueError, match='single XML export'):
+        with open_export(xml_file):
+            pass
+
+
+def test_scan_sections(export):
+    buffer = read(export)
+    sections = scan_sections(buffer)
+
+    assert [tag for tag, _, _ in sections] == SECTIONS
+    for tag, start, end in sections:
+        assert buffer[start:end].startswith(b'<' + tag + b'>')
+        assert buffer[start:end].endswith(b'</' + tag + b'>')
+
+
+def test_scan_sections_edge_layouts(edge_export):
+    buffer = read(edge_export)
+    sections = scan_sections(buffer)
+
+    assert [tag for tag, _, _ in sections] == SECTIONS + [b'log-monitoring', b'snmp']
+    ranges = {tag: buffer[start:end] for tag, start, end in sections}
+    # Nested same-name element is part of the outer section.
+    assert ranges[b'host-checker'].endswith(
+        b'<host-checker><esap/></host-checker></host-checker>')
+    assert ranges[b'log-monitoring'] == b'<log-monitoring/>'
+    assert ranges[b'snmp'] == b'<snmp a="1" />'
+    # Nothing but comments, processing instructions & whitespace between the sections.
+    for (_, _, end), (_, start, _) in zip(sections, sections[1:]):
+        between = buffer[end:start].strip()
+        assert not between or between.startswith((b'<!--', b'<?'))
+
+
+@pytest.mark.parametrize('content', [
+    b'<configuration/>',
+    b'<configuration><users><user-roles></users>',
+    b'<configuration><users></users>',
+])
+def test_scan_sections_unscannable(content):
+    assert scan_sections(content) is None
+
+
+@pytest.mark.parametrize('fixture', ['export', 'edge_export'])
+def test_section_reader(fixture, request):
+    xml_file = request.getfixturevalue(fixture)
+    reader = ICSSectionReader(xml_file)
+    try:
+        content = reader.read()
+        skipped = [tag for tag, _ in reader.skipped]
+    finally:
+        reader.close()
+
+    assert SKIPPED == [tag for tag in skipped if tag in SKIPPED]
+    assert set(skipped) - set(SKIPPED) <= {'log-monitoring', 'snmp'}
+    root = ET.fromstring(content)  # Stitched stream is well-formed.
+    kept = [child.tag.rpartition('}')[2] for child in root]
+    assert kept == [tag.decode() for tag in SECTIONS if tag.decode() not in SKIPPED]
+    assert not any(QUERY_TAG_PATTERN.search(ET.tostring(child)) is None for child in root)
+
+
+def test_section_reader_tags(export):
+    reader = ICSSectionReader(export, tags=['web-profiles'])
+    try:
+        root = ET.fromstring(reader.read())
+    finally:
+        reader.close()
+
+    assert [child.tag.rpartition('}')[2] for child in root] == ['resource-profiles']
+
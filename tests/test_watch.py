@@ -0,0 +1,141 @@
+"""
+Watch mode - exports are analyzed once fully written, reports are published by rename.
+"""
+
+import csv
+import os
+from concurrent.futures import wait
+import pytest
+from src.pipeline import watch
+from src.pipeline.watch import ICSSpoolWatcher, analyze_spooled, publish_reports
+
+
+class Clock:
+    """Monotonic clock of the watcher - advanced by the test."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(watch, 'monotonic', clock)
+    return clock
+
+
+def scan(watcher: ICSSpoolWatcher, clock: Clock, seconds: float) -> list:
+    clock.now += seconds
+    return [os.path.basename(xml_file) for xml_file, _ in watcher.scan()]
+
+
+def leftovers(results_path: str) -> list:
+    return [name for name in os.listdir(results_path) if name.endswith('.tmp')]
+
+
+def test_scan_complete_cycle(export, tmp_path, clock):
+    spool_dir, results_path = tmp_path / 'spool', str(tmp_path / 'results')
+    spool_dir.mkdir()
+    os.makedirs(results_path)
+    with open(export, mode='rb') as file_handle:
+        content = file_handle.read()
+    watcher = ICSSpoolWatcher(str(spool_dir), results_path, workers=2, poll_interval=5)
+
+    # Half-written export - picked up once its size is unchanged for a poll interval.
+    healthy = spool_dir / 'appliance-a.xml'
+    healthy.write_bytes(content[:len(content) // 2])
+    assert scan(watcher, clock, 0) == []
+    assert scan(watcher, clock, 3) == []
+    with open(healthy, mode='ab') as file_handle:
+        file_handle.write(content[len(content) // 2:])
+    assert scan(watcher, clock, 3) == []  # Size changed - stability is timed again.
+    (spool_dir / 'appliance-b.xml').write_bytes(content[:4096])  # Truncated for good.
+    assert scan(watcher, clock, 1) == []
+    assert scan(watcher, clock, 4) == ['appliance-a.xml']
+    assert scan(watcher, clock, 1) == ['appliance-a.xml', 'appliance-b.xml']
+
+    watcher._ready.extend(watcher.scan())
+    with watcher._executor() as executor:
+        watcher._submit(executor)
+        assert len(watcher._running) == 2
+        done, _ = wait(watcher._running)
+        rows = {row['APPLIANCE']: row for row in watcher._complete(done)}
+
+    assert rows['appliance-a']['STATUS'] == 'OK'
+    reports = rows['appliance-a']['REPORTS']
+    assert os.path.dirname(reports) == os.path.join(results_path, 'appliance-a')
+    assert os.path.isfile(os.path.join(reports, 'idle_config_report.csv'))
+    assert rows['appliance-b']['STATUS'].startswith('FAILED: ')
+    assert not os.path.exists(os.path.join(results_path, 'appliance-b'))
+    assert not leftovers(results_path)
+
+    with open(os.path.join(results_path, 'watch_summary.csv'), encoding='utf-8') as file_handle:
+        summary = list(csv.DictReader(file_handle))
+    assert sorted(row['APPLIANCE'] for row in summary) == ['appliance-a', 'appliance-b']
+
+    # Analyzed exports are skipped until they change.
+    assert scan(watcher, clock, 10) == []
+    healthy.write_bytes(content + b'\n')
+    assert scan(watcher, clock, 1) == []
+    assert scan(watcher, clock, 5) == ['appliance-a.xml']
+
+
+def test_reports_published_by_rename(tmp_path, monkeypatch):
+    results_path = str(tmp_path)
+    renamed = []
+    rename = os.rename
+
+    def analyze_export(xml_file, tmp_path, **options):
+        os.makedirs(tmp_path)
+        with open(os.path.join(tmp_path, 'idle_config_report.csv'), mode='w') as file_handle:
+            file_handle.write('IDLE_AUTH_SERVERS\n')
+        return {'APPLIANCE': 'tmp', 'XML_EXPORT_FILE': xml_file, 'STATUS': 'OK'}
+
+    def record_rename(source, destination):
+        renamed.append((source, destination))
+        rename(source, destination)
+
+    monkeypatch.setattr(watch, 'analyze_export', analyze_export)
+    monkeypatch.setattr(watch.os, 'rename', record_rename)
+    monkeypatch.setattr(watch, 'strftime', lambda _: '18-10-2026-120000')
+    first = analyze_spooled('appliance-a.xml', results_path, 'appliance-a', {})
+    second = analyze_spooled('appliance-a.xml', results_path, 'appliance-a', {})
+
+    target = os.path.join(results_path, 'appliance-a', '18-10-2026-120000')
+    assert first['REPORTS'] == target
+    assert second['REPORTS'] == f'{target}-1'  # Name taken - suffixed.
+    # Temp reports directories renamed into place - second run failed on the taken name first.
+    assert [target for _, target in renamed] == [target, target, f'{target}-1']
+    assert all(os.path.basename(source).startswith('.appliance-a.') for source, _ in renamed)
+    assert os.path.isfile(os.path.join(target, 'idle_config_report.csv'))
+    assert not leftovers(results_path)
+
+
+@pytest.mark.parametrize('failure', ['status', 'exception'])
+def test_temp_reports_removed_on_failure(failure, tmp_path, monkeypatch):
+    results_path = str(tmp_path)
+
+    def analyze_export(xml_file, tmp_path, **options):
+        os.makedirs(os.path.join(tmp_path, 'resource_policies'))  # Partial reports.
+        if failure == 'exception':
+            raise OSError('No space left on device')
+        return {'APPLIANCE': 'tmp', 'XML_EXPORT_FILE': xml_file,
+                'STATUS': 'FAILED: XML Parsing failed.'}
+
+    monkeypatch.setattr(watch, 'analyze_export', analyze_export)
+    if failure == 'exception':
+        with pytest.raises(OSError):
+            analyze_spooled('appliance-a.xml', results_path, 'appliance-a', {})
+    else:
+        row = analyze_spooled('appliance-a.xml', results_path, 'appliance-a', {})
+        assert 'REPORTS' not in row
+
+    assert os.listdir(results_path) == []
+
+
+def test_publish_reports_missing_source(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        publish_reports(str(tmp_path / 'missing'), str(tmp_path / 'appliance-a' / 'run'))